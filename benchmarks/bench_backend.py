@@ -0,0 +1,180 @@
+"""Banc de mesure du backend hors Streamlit, sur catalogues synthétiques (voir synth_catalogue.py).
+
+Chaque échelle tourne dans un sous-processus neuf (pic RSS propre, caches disque dans un répertoire
+temporaire) et appelle les fonctions par __wrapped__ : les décorateurs st.cache_* sont contournés.
+Étapes mesurées : load_csv, build_text_features (ligne à ligne et par lots), load_data (à froid :
+construction du snapshot ; à chaud : relecture), build_recommender (à froid / à chaud),
+build_cast_index, recommend_movies et get_movie_cast_info (index et merge d'origine).
+
+Pour chaque étape : durée, pic RSS du processus à la fin de l'étape (cumulatif : l'étape qui le fait
+monter est celle qui alloue) et, pour les requêtes, latences p50/p95/p99. Les résultats sont écrits
+en JSON (commit git, machine, paramètres) pour être comparés d'un commit à l'autre :
+
+    python benchmarks/bench_backend.py --scales 1000 10000 100000 --out bench-avant.json
+    python benchmarks/bench_backend.py --scales 1000 10000 100000 --out bench-apres.json
+    python benchmarks/bench_backend.py --compare bench-avant.json bench-apres.json
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+PAGES = os.path.join(HERE, "..", "pages")
+RESULTS_DIR = os.path.join(HERE, "results")
+SCHEMA_VERSION = 1
+
+# --- MESURES ---
+def _peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # ko sous Linux
+
+def _percentiles(latencies):
+    ms = np.asarray(latencies) * 1000
+    return {"n": len(ms), "mean": float(ms.mean()), "p50": float(np.percentile(ms, 50)),
+            "p95": float(np.percentile(ms, 95)), "p99": float(np.percentile(ms, 99))}
+
+class _Recorder:
+    def __init__(self):
+        self.stages = []
+
+    def run(self, name, fn):
+        t0 = time.perf_counter()
+        out = fn()
+        self.stages.append({"stage": name, "wall_s": time.perf_counter() - t0, "peak_rss_mb": _peak_rss_mb()})
+        return out
+
+    def queries(self, name, fn, args):
+        latencies = []
+        t0 = time.perf_counter()
+        for a in args:
+            q0 = time.perf_counter()
+            fn(a)
+            latencies.append(time.perf_counter() - q0)
+        self.stages.append({"stage": name, "wall_s": time.perf_counter() - t0, "peak_rss_mb": _peak_rss_mb(),
+                            "latency_ms": _percentiles(latencies)})
+
+# --- UNE ÉCHELLE (sous-processus) ---
+def run_scale(data_dir, n_queries, topk, engine, seed):
+    # Caches disque isolés : rien n'est relu d'un run précédent ni du cache de l'app
+    cache_dir = tempfile.mkdtemp(prefix="jci-bench-cache-")
+    os.environ.update(JCI_CACHE_DIR=cache_dir, JCI_PRECOMPUTED=os.path.join(cache_dir, "none.npz"))
+    sys.path.insert(0, PAGES)
+    import logging
+    logging.disable(logging.WARNING)
+    import backend, utils
+
+    rec = _Recorder()
+    rng = np.random.default_rng(seed)
+    df_movie, df_people, df_link = rec.run("load_csv", lambda: backend.load_csv(data_dir))
+    sample = df_movie.iloc[rng.integers(0, len(df_movie), min(n_queries * 10, len(df_movie)))]
+    rec.queries("build_text_features.row", utils.build_text_features, [r for _, r in sample.iterrows()])
+    rec.run("build_text_features.batch", lambda: utils.build_text_features_batch(df_movie))
+    del df_movie, df_people, df_link
+
+    load_data = backend.load_data.__wrapped__
+    rec.run("load_data.cold", lambda: load_data(data_dir))
+    df_movie, df_people, df_link = rec.run("load_data.warm", lambda: load_data(data_dir))
+
+    build = lambda: backend.build_recommender.__wrapped__(df_movie, topk=topk, engine=engine, df_link=df_link)
+    rec.run("build_recommender.cold", build)
+    reco = rec.run("build_recommender.warm", build)
+    labels = [reco["labels"][i] for i in rng.choice(len(reco["labels"]), min(n_queries, len(reco["labels"])), replace=False)]
+    rec.queries("recommend_movies", lambda t: backend.recommend_movies(t, df_movie, reco), labels)
+
+    index = rec.run("build_cast_index", lambda: backend.build_cast_index.__wrapped__(df_movie, df_people, df_link))
+    tconsts = df_movie["tconst"].to_numpy()[rng.integers(0, len(df_movie), n_queries)]
+    rec.queries("get_movie_cast_info.index", lambda t: backend.get_movie_cast_info(t, df_link, df_people, index), tconsts)
+    rec.queries("get_movie_cast_info.merge", lambda t: backend.get_movie_cast_info(t, df_link, df_people), tconsts[:max(1, n_queries // 10)])
+    return {"films": len(df_movie), "people": len(df_people), "links": len(df_link), "stages": rec.stages}
+
+# --- ORCHESTRATION ---
+def _git_commit():
+    try:
+        out = subprocess.run(["git", "-C", HERE, "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True)
+        dirty = subprocess.run(["git", "-C", HERE, "status", "--porcelain", "--untracked-files=no"], capture_output=True, text=True).stdout
+        return out.stdout.strip() + ("-dirty" if dirty.strip() else "")
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def bench(scales, n_queries, topk, engine, seed, data_root=None):
+    import synth_catalogue
+    results = []
+    with tempfile.TemporaryDirectory(prefix="jci-bench-data-") as tmp:
+        for n in scales:
+            data_dir = os.path.join(data_root or tmp, f"synth-{n}-{seed}")
+            t0 = time.perf_counter()
+            if not os.path.exists(os.path.join(data_dir, "intermediaire.csv")):
+                synth_catalogue.generate(n, data_dir, seed)
+            generate_s = time.perf_counter() - t0
+            cmd = [sys.executable, os.path.abspath(__file__), "--worker", data_dir, "--queries", str(n_queries),
+                   "--topk", str(topk), "--seed", str(seed)] + (["--engine", engine] if engine else [])
+            out = subprocess.run(cmd, capture_output=True, text=True, cwd=PAGES)
+            if out.returncode != 0:
+                print(out.stderr, file=sys.stderr)
+                raise SystemExit(f"échec du banc à {n} films")
+            result = json.loads(out.stdout.strip().splitlines()[-1])
+            result.update(scale=n, generate_s=generate_s)
+            results.append(result)
+            print_scale(result)
+    return {"schema": SCHEMA_VERSION, "commit": _git_commit(), "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "machine": {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()},
+            "params": {"queries": n_queries, "topk": topk, "engine": engine, "seed": seed}, "results": results}
+
+def print_scale(result):
+    print(f"\n{result['films']} films / {result['people']} intervenants / {result['links']} liens")
+    print(f"{'étape':<28} {'durée (s)':>10} {'pic RSS (Mo)':>13} {'p50 (ms)':>9} {'p95 (ms)':>9} {'p99 (ms)':>9}")
+    for s in result["stages"]:
+        lat = s.get("latency_ms")
+        q = f"{lat['p50']:>9.3f} {lat['p95']:>9.3f} {lat['p99']:>9.3f}" if lat else ""
+        print(f"{s['stage']:<28} {s['wall_s']:>10.3f} {s['peak_rss_mb']:>13.0f} {q}")
+
+def compare(path_a, path_b):
+    """Rapport B / A par échelle et par étape (durée, pic RSS, p95)."""
+    with open(path_a) as f: a = json.load(f)
+    with open(path_b) as f: b = json.load(f)
+    print(f"A = {a['commit']} ({a['timestamp']})   B = {b['commit']} ({b['timestamp']})")
+    ratio = lambda x, y: f"{y / x:>8.2f}x" if x else f"{'-':>9}"
+    print(f"{'films':>8} {'étape':<28} {'durée':>9} {'pic RSS':>9} {'p95':>9}")
+    ref = {(r["scale"], s["stage"]): s for r in a["results"] for s in r["stages"]}
+    for r in b["results"]:
+        for s in r["stages"]:
+            old = ref.get((r["scale"], s["stage"]))
+            if old is None: continue
+            p95 = ratio(old["latency_ms"]["p95"], s["latency_ms"]["p95"]) if "latency_ms" in s and "latency_ms" in old else f"{'':>9}"
+            print(f"{r['scale']:>8} {s['stage']:<28} {ratio(old['wall_s'], s['wall_s'])} {ratio(old['peak_rss_mb'], s['peak_rss_mb'])} {p95}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--topk", type=int, default=0, help="table top-K à construire (0 : scoring à la requête)")
+    parser.add_argument("--engine", default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--data-root", default=None, help="conserve les catalogues générés ici (réutilisés ensuite)")
+    parser.add_argument("--out", default=None, help="fichier JSON (défaut : benchmarks/results/backend-<commit>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("A.json", "B.json"))
+    parser.add_argument("--worker", metavar="DATA_DIR", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_scale(args.worker, args.queries, args.topk, args.engine, args.seed)))
+        return
+    if args.compare:
+        compare(*args.compare)
+        return
+    sys.path.insert(0, HERE)
+    report = bench(args.scales, args.queries, args.topk, args.engine, args.seed, args.data_root)
+    out = args.out or os.path.join(RESULTS_DIR, f"backend-{report['commit'] or 'local'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nRésultats : {out}")
+
+if __name__ == "__main__":
+    main()
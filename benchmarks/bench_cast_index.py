@@ -0,0 +1,94 @@
+"""Micro-benchmark : fiche film / filmographie via l'index de casting vs le filtrage + merge d'origine.
+
+La table de liens (et les intervenants / films) est répliquée ×10 et ×100 avec des identifiants
+suffixés, pour mesurer la latence à plus grande échelle. Seconde table : matrice d'incidence
+films × talents du canal casting (construction, pic mémoire mesuré par tracemalloc, scores d'un
+film par produit creux) et collaborateurs fréquents d'un talent.
+
+    python benchmarks/bench_cast_index.py [--scales 1 10 100] [--queries 200]
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+
+PAGES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "pages")
+sys.path.insert(0, PAGES)
+import backend, cast_index  # noqa: E402
+
+def replicate(df, scale, columns):
+    parts = []
+    for k in range(scale):
+        part = df.copy()
+        for col in columns:
+            part[col] = part[col].astype(str) + ("" if k == 0 else f"_{k}")
+        parts.append(part)
+    return pd.concat(parts, ignore_index=True)
+
+def old_cast_info(tconst, df_link, df_people):
+    # Copie du chemin d'origine de backend.get_movie_cast_info
+    merged = df_link[df_link['tconst'] == tconst].merge(df_people, on="nconst")
+    reals = merged[merged['person_professions'].str.contains('director', na=False)]['person_name'].unique().tolist()
+    actors = merged[merged['person_professions'].str.contains('actor|actress', na=False)].head(5)
+    return reals, [{"name": r['person_name'], "photo": r.get('tmdb_profile_url')} for _, r in actors.iterrows()]
+
+def old_filmography(nconst, df_link, df_movie):
+    films = df_link[df_link['nconst'] == nconst]['tconst'].tolist()
+    return df_movie[df_movie['tconst'].isin(films)].head(12)
+
+def per_query_ms(fn, args):
+    t0 = time.perf_counter()
+    for a in args: fn(a)
+    return (time.perf_counter() - t0) / len(args) * 1000
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    data = os.path.join(PAGES, "..", "data")
+    movie = pd.read_csv(os.path.join(data, "movie.csv"), usecols=["tconst", "title"])
+    people = pd.read_csv(os.path.join(data, "intervenants.csv"), usecols=["nconst", "intervenant_primaryName", "intervenant_primaryProfession", "tmdb_profile_url"]).rename(
+        columns={"intervenant_primaryName": "person_name", "intervenant_primaryProfession": "person_professions"})
+    link = pd.read_csv(os.path.join(data, "intermediaire.csv"))
+
+    casting = []
+    print(f"{'scale':>5} {'links':>8} {'build (s)':>10} {'film old (ms)':>14} {'film idx (ms)':>14} {'filmo old (ms)':>15} {'filmo idx (ms)':>15}")
+    rng = np.random.default_rng(0)
+    for scale in args.scales:
+        df_movie = replicate(movie, scale, ["tconst"])
+        df_people = replicate(people, scale, ["nconst"])
+        df_link = replicate(link, scale, ["tconst", "nconst"])
+        t0 = time.perf_counter()
+        index = cast_index.build_cast_index(df_link, df_people, df_movie)
+        build = time.perf_counter() - t0
+        films = rng.choice(df_link["tconst"].unique(), args.queries)
+        persons = rng.choice(df_link["nconst"].unique(), args.queries)
+        assert all(old_cast_info(t, df_link, df_people)[0] == cast_index.cast_info(index, t)[0] for t in films[:20])
+        film_old = per_query_ms(lambda t: old_cast_info(t, df_link, df_people), films)
+        film_idx = per_query_ms(lambda t: cast_index.cast_info(index, t), films)
+        filmo_old = per_query_ms(lambda n: old_filmography(n, df_link, df_movie), persons)
+        filmo_idx = per_query_ms(lambda n: df_movie.iloc[cast_index.filmography_positions(index, n)[:12]], persons)
+        print(f"{scale:>5} {len(df_link):>8} {build:>10.3f} {film_old:>14.3f} {film_idx:>14.4f} {filmo_old:>15.3f} {filmo_idx:>15.4f}")
+
+        tracemalloc.start()
+        t0 = time.perf_counter()
+        C = backend.build_cast_matrix(df_movie, df_link)
+        cast_build = time.perf_counter() - t0
+        peak = tracemalloc.get_traced_memory()[1] / 1e6
+        tracemalloc.stop()
+        rows = rng.integers(0, len(df_movie), args.queries)
+        scores = per_query_ms(lambda i: (C @ C[i].T).toarray(), rows)
+        collab = per_query_ms(lambda n: cast_index.collaborators(index, n), persons)
+        casting.append((scale, C.shape, C.nnz, cast_build, peak, (C.data.nbytes + C.indices.nbytes + C.indptr.nbytes) / 1e6, scores, collab))
+
+    print(f"\n{'scale':>5} {'films x talents':>18} {'nnz':>8} {'build (s)':>10} {'peak (Mo)':>10} {'CSR (Mo)':>9} {'scores (ms)':>12} {'collab (ms)':>12}")
+    for scale, shape, nnz, cast_build, peak, size, scores, collab in casting:
+        print(f"{scale:>5} {f'{shape[0]} x {shape[1]}':>18} {nnz:>8} {cast_build:>10.3f} {peak:>10.1f} {size:>9.1f} {scores:>12.3f} {collab:>12.4f}")
+
+if __name__ == "__main__":
+    main()
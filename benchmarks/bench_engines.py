@@ -0,0 +1,36 @@
+"""Benchmark des moteurs de similarité (similarity.ENGINES) sur un catalogue synthétique agrandi.
+
+Entrées de build_recommender (bench_topk.catalogue_inputs : scoring_matrix et scoring_dense, tous
+les canaux) ; pour chaque moteur : temps de construction, empreinte mémoire, latence par requête
+et rappel@10 face au moteur exact.
+
+    python benchmarks/bench_engines.py [--sizes 10000 100000 300000] [--queries 200]
+"""
+import argparse
+import time
+import numpy as np
+import bench_topk  # avant similarity : chemin de pages/ et caches disque isolés
+import similarity
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 300000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--engines", nargs="+", default=list(similarity.ENGINES))
+    args = parser.parse_args()
+
+    print(f"{'films':>8} {'engine':>6} {'build (s)':>10} {'mem (MB)':>9} {'query (ms)':>11} {'recall@10':>10}")
+    for n in args.sizes:
+        X, E = bench_topk.catalogue_inputs(n)
+        queries = np.random.default_rng(1).integers(0, n, args.queries)
+        reference = similarity.ExactEngine(X, E)
+        for name in args.engines:
+            engine = reference if name == "exact" else similarity.build_engine(name, X, E)
+            t0 = time.perf_counter()
+            for q in queries: engine.query(q, 10)
+            latency = (time.perf_counter() - t0) / len(queries) * 1000
+            recall = similarity.recall_at(engine, reference, queries)
+            print(f"{n:>8} {name:>6} {engine.build_seconds:>10.2f} {engine.memory_bytes() / 1e6:>9.1f} {latency:>11.3f} {recall:>10.3f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Ingestion incrémentale (pages/ingest.py) contre reconstruction complète, sur catalogue synthétique.
+
+Les --added derniers films d'un catalogue généré (avec leurs liens et les talents qu'eux seuls
+citent) forment la mise à jour ; le reste est la base, préparée comme au démarrage d'un hôte
+(snapshot, ajustement, table top-K). Puis, chacun dans un cache neuf :
+    incrémental : python ingest.py <mise à jour>  (vocabulaires figés, listes de voisins corrigées)
+    complet     : CSV reparsés, snapshot, vectoriseurs et LSA réajustés, table top-K reconstruite
+Rapporte les durées et l'accord des 10 premiers voisins entre les deux modèles (recouvrement).
+
+    python benchmarks/bench_ingest.py [--scales 10000 100000] [--added 200] [--topk 50]
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+PAGES = os.path.join(HERE, "..", "pages")
+FILES = {"movie": "movie.csv", "people": "intervenants.csv", "link": "intermediaire.csv"}
+
+def split_catalogue(src, root, added):
+    """base/ (tout sauf les `added` derniers films) et update/ (ces films, leurs liens, leurs nouveaux talents)."""
+    m, p, l = (pd.read_csv(os.path.join(src, FILES[k])) for k in ("movie", "people", "link"))
+    new_links = l["tconst"].isin(set(m["tconst"].iloc[-added:]))
+    new_people = ~p["nconst"].isin(set(l["nconst"][~new_links]))
+    parts = {"base": (m.iloc[:-added], p[~new_people], l[~new_links]), "update": (m.iloc[-added:], p[new_people], l[new_links])}
+    for d, frames in parts.items():
+        os.makedirs(os.path.join(root, d))
+        for name, df in zip(FILES, frames):
+            df.to_csv(os.path.join(root, d, FILES[name]), index=False)
+    full = os.path.join(root, "full")
+    os.makedirs(full)
+    for name in FILES:
+        shutil.copy(os.path.join(root, "base", FILES[name]), os.path.join(full, FILES[name]))
+    shutil.copytree(os.path.join(root, "update"), os.path.join(full, "updates", "0001"))
+    return os.path.join(root, "base"), os.path.join(root, "update"), full
+
+def _python(code, cache_dir, *args, env=None):
+    env = {**os.environ, "JCI_CACHE_DIR": cache_dir, "JCI_PRECOMPUTED": os.path.join(cache_dir, "none.npz"), **(env or {})}
+    out = subprocess.run([sys.executable, *(("-c", code) if code else ()), *args], capture_output=True, text=True, cwd=PAGES, env=env)
+    if out.returncode != 0:
+        print(out.stderr, file=sys.stderr)
+        raise SystemExit("échec du sous-processus")
+    return out.stdout
+
+# Construit (ou relit) le catalogue et le recommandeur de data_dir ; imprime durée et 10 voisins par film
+LOAD = """
+import json, logging, sys, time
+logging.disable(logging.WARNING)
+import backend
+t0 = time.perf_counter()
+df, _, links = backend.load_data.__wrapped__(sys.argv[1])
+reco = backend.build_recommender.__wrapped__(df, topk=int(sys.argv[2]), df_link=links)
+seconds = time.perf_counter() - t0
+print(json.dumps({"seconds": seconds, "films": len(df), "ids": reco["topk"]["ids"][:, :10].tolist()}))
+"""
+
+def bench(scale, added, topk, seed, data_root=None):
+    sys.path.insert(0, HERE)
+    import synth_catalogue
+    with tempfile.TemporaryDirectory(prefix="jci-ingest-") as tmp:
+        src = os.path.join(data_root or tmp, f"synth-{scale}-{seed}")
+        if not os.path.exists(os.path.join(src, FILES["link"])):
+            synth_catalogue.generate(scale, src, seed)
+        base, update, full = split_catalogue(src, os.path.join(tmp, "split"), added)
+        inc_cache, full_cache = os.path.join(tmp, "cache-inc"), os.path.join(tmp, "cache-full")
+
+        prepared = json.loads(_python(LOAD, inc_cache, base, str(topk)).splitlines()[-1])
+        t0 = time.perf_counter()
+        # Chemin incrémental mesuré quelle que soit la dérive du catalogue généré
+        _python(None, inc_cache, "ingest.py", update, "--data-dir", base, "--name", "0001", "--topk", str(topk),
+                env={"JCI_DRIFT_LIMIT": "1", "JCI_GROWTH_LIMIT": "1e9"})
+        ingest_s = time.perf_counter() - t0
+        incremental = json.loads(_python(LOAD, inc_cache, base, str(topk)).splitlines()[-1])
+        complete = json.loads(_python(LOAD, full_cache, full, str(topk)).splitlines()[-1])
+
+    a, b = np.asarray(incremental["ids"]), np.asarray(complete["ids"])
+    overlap = np.mean([len(set(x) & set(y)) / len(x) for x, y in zip(a, b)])
+    new_overlap = np.mean([len(set(x) & set(y)) / len(x) for x, y in zip(a[-added:], b[-added:])])
+    return {"scale": scale, "added": added, "base_build_s": prepared["seconds"], "ingest_s": ingest_s,
+            "swap_load_s": incremental["seconds"], "full_rebuild_s": complete["seconds"],
+            "overlap_at_10": overlap, "new_films_overlap_at_10": new_overlap}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", type=int, nargs="+", default=[10000])
+    parser.add_argument("--added", type=int, default=200, help="films de la mise à jour")
+    parser.add_argument("--topk", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--data-root", default=None, help="conserve les catalogues générés ici (réutilisés ensuite)")
+    args = parser.parse_args()
+    print(f"{'films':>8} {'ajout':>6} {'ingestion (s)':>14} {'rechargement (s)':>17} {'complet (s)':>12} {'accord@10':>10} {'nouveaux':>9}")
+    for scale in args.scales:
+        r = bench(scale, args.added, args.topk, args.seed, args.data_root)
+        print(f"{r['scale']:>8} {r['added']:>6} {r['ingest_s']:>14.1f} {r['swap_load_s']:>17.2f} {r['full_rebuild_s']:>12.1f} "
+              f"{r['overlap_at_10']:>10.1%} {r['new_films_overlap_at_10']:>9.1%}")
+
+if __name__ == "__main__":
+    main()
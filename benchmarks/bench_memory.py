@@ -0,0 +1,174 @@
+"""Mémoire d'un worker Streamlit : RSS au démarrage (pic) et en régime établi, par échelle de catalogue.
+
+Un sous-processus « préparation » construit le snapshot et les caches disque (comme le premier
+démarrage d'un hôte), puis un sous-processus neuf rejoue la séquence de chargement d'app.py
+(load_data, build_recommender, build_cast_index, build_facet_index, build_search_indexes) et
+affiche des fiches (textes lus à la demande). Après chaque étape : VmRSS, dont RssAnon (mémoire
+propre au worker) et RssFile (pages mappées, partagées entre workers du même hôte), et VmHWM (pic).
+
+--pages pointe sur un autre arbre (git worktree d'un commit antérieur) pour un avant/après :
+
+    git worktree add /tmp/jci-avant <commit>
+    python benchmarks/bench_memory.py --data-root /tmp/jci-data --pages /tmp/jci-avant/pages --out mem-avant.json
+    python benchmarks/bench_memory.py --data-root /tmp/jci-data --out mem-apres.json
+    python benchmarks/bench_memory.py --compare mem-avant.json mem-apres.json
+"""
+import argparse
+import gc
+import inspect
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+PAGES = os.path.join(HERE, "..", "pages")
+RESULTS_DIR = os.path.join(HERE, "results")
+
+# --- MESURES ---
+def _status_mb():
+    """Compteurs mémoire du processus (Mo) lus dans /proc/self/status (Linux)."""
+    wanted = {"VmRSS": "rss", "RssAnon": "anon", "RssFile": "file", "VmHWM": "peak"}
+    out = {}
+    with open("/proc/self/status") as f:
+        for line in f:
+            key, _, value = line.partition(":")
+            if key in wanted: out[wanted[key]] = int(value.split()[0]) / 1024
+    return out
+
+def _frames_mb(*frames):
+    return sum(df.memory_usage(deep=True).sum() for df in frames) / 1e6
+
+# --- UN WORKER (sous-processus) ---
+def run_worker(data_dir, pages, n_views, topk, seed, prepare):
+    sys.path.insert(0, pages)
+    os.chdir(pages)
+    import logging
+    logging.disable(logging.WARNING)
+    stages = [{"stage": "import", **_status_mb()}]
+    import backend
+    stages.append({"stage": "import backend", **_status_mb()})
+
+    def step(name, fn):
+        out = fn()
+        gc.collect()
+        stages.append({"stage": name, **_status_mb()})
+        return out
+
+    df_movie, df_people, df_link = step("load_data", lambda: backend.load_data.__wrapped__(data_dir))
+    frames_mb = _frames_mb(df_movie, df_people, df_link)
+    # Canal casting (df_link) absent des arbres antérieurs mesurés via --pages
+    cast = {"df_link": df_link} if "df_link" in inspect.signature(backend.build_recommender.__wrapped__).parameters else {}
+    step("build_recommender", lambda: backend.build_recommender.__wrapped__(df_movie, topk=topk, **cast))
+    step("build_cast_index", lambda: backend.build_cast_index.__wrapped__(df_movie, df_people, df_link))
+    step("build_facet_index", lambda: backend.build_facet_index.__wrapped__(df_movie))
+    if hasattr(backend, "build_search_indexes"):
+        step("build_search_indexes", lambda: backend.build_search_indexes.__wrapped__(df_movie, df_people))
+    if prepare:
+        return {"stages": stages}
+
+    rng = np.random.default_rng(seed)
+    people = df_people["nconst"].to_numpy()[rng.integers(0, len(df_people), n_views)]
+    movies = df_movie["tconst"].to_numpy()[rng.integers(0, len(df_movie), n_views)]
+    if hasattr(backend, "get_text"):  # textes lus à la demande
+        text_store = backend.load_text_store.__wrapped__(data_dir)
+        bio = lambda n: backend.text_store.get(text_store, "people", n, "tmdb_biography_fr")
+        overview = lambda t: backend.text_store.get(text_store, "movie", t, "movie_overview_fr")
+    else:  # arbre antérieur : textes dans les DataFrames
+        people_pos = {n: i for i, n in enumerate(df_people["nconst"])}
+        movie_pos = {t: i for i, t in enumerate(df_movie["tconst"])}
+        bio = lambda n: df_people["tmdb_biography_fr"].iat[people_pos[n]]
+        overview = lambda t: df_movie["movie_overview_fr"].iat[movie_pos[t]]
+    t0 = time.perf_counter()
+    step(f"{n_views} fiches", lambda: [(bio(n), overview(t)) for n, t in zip(people, movies)])
+    views_ms = (time.perf_counter() - t0) * 1000 / n_views
+    return {"films": len(df_movie), "people": len(df_people), "links": len(df_link),
+            "frames_mb": frames_mb, "view_ms": views_ms, "stages": stages}
+
+# --- ORCHESTRATION ---
+def _run(args, cwd):
+    out = subprocess.run([sys.executable, os.path.abspath(__file__), *args], capture_output=True, text=True, cwd=cwd)
+    if out.returncode != 0:
+        print(out.stderr, file=sys.stderr)
+        raise SystemExit("échec du sous-processus de mesure")
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+def bench(scales, pages, n_views, topk, seed, data_root=None):
+    sys.path.insert(0, HERE)
+    import bench_backend, synth_catalogue
+    results = []
+    with tempfile.TemporaryDirectory(prefix="jci-mem-") as tmp:
+        for n in scales:
+            data_dir = os.path.join(data_root or tmp, f"synth-{n}-{seed}")
+            if not os.path.exists(os.path.join(data_dir, "intermediaire.csv")):
+                synth_catalogue.generate(n, data_dir, seed)
+            # Caches disque propres à ce run, partagés entre préparation et mesure
+            os.environ.update(JCI_CACHE_DIR=os.path.join(tmp, f"cache-{n}"),
+                              JCI_PRECOMPUTED=os.path.join(tmp, "none.npz"))
+            common = ["--worker", data_dir, "--pages", pages, "--views", str(n_views), "--topk", str(topk), "--seed", str(seed)]
+            prepared = _run(common + ["--prepare"], pages)
+            result = _run(common, pages)
+            result.update(scale=n, prepare_peak_mb=prepared["stages"][-1]["peak"])
+            results.append(result)
+            print_scale(result)
+    return {"commit": bench_backend._git_commit() if os.path.samefile(pages, PAGES) else None,
+            "pages": os.path.abspath(pages), "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "params": {"views": n_views, "topk": topk, "seed": seed}, "results": results}
+
+def print_scale(result):
+    print(f"\n{result['films']} films / {result['people']} intervenants / {result['links']} liens : "
+          f"DataFrames {result['frames_mb']:.0f} Mo, {result['view_ms']:.3f} ms par fiche, "
+          f"pic de la préparation (snapshot, ajustements) {result['prepare_peak_mb']:.0f} Mo")
+    print(f"{'étape':<24} {'RSS':>8} {'anon':>8} {'fichier':>8} {'pic':>8}   (Mo)")
+    for s in result["stages"]:
+        print(f"{s['stage']:<24} {s['rss']:>8.0f} {s['anon']:>8.0f} {s['file']:>8.0f} {s['peak']:>8.0f}")
+
+def compare(path_a, path_b):
+    """Régime établi (dernière étape) et pic du worker, B / A par échelle."""
+    with open(path_a) as f: a = json.load(f)
+    with open(path_b) as f: b = json.load(f)
+    print(f"A = {a['commit'] or a['pages']}   B = {b['commit'] or b['pages']}")
+    print(f"{'films':>8} {'':<10} {'A (Mo)':>9} {'B (Mo)':>9} {'B/A':>7}")
+    ref = {r["scale"]: r for r in a["results"]}
+    for r in b["results"]:
+        old = ref.get(r["scale"])
+        if old is None: continue
+        rows = {"RSS": "rss", "anon": "anon", "fichier": "file", "pic": "peak"}
+        for label, key in rows.items():
+            x, y = old["stages"][-1][key], r["stages"][-1][key]
+            print(f"{r['scale']:>8} {label:<10} {x:>9.0f} {y:>9.0f} {y / x if x else float('nan'):>6.2f}x")
+        print(f"{r['scale']:>8} {'DataFrames':<10} {old['frames_mb']:>9.0f} {r['frames_mb']:>9.0f} "
+              f"{r['frames_mb'] / old['frames_mb']:>6.2f}x")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--pages", default=PAGES, help="répertoire pages/ de l'arbre mesuré")
+    parser.add_argument("--views", type=int, default=200, help="fiches affichées en régime établi")
+    parser.add_argument("--topk", type=int, default=0, help="table top-K à construire (0 : scoring à la requête)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--data-root", default=None, help="conserve les catalogues générés ici (réutilisés ensuite)")
+    parser.add_argument("--out", default=None, help="fichier JSON (défaut : benchmarks/results/memory-<commit>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("A.json", "B.json"))
+    parser.add_argument("--worker", metavar="DATA_DIR", help=argparse.SUPPRESS)
+    parser.add_argument("--prepare", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_worker(args.worker, os.path.abspath(args.pages), args.views, args.topk, args.seed, args.prepare)))
+        return
+    if args.compare:
+        compare(*args.compare)
+        return
+    report = bench(args.scales, os.path.abspath(args.pages), args.views, args.topk, args.seed, args.data_root)
+    out = args.out or os.path.join(RESULTS_DIR, f"memory-{report['commit'] or 'local'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nRésultats : {out}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Latence de la recherche des noms (pages/search_index.py) sur un annuaire synthétique.
+
+Noms = prénoms × noms de famille tirés des talents réels (data/intervenants.csv), recombinés au
+hasard jusqu'à --rows lignes, popularité log-normale. Requêtes par famille :
+    1 mot          'mart'          préfixe d'un nom de famille
+    2 mots         'jean mart'     prénom entier + préfixe long
+    2 mots mixtes  'jean mar'      prénom entier + préfixe court (≤ 3 lettres)
+    2 mots courts  'je ma'         deux préfixes courts
+    faute          'jean matrin'   deux lettres inversées dans le nom : voie trigrammes
+--check compare, sur quelques requêtes par famille, les préfixes à un parcours complet des textes
+et les similarités trigrammes à un Jaccard calculé sur les ensembles de chaînes.
+
+    python benchmarks/bench_search.py [--rows 1000000] [--queries 200] [--check 20]
+"""
+import argparse
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "pages"))
+import search_index  # noqa: E402
+
+def synthetic_names(rows, seed):
+    names = pd.read_csv(os.path.join(HERE, "..", "data", "intervenants.csv"), usecols=["intervenant_primaryName"])
+    parts = names["intervenant_primaryName"].dropna().str.split(n=1)
+    parts = parts[parts.str.len() == 2]
+    first, last = np.array(parts.str[0].tolist()), np.array(parts.str[1].tolist())
+    rng = np.random.default_rng(seed)
+    texts = np.char.add(np.char.add(rng.choice(first, rows), " "), rng.choice(last, rows)).tolist()
+    return texts, rng.lognormal(0.0, 1.5, rows)
+
+def queries(index, rng, count):
+    texts = index["texts"]
+    picks = [texts[e].split() for e in rng.integers(0, len(texts), count * 4)]
+    picks = [w for w in picks if len(w) >= 2 and len(w[0]) >= 2 and len(w[-1]) >= 5][:count]
+    swap = lambda w: w[:2] + w[3] + w[2] + w[4:]
+    return {
+        "1 mot": [w[-1][:4] for w in picks],
+        "2 mots": [f"{w[0]} {w[-1][:4]}" for w in picks],
+        "2 mots mixtes": [f"{w[0]} {w[-1][:3]}" for w in picks],
+        "2 mots courts": [f"{w[0][:2]} {w[-1][:2]}" for w in picks],
+        "faute": [f"{w[0]} {swap(w[-1])}" for w in picks],
+    }
+
+def timings(index, qs):
+    out = []
+    for q in qs:
+        t0 = time.perf_counter()
+        search_index.search(index, q)
+        out.append((time.perf_counter() - t0) * 1e3)
+    return np.array(out)
+
+def check_prefix(index, q, n=16):
+    tokens = search_index.fold(q).split()
+    found = search_index._prefix_matches(index, tokens, n)
+    expected = [e for e, t in enumerate(index["texts"])
+                if all(any(w.startswith(tok) for w in t.split()) for tok in tokens)][:n]
+    return list(found) == expected
+
+def check_trigrams(index, q, n=16):
+    q = search_index.fold(q)
+    grams = lambda t: {("  " + t + " ")[k:k + 3] for k in range(len(t) + 1)}
+    entries, sim = search_index._trigram_matches(index, q, n)
+    qg = grams(q)
+    exact = np.array([len(qg & grams(index["texts"][e])) / len(qg | grams(index["texts"][e])) for e in entries])
+    return bool(np.allclose(sim, exact))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=200, help="requêtes par famille")
+    parser.add_argument("--check", type=int, default=0, help="requêtes vérifiées par famille (parcours complet)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    texts, pop = synthetic_names(args.rows, args.seed)
+    t0 = time.perf_counter()
+    index = search_index.build_search_index(texts, pop, np.arange(args.rows))
+    print(f"{args.rows:,} noms, {len(index['texts']):,} entrées : construction {time.perf_counter() - t0:.1f} s\n")
+    rng = np.random.default_rng(args.seed + 1)
+    families = queries(index, rng, args.queries)
+    for qs in families.values():  # chauffe (pages du tampon, caches de numpy)
+        timings(index, qs[:5])
+    print(f"{'famille':<15} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8}")
+    for name, qs in families.items():
+        ms = timings(index, qs)
+        print(f"{name:<15} {np.percentile(ms, 50):>8.2f} {np.percentile(ms, 95):>8.2f} {ms.max():>8.2f}")
+    if args.check:
+        print()
+        for name, qs in families.items():
+            qs = qs[:args.check]
+            ok = sum(check_trigrams(index, q) if name == "faute" else check_prefix(index, q) for q in qs)
+            print(f"{name:<15} {ok}/{len(qs)} requêtes conformes au parcours complet")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Micro-benchmark : degrés de séparation (BFS bidirectionnel sur le graphe CSR talents <-> films).
+
+Sur le catalogue réel puis sur des graphes synthétiques à l'échelle du casting principal IMDb
+(title.principals : plusieurs dizaines de millions de liens). Les graphes synthétiques sont tirés
+directement en codes entiers : films de ~6 intervenants (Poisson), talents à filmographie très
+inégale (loi de puissance, quelques milliers de films pour les plus prolifiques). Par échelle :
+construction des CSR, mémoire du graphe (separation.graph_nbytes), latence p50 / p95 / max d'une
+requête entre deux talents tirés au hasard parmi ceux qui ont au moins un film, longueur des
+chemins, nœuds visités (p50 / p95) et pic mémoire d'une requête (tracemalloc).
+
+    python benchmarks/bench_separation.py [--links 1000000 10000000 40000000] [--queries 200]
+"""
+import argparse
+import collections
+import os
+import sys
+import time
+import tracemalloc
+import numpy as np
+
+PAGES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "pages")
+sys.path.insert(0, PAGES)
+import cast_index, separation  # noqa: E402
+
+def synthetic_graph(n_links, seed=0, cast=6, films_per_person=5, alpha=1.6):
+    rng = np.random.default_rng(seed)
+    n_films, n_people = n_links // cast, n_links // films_per_person
+    film = rng.integers(0, n_films, n_links, dtype=np.int32)
+    person = (n_people * rng.random(n_links) ** alpha).astype(np.int32)  # petits codes = talents prolifiques
+    film_indptr, film_people = cast_index._csr(film, person, n_films)
+    person_indptr, person_films = cast_index._csr(person, film, n_people)
+    return {"film_indptr": film_indptr, "film_people": film_people,
+            "person_indptr": person_indptr, "person_films": person_films}
+
+def real_graph():
+    import backend
+    os.chdir(PAGES)  # chemins du catalogue relatifs à pages/ (storage.DATA_DIR)
+    df_movie, df_people, df_link = backend.load_data.__wrapped__()
+    return backend.build_cast_index.__wrapped__(df_movie, df_people, df_link)
+
+def run(name, index, queries, seed=0):
+    rng = np.random.default_rng(seed)
+    degree = np.diff(index["person_indptr"])
+    people = np.flatnonzero(degree)
+    pairs = rng.choice(people, (queries, 2))
+    times, lengths, visited = [], collections.Counter(), []
+    stats = {}
+    for a, b in pairs:
+        t0 = time.perf_counter()
+        path = separation.shortest_path(index, (separation.PERSON, int(a)), (separation.PERSON, int(b)), stats=stats)
+        times.append(time.perf_counter() - t0)
+        lengths[None if path is None else (len(path) - 1) // 2] += 1
+        visited.append(stats["visited"])
+    tracemalloc.start()
+    for a, b in pairs[:20]:
+        separation.shortest_path(index, (separation.PERSON, int(a)), (separation.PERSON, int(b)))
+    peak = tracemalloc.get_traced_memory()[1] / 1e6
+    tracemalloc.stop()
+    ms = np.asarray(times) * 1000
+    n_links = len(index["person_films"])
+    print(f"{name:>12} {n_links:>10} {len(index['film_indptr']) - 1:>9} {len(people):>9} {degree.max():>7} "
+          f"{separation.graph_nbytes(index) / 1e6:>9.1f} {np.percentile(ms, 50):>8.2f} {np.percentile(ms, 95):>8.2f} "
+          f"{ms.max():>8.2f} {int(np.percentile(visited, 50)):>9} {int(np.percentile(visited, 95)):>9} {peak:>9.1f}   " + " ".join(f"{k}:{v}" for k, v in sorted(lengths.items(), key=str)))
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--links", type=int, nargs="+", default=[1_000_000, 10_000_000, 40_000_000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--no-real", action="store_true", help="sans le catalogue réel (../data)")
+    args = parser.parse_args()
+
+    print(f"{'graphe':>12} {'liens':>10} {'films':>9} {'talents':>9} {'deg max':>7} {'CSR (Mo)':>9} "
+          f"{'p50 (ms)':>8} {'p95 (ms)':>8} {'max (ms)':>8} {'vis. p50':>9} {'vis. p95':>9} {'pic (Mo)':>9}   degrés:requêtes")
+    if not args.no_real:
+        run("catalogue", real_graph(), args.queries)
+    for n_links in args.links:
+        t0 = time.perf_counter()
+        index = synthetic_graph(n_links)
+        build = time.perf_counter() - t0
+        run(f"synth {n_links // 1_000_000}M", index, args.queries)
+        print(f"{'':>12} construction des CSR : {build:.1f}s")
+        del index
+
+if __name__ == "__main__":
+    main()
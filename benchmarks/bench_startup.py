@@ -0,0 +1,113 @@
+"""Démarrage à froid : temps jusqu'au premier rendu d'une page, par mode de construction du recommandeur.
+
+Chaque mesure est un processus neuf (worker Streamlit qui vient de démarrer) qui rejoue un premier
+rerun d'app.py via AppTest sur la page demandée : imports des modules de l'app, chargement du
+catalogue et, en JCI_WARMUP=sync (ou sur un arbre antérieur), construction du recommandeur. La
+découverte des composants d'AppTest, faite par le serveur au lancement de `streamlit run` et non au
+premier rerun, est sortie de la mesure. Ensuite : délai jusqu'à ce que le recommandeur soit prêt
+(depuis le début du premier rerun) et rerun de l'accueil avec la section recommandations.
+
+Disque chaud par défaut (snapshot et caches du recommandeur déjà écrits : redémarrage d'un worker) ;
+--cold-cache repart de caches vides (premier démarrage d'un hôte : snapshot, ajustement TF-IDF).
+--pages pointe sur un autre arbre (git worktree d'un commit antérieur) pour un avant/après :
+
+    git worktree add /tmp/jci-avant <commit>
+    python benchmarks/bench_startup.py --pages /tmp/jci-avant/pages --modes sync
+    python benchmarks/bench_startup.py [--modes sync background] [--screens ACCUEIL ACTEURS FILMS] [--repeat 3]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+PAGES = os.path.join(HERE, "..", "pages")
+
+# --- UN WORKER NEUF (sous-processus) ---
+def run_worker(pages, screen):
+    sys.path.insert(0, pages)
+    os.chdir(pages)
+    import logging
+    logging.disable(logging.WARNING)
+    from streamlit.components.v2.component_manager import BidiComponentManager
+    from streamlit.testing.v1 import AppTest
+    at = AppTest.from_file(os.path.join(pages, "app.py"), default_timeout=600)
+    at._bidi_component_manager = BidiComponentManager()  # côté serveur, hors premier rerun
+    at._bidi_component_manager.discover_and_register_components(start_file_watching=False)
+    modules = set(sys.modules)
+
+    at.session_state["current_page"] = screen
+    t0 = time.perf_counter()
+    at.run()
+    first = time.perf_counter() - t0
+    if at.exception: raise SystemExit(at.exception[0].value)
+    sklearn = "sklearn" in sys.modules
+    new_modules = len(set(sys.modules) - modules)
+
+    import backend
+    if hasattr(backend, "recommender"):
+        backend.recommender(version=backend.catalogue_version(), wait=True)
+    ready = time.perf_counter() - t0
+    at.session_state["current_page"] = "ACCUEIL"
+    t1 = time.perf_counter()
+    at.run()
+    home = time.perf_counter() - t1
+    if at.exception or not at.selectbox: raise SystemExit("accueil sans recommandations")
+    return {"first_render_s": first, "reco_ready_s": ready, "home_ready_s": home,
+            "sklearn_at_first_render": sklearn, "modules_imported": new_modules}
+
+# --- ORCHESTRATION ---
+def _run(pages, screen, env):
+    out = subprocess.run([sys.executable, os.path.abspath(__file__), "--worker", screen, "--pages", pages],
+                         capture_output=True, text=True, cwd=pages, env=env)
+    if out.returncode != 0:
+        print(out.stderr, file=sys.stderr)
+        raise SystemExit("échec du sous-processus de mesure")
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+def bench(pages, modes, screens, repeat, cold_cache):
+    rows = []
+    print(f"{'mode':<11} {'page':<8} {'1er rendu':>10} {'reco prête':>11} {'accueil prêt':>13} {'sklearn':>8}   (médianes, s)")
+    for mode in modes:
+        for screen in screens:
+            runs = []
+            for _ in range(repeat):
+                env = dict(os.environ, JCI_WARMUP=mode)
+                with tempfile.TemporaryDirectory(prefix="jci-startup-") as tmp:
+                    if cold_cache:
+                        env.update(JCI_CACHE_DIR=tmp, JCI_PRECOMPUTED=os.path.join(tmp, "none.npz"))
+                    runs.append(_run(pages, screen, env))
+            row = {"mode": mode, "screen": screen, "runs": runs,
+                   **{k: float(np.median([r[k] for r in runs])) for k in ("first_render_s", "reco_ready_s", "home_ready_s")}}
+            rows.append(row)
+            print(f"{mode:<11} {screen:<8} {row['first_render_s']:>10.2f} {row['reco_ready_s']:>11.2f} "
+                  f"{row['home_ready_s']:>13.2f} {'oui' if runs[0]['sklearn_at_first_render'] else 'non':>8}")
+    return {"pages": os.path.abspath(pages), "cold_cache": cold_cache, "repeat": repeat,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), "results": rows}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", default=PAGES, help="répertoire pages/ de l'arbre mesuré")
+    parser.add_argument("--modes", nargs="+", default=["sync", "background"], help="valeurs de JCI_WARMUP")
+    parser.add_argument("--screens", nargs="+", default=["ACCUEIL", "ACTEURS", "FILMS"])
+    parser.add_argument("--repeat", type=int, default=3, help="processus neufs par mesure")
+    parser.add_argument("--cold-cache", action="store_true", help="caches disque vides (snapshot, recommandeur)")
+    parser.add_argument("--out", default=None, help="fichier JSON des résultats")
+    parser.add_argument("--worker", metavar="PAGE", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_worker(os.path.abspath(args.pages), args.worker)))
+        return
+    report = bench(os.path.abspath(args.pages), args.modes, args.screens, args.repeat, args.cold_cache)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nRésultats : {args.out}")
+
+if __name__ == "__main__":
+    main()
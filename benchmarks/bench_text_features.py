@@ -0,0 +1,60 @@
+"""Benchmark : build_text_features ligne à ligne (DataFrame.apply) vs build_text_features_batch.
+
+    python benchmarks/bench_text_features.py [--sizes 1000 10000 100000] [--workers 4]
+"""
+import argparse
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "pages"))
+from utils import build_text_features, build_text_features_batch  # noqa: E402
+
+WORDS = ["love", "war", "paris", "detective", "time travel", "friendship", "heist", "space",
+         "revenge", "high school", "based on novel", "world war ii", "it's a trap", "robot"]
+
+def synthetic_movies(n, seed=0):
+    """Colonnes utilisées par build_text_features, avec ~1% de blobs échappés et ~0.5% de blobs tronqués."""
+    rng = np.random.default_rng(seed)
+    blobs = []
+    for i in range(n):
+        picks = rng.choice(len(WORDS), size=rng.integers(0, 12), replace=False)
+        items = [{"id": int(rng.integers(1, 300000)), "name": WORDS[p]} for p in picks]
+        if rng.random() < 0.01 and items:
+            items[0]["name"] += "\xa0"
+        blob = repr(items)
+        if rng.random() < 0.005:
+            blob = blob[: len(blob) // 2]
+        blobs.append(blob if rng.random() > 0.02 else np.nan)
+    genres = np.array(["Drama", "Comedy,Romance", "Action,Adventure,Sci-Fi", " Horror ", np.nan], dtype=object)
+    return pd.DataFrame({
+        "keywords": blobs,
+        "movie_overview_fr": np.where(rng.random(n) < 0.1, None, "Un résumé de film.").astype(object),
+        "movie_overview": "A movie overview.",
+        "movie_genres_y": genres[rng.integers(0, len(genres), n)],
+    })
+
+def timed(fn):
+    t0 = time.perf_counter()
+    res = fn()
+    return res, time.perf_counter() - t0
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    args = parser.parse_args()
+
+    print(f"{'rows':>8} {'apply (s)':>10} {'batch (s)':>10} {'pool (s)':>10} {'speedup':>8} {'failures':>8}")
+    for n in args.sizes:
+        df = synthetic_movies(n)
+        ref, t_apply = timed(lambda: df.apply(build_text_features, axis=1, result_type="expand"))
+        (batch, stats), t_batch = timed(lambda: build_text_features_batch(df))
+        (pooled, _), t_pool = timed(lambda: build_text_features_batch(df, workers=args.workers, chunk_size=max(1000, n // args.workers)))
+        assert (ref.values == batch.values).all() and (ref.values == pooled.values).all(), "sorties différentes"
+        print(f"{n:>8} {t_apply:>10.3f} {t_batch:>10.3f} {t_pool:>10.3f} {t_apply / t_batch:>7.1f}x {stats['keyword_parse_failures']:>8}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Banc du cache de miniatures contre un serveur HTTP local qui imite le CDN TMDB.
+
+Le serveur sert des JPEG w500 générés (latence réseau simulée par --latency-ms) ; les URLs
+https://image.tmdb.org/... sont redirigées vers lui comme avec JCI_IMAGE_BASE_URL. Mesure le
+pré-chauffage selon la taille du pool, le gain en octets (original w500 vs miniature), le second
+passage (tout en cache) et l'éviction sous un plafond réduit.
+
+    python benchmarks/bench_thumbnails.py [--images 300] [--workers 1 4 16] [--latency-ms 40]
+"""
+import argparse
+import functools
+import http.server
+import io
+import os
+import sys
+import tempfile
+import threading
+import time
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "pages"))
+import thumbnails  # noqa: E402
+
+class _CDN(http.server.SimpleHTTPRequestHandler):
+    latency = 0.0
+
+    def do_GET(self):
+        time.sleep(self.latency)
+        super().do_GET()
+
+    def log_message(self, *args):
+        pass
+
+def make_images(root, n, seed=0):
+    rng = np.random.default_rng(seed)
+    os.makedirs(os.path.join(root, "t", "p", "w500"), exist_ok=True)
+    total = 0
+    for i in range(n):
+        # Dégradé bruité : se compresse comme une vraie affiche, pas comme un aplat
+        base = np.linspace(0, 255, 750)[:, None, None] * rng.random(3)
+        pixels = np.clip(base + rng.normal(0, 25, (750, 500, 3)), 0, 255).astype(np.uint8)
+        buf = io.BytesIO()
+        Image.fromarray(pixels).save(buf, format="JPEG", quality=88)
+        with open(os.path.join(root, "t", "p", "w500", f"img{i}.jpg"), "wb") as f:
+            f.write(buf.getvalue())
+        total += buf.tell()
+    return total
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--images", type=int, default=300)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--latency-ms", type=float, default=40)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        original = make_images(os.path.join(root, "cdn"), args.images)
+        _CDN.latency = args.latency_ms / 1000
+        server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(_CDN, directory=os.path.join(root, "cdn")))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        thumbnails.IMAGE_BASE_URL = f"http://127.0.0.1:{server.server_address[1]}"
+        urls = [f"{thumbnails.REMOTE_BASE}/t/p/w500/img{i}.jpg" for i in range(args.images)]
+        print(f"{args.images} images, {original / 1e6:.1f} Mo d'originaux, latence simulée {args.latency_ms:.0f} ms")
+
+        print(f"{'pool':>5} {'durée (s)':>10} {'images/s':>9} {'miniatures (Mo)':>16} {'gain':>7}")
+        for workers in args.workers:
+            out = os.path.join(root, f"thumbs-{workers}")
+            stats = thumbnails.prewarm([(u, "card") for u in urls], workers, out_dir=out)
+            assert stats["failed"] == 0, stats
+            print(f"{workers:>5} {stats['seconds']:>10.2f} {args.images / stats['seconds']:>9.1f} "
+                  f"{stats['bytes'] / 1e6:>16.2f} {original / stats['bytes']:>6.1f}x")
+        again = thumbnails.prewarm([(u, "card") for u in urls], args.workers[-1], out_dir=out)
+        print(f"second passage : {again['cached']}/{again['jobs']} déjà en cache en {again['seconds'] * 1000:.0f} ms")
+
+        # Éviction : plafond à la moitié du volume, puis tout le jeu re-téléchargé
+        thumbnails.CACHE_BYTES = stats["bytes"] // 2
+        evict = os.path.join(root, "thumbs-evict")
+        thumbnails.prewarm([(u, "card") for u in urls], args.workers[-1], out_dir=evict)
+        kept = sum(e.stat().st_size for e in os.scandir(evict))
+        print(f"éviction : {kept / 1e6:.2f} Mo conservés pour un plafond de {thumbnails.CACHE_BYTES / 1e6:.2f} Mo")
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Benchmark : table top-K pré-calculée vs scoring exact de recommend_movies.
+
+Entrées réelles du recommandeur : X = backend.scoring_matrix et E = backend.scoring_dense (mots-clés,
+genres, synopsis LSA, casting, pondérés par DEFAULT_WEIGHTS) sur un catalogue synthétique de n films
+(synth_catalogue.py), avec des caches disque isolés. Rapporte le temps de construction, la taille
+sur disque et la latence par requête.
+
+    python benchmarks/bench_topk.py [--sizes 1000 10000 50000] [--k 50]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "pages"))
+# Caches du recommandeur (ajustements, tables top-K) hors de ceux de l'app, lus par backend à l'import
+_cache_dir = tempfile.mkdtemp(prefix="jci-bench-cache-")
+os.environ.update(JCI_CACHE_DIR=_cache_dir, JCI_PRECOMPUTED=os.path.join(_cache_dir, "none.npz"))
+import backend, neighbours, similarity, synth_catalogue  # noqa: E402
+
+def catalogue_inputs(n, seed=0):
+    """(X, E) de build_recommender sur un catalogue synthétique de n films (E : None sans synopsis)."""
+    import logging
+    logging.disable(logging.WARNING)
+    with tempfile.TemporaryDirectory(prefix="jci-bench-data-") as tmp:
+        synth_catalogue.generate(n, tmp, seed)
+        df_movie, _, df_link = backend.load_data.__wrapped__(tmp)
+        reco = backend.build_recommender.__wrapped__(df_movie, topk=0, df_link=df_link)
+    return backend.scoring_matrix(reco), backend.scoring_dense(reco)
+
+def exact_query(idx, X, E):
+    return similarity.top_n(similarity.exact_scores(X, E, idx), 10, exclude=idx)[0]
+
+def latency_ms(fn, queries):
+    t0 = time.perf_counter()
+    for q in queries: fn(q)
+    return (time.perf_counter() - t0) / len(queries) * 1000
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--k", type=int, default=50)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'films':>8} {'build (s)':>10} {'disk (MB)':>10} {'exact (ms)':>11} {'top-K (ms)':>11}")
+    for n in args.sizes:
+        X, E = catalogue_inputs(n)
+        table = neighbours.build_topk(X, k=args.k, E=E)
+        with tempfile.TemporaryDirectory() as tmp:
+            neighbours.save_topk(table, os.path.join(tmp, "topk.npz"), [f"tt{i}" for i in range(n)])
+        queries = np.random.default_rng(1).integers(0, n, args.queries)
+        t_exact = latency_ms(lambda i: exact_query(i, X, E), queries)
+        t_topk = latency_ms(lambda i: neighbours.lookup(table, i, 10), queries)
+        print(f"{n:>8} {table['build_seconds']:>10.2f} {table['bytes'] / 1e6:>10.2f} {t_exact:>11.3f} {t_topk:>11.4f}")
+
+if __name__ == "__main__":
+    main()
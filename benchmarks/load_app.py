@@ -0,0 +1,351 @@
+"""Test de charge de l'app Streamlit : sessions simultanées pilotées par AppTest (sans navigateur ni réseau).
+
+Chaque niveau de concurrence tourne dans un sous-processus neuf, comme un serveur Streamlit : les
+caches st.cache_* sont partagés entre sessions, chaque session a son propre état et ses reruns
+s'exécutent dans leur propre thread. Une session parcourt le scénario
+
+    accueil -> recommandations (un film, puis toutes les suggestions) -> fiche film -> fiche talent
+            -> bibliothèque -> filtres (genre, note, tri) -> pagination (2 pages)
+
+et chaque interaction est chronométrée : un rerun complet de pages/app.py, ou seulement du fragment
+(st.fragment) qui contient le widget, comme dans le navigateur (voir _fragment_reruns). Une première session
+seule chauffe les caches, une seconde mesure le temps CPU de chaque interaction (process seul,
+donc sans contention). Puis N sessions démarrent ensemble. Rapport par niveau : latences p50 / p95
+/ p99 / max par interaction, CPU total et par session, RSS de référence, croissance par session
+(sessions gardées ouvertes jusqu'à la fin) et pic.
+
+    python benchmarks/load_app.py --sessions 1 10 50 [--rounds 2] [--think-ms 200]
+    python benchmarks/load_app.py --data-dir /tmp/jci-data/synth-100000-0 --sessions 10
+    python benchmarks/load_app.py --compare load-avant.json load-apres.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+PAGES = os.path.join(HERE, "..", "pages")
+RESULTS_DIR = os.path.join(HERE, "results")
+RUN_TIMEOUT = 300  # s par rerun : le premier construit snapshot et recommandeur
+# Versions de Streamlit (majeure, mineure) dont les internes d'AppTest remplacés ici ont été vérifiés
+STREAMLIT_TESTED = ((1, 66), (1, 66))
+
+_session = threading.local()  # par thread de session : fragment de l'interaction, messages du dernier rendu
+
+# --- MESURES ---
+def _status_mb():
+    """RSS courant et pic (Mo) lus dans /proc/self/status (Linux)."""
+    out = {}
+    with open("/proc/self/status") as f:
+        for line in f:
+            key, _, value = line.partition(":")
+            if key in ("VmRSS", "VmHWM"): out[key] = int(value.split()[0]) / 1024
+    return out.get("VmRSS", 0.0), out.get("VmHWM", 0.0)
+
+def _percentiles(latencies):
+    ms = np.asarray(latencies) * 1000
+    return {"n": len(ms), "mean": float(ms.mean()), "p50": float(np.percentile(ms, 50)),
+            "p95": float(np.percentile(ms, 95)), "p99": float(np.percentile(ms, 99)), "max": float(ms.max())}
+
+# --- SCÉNARIO ---
+def _button(at, key_prefix=None, label=None):
+    for b in at.button:
+        if (key_prefix and (b.key or "").startswith(key_prefix)) or (label and b.label == label):
+            return b
+    return None
+
+def _library_genre(at, rng):
+    widget = next(m for m in at.multiselect if m.label == "Genres")
+    return widget.select(widget.options[rng.integers(len(widget.options))])
+
+def scenario(at, rng):
+    """Interactions d'une session : (nom, action) ; l'action renvoie l'AppTest à relancer, ou None (sautée)."""
+    return [
+        ("home", lambda: at),
+        ("reco.select", lambda: (lambda box: box.select(box.options[rng.integers(len(box.options))]))(at.selectbox(key="home_sel_box"))),
+        ("reco.show_all", lambda: (lambda b: b and b.click())(_button(at, label="VOIR TOUTES LES AUTRES SUGGESTIONS ↓"))),
+        ("film.detail", lambda: (lambda b: b and b.click())(_button(at, key_prefix="reco_"))),
+        ("actor.detail", lambda: (lambda b: b and b.click())(_button(at, key_prefix="c_"))),
+        ("library", lambda: _button(at, label="FILMS").click()),
+        ("library.genre", lambda: _library_genre(at, rng)),
+        ("library.rating", lambda: at.slider(key="lib_rating").set_value(5.0)),
+        ("library.sort", lambda: at.selectbox(key="lib_sort").set_value("popularity")),
+        ("library.page", lambda: at.number_input[0].increment()),
+        ("library.page", lambda: at.number_input[0].increment()),
+    ]
+
+def run_session(seed, rounds, think_s, start=None, cpu=False):
+    """Joue le scénario `rounds` fois ; renvoie (AppTest, [(interaction, latence s, CPU s ou None, erreur)])."""
+    from streamlit.testing.v1 import AppTest
+    rng = np.random.default_rng(seed)
+    at = AppTest.from_file(os.path.join(PAGES, "app.py"), default_timeout=RUN_TIMEOUT)
+    if start is not None: start.wait()
+    records = []
+    for r in range(rounds):
+        if r: at.session_state["current_page"] = "ACCUEIL"  # retour au logo, sans rerun compté
+        for name, action in scenario(at, rng):
+            try:
+                target = action()
+            except (LookupError, StopIteration, AttributeError) as exc:  # widget absent : la session s'arrête
+                records.append((name, None, None, f"{type(exc).__name__}: {exc}"))
+                return at, records
+            if target is None:
+                records.append((name, None, None, "sautée"))
+                continue
+            _session.fragment = _widget_fragment(target)
+            c0, t0 = time.process_time() if cpu else None, time.perf_counter()
+            try:
+                target.run()
+                error = at.exception[0].message if len(at.exception) else None
+            except RuntimeError as exc:  # délai dépassé
+                error = str(exc)
+            records.append((name, time.perf_counter() - t0, time.process_time() - c0 if cpu else None, error))
+            if error: return at, records
+            if think_s: time.sleep(rng.uniform(0.5, 1.5) * think_s)
+    return at, records
+
+# --- INTERNES DE STREAMLIT ---
+def check_streamlit():
+    """Échoue tout de suite hors des versions testées : les patchs ci-dessous visent des internes privés."""
+    import streamlit
+    version = tuple(int(x) for x in streamlit.__version__.split(".")[:2])
+    low, high = STREAMLIT_TESTED
+    if not low <= version <= high:
+        tested = ".".join(map(str, low)) + ("" if low == high else " à " + ".".join(map(str, high)))
+        raise SystemExit(f"load_app.py remplace des internes d'AppTest vérifiés avec Streamlit {tested} ; "
+                         f"version installée : {streamlit.__version__}. Revoir _share_apptest_globals et "
+                         "_fragment_reruns puis STREAMLIT_TESTED, ou --any-streamlit pour essayer quand même.")
+
+def _require(owner, *names):
+    """Attributs visés par un patch : message clair plutôt qu'une erreur obscure en cours de mesure."""
+    missing = [n for n in names if not hasattr(owner, n)]
+    if missing:
+        import streamlit
+        raise SystemExit(f"Streamlit {streamlit.__version__} : {getattr(owner, '__name__', owner)}."
+                         f"{', '.join(missing)} introuvable(s), patch du test de charge à revoir")
+
+# --- UN NIVEAU (sous-processus) ---
+def _share_apptest_globals():
+    """AppTest pose des globaux le temps de chaque rerun : un Runtime factice et l'option de
+    configuration global.appTest (patch de config.get_option). Entre sessions simultanées, la fin
+    d'un rerun les retirerait sous les scripts encore en cours (pages vides, widgets sans état).
+    On les installe une fois pour tout le processus : Runtime.instance() renvoie le dernier
+    Runtime installé, même retiré depuis, et global.appTest reste vrai. Le script est compilé une
+    fois (un ScriptCache partagé, comme sur le serveur) : ast.parse n'est pas sûr entre threads."""
+    import contextlib
+    from streamlit import config
+    from streamlit.runtime import Runtime
+    from streamlit.testing.v1 import app_test, local_script_runner, util
+    _require(Runtime, "instance", "exists", "_instance")
+    _require(config, "get_option")
+    _require(util, "build_mock_config_get_option")
+    _require(app_test, "patch_config_options", "ScriptCache")
+    _require(local_script_runner, "ScriptCache")
+    last = {}
+
+    def instance(cls):
+        if cls._instance is not None: last["runtime"] = cls._instance
+        if "runtime" not in last: raise RuntimeError("Runtime hasn't been created!")
+        return last["runtime"]
+
+    Runtime.instance = classmethod(instance)
+    Runtime.exists = classmethod(lambda cls: cls._instance is not None or "runtime" in last)
+    config.get_option = util.build_mock_config_get_option({"global.appTest": True})
+    app_test.patch_config_options = lambda overrides: contextlib.nullcontext()
+    script_cache = app_test.ScriptCache()
+    app_test.ScriptCache = local_script_runner.ScriptCache = lambda: script_cache
+
+def _widget_fragment(widget):
+    """Fragment du widget d'après les messages du dernier rendu (delta.fragment_id) ; "" hors fragment."""
+    widget_id = getattr(widget, "id", None)
+    if not widget_id: return ""
+    for msg in reversed(getattr(_session, "messages", [])):
+        if not (msg.HasField("delta") and msg.delta.HasField("new_element")): continue
+        element = msg.delta.new_element
+        kind = element.WhichOneof("type")
+        if kind and getattr(getattr(element, kind), "id", None) == widget_id: return msg.delta.fragment_id
+    return ""
+
+def _fragment_reruns():
+    """Dans le navigateur, un widget placé dans un st.fragment ne relance que ce fragment et la page
+    garde le reste de son affichage ; AppTest relance toujours tout le script. L'interaction passe
+    par l'API publique d'AppTest (select, click, set_value...) ; le rerun vise ensuite le fragment
+    du widget, lu dans les messages du dernier rendu (_widget_fragment), et l'arbre d'éléments est
+    rejoué sur les messages du rendu précédent, complétés par ceux du fragment. Un widget hors
+    fragment, ou un st.rerun() du fragment, donne un rerun complet. Seul le lancement du rerun
+    (RerunData.fragment_id_queue) passe par des internes, vérifiés par _require."""
+    import dataclasses
+    from urllib import parse
+    from streamlit.runtime.scriptrunner import ScriptRunnerEvent
+    from streamlit.runtime.scriptrunner_utils.script_requests import RerunData
+    from streamlit.testing.v1 import local_script_runner
+    from streamlit.testing.v1.element_tree import parse_tree_from_messages
+    _require(local_script_runner.LocalScriptRunner, "run", "request_rerun", "start", "join", "forward_msgs")
+    _require(local_script_runner, "require_widgets_deltas")
+    missing = {"fragment_id_queue", "is_fragment_scoped_rerun"} - {f.name for f in dataclasses.fields(RerunData)}
+    if missing: _require(RerunData, *sorted(missing))
+
+    def run(self, widget_state=None, query_params=None, timeout=3, page_hash=""):
+        _require(self, "_script_thread", "events", "event_data")
+        fragment = getattr(_session, "fragment", "")
+        self.request_rerun(RerunData(widget_states=widget_state, query_string=parse.urlencode(query_params or {}, doseq=True),
+                                     page_script_hash=page_hash, fragment_id_queue=[fragment] if fragment else [],
+                                     is_fragment_scoped_rerun=bool(fragment)))
+        try:
+            if not self._script_thread: self.start()
+            local_script_runner.require_widgets_deltas(self, timeout)
+        finally:
+            self.join()
+        messages = list(self.forward_msgs())
+        full = any(e == ScriptRunnerEvent.SCRIPT_STARTED and not d.get("fragment_ids_this_run")
+                   for e, d in zip(self.events, self.event_data))
+        if not full: messages = getattr(_session, "messages", []) + messages
+        _session.messages = messages
+        return parse_tree_from_messages(messages)
+
+    local_script_runner.LocalScriptRunner.run = run
+
+def run_level(sessions, rounds, think_ms, seed):
+    sys.path.insert(0, PAGES)
+    os.chdir(PAGES)
+    # Régime établi : la session de chauffe attend le recommandeur (démarrage : bench_startup.py)
+    os.environ.setdefault("JCI_WARMUP", "sync")
+    import logging
+    logging.disable(logging.WARNING)
+    _share_apptest_globals()
+    _fragment_reruns()
+
+    t0 = time.perf_counter()
+    run_session(seed, 1, 0)  # caches chauds (snapshot, recommandeur, index, miniatures)
+    warmup_s = time.perf_counter() - t0
+    _, serial = run_session(seed + 1, 1, 0, cpu=True)
+    cpu_ms = {}
+    for name, _, cpu, error in serial:
+        if cpu is not None and not error: cpu_ms.setdefault(name, []).append(cpu * 1000)
+
+    import gc
+    gc.collect()
+    rss_base, _ = _status_mb()
+    start = threading.Barrier(sessions)
+    results = [None] * sessions
+
+    def worker(i):
+        try: results[i] = run_session(seed + 100 + i, rounds, think_ms / 1000, start)
+        except Exception as exc: results[i] = (None, [("session", None, None, f"{type(exc).__name__}: {exc}")])
+
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(sessions)]
+    c0, t0 = time.process_time(), time.perf_counter()
+    for t in threads: t.start()
+    for t in threads: t.join()
+    wall_s, cpu_s = time.perf_counter() - t0, time.process_time() - c0
+    gc.collect()
+    rss_end, peak = _status_mb()  # sessions encore ouvertes : leur état compte
+
+    latencies, errors = {}, {}
+    for _, records in results:
+        for name, latency, _, error in records:
+            if error: errors[f"{name}: {error}"] = errors.get(f"{name}: {error}", 0) + 1
+            if latency is not None and not error: latencies.setdefault(name, []).append(latency)
+    every = [x for v in latencies.values() for x in v]
+    return {"sessions": sessions, "rounds": rounds, "think_ms": think_ms, "warmup_s": warmup_s,
+            "wall_s": wall_s, "cpu_s": cpu_s, "cpu_per_session_ms": cpu_s * 1000 / sessions,
+            "cpu_utilisation": cpu_s / wall_s if wall_s else 0.0, "reruns": len(every),
+            "reruns_per_s": len(every) / wall_s if wall_s else 0.0,
+            "rss_base_mb": rss_base, "rss_end_mb": rss_end, "rss_per_session_mb": (rss_end - rss_base) / sessions,
+            "peak_rss_mb": peak, "errors": errors,
+            "interactions": {name: {**_percentiles(v), "cpu_ms": float(np.mean(cpu_ms[name])) if name in cpu_ms else None}
+                             for name, v in latencies.items()},
+            "all": _percentiles(every) if every else None}
+
+# --- ORCHESTRATION ---
+def bench(levels, rounds, think_ms, seed, data_dir=None):
+    sys.path.insert(0, HERE)
+    import bench_backend
+    env = dict(os.environ)
+    tmp = None
+    if data_dir:
+        # Catalogue de dimensionnement : caches à part (l'élagage des snapshots viserait ceux de l'app)
+        tmp = tempfile.mkdtemp(prefix="jci-load-cache-")
+        env.update(JCI_DATA_DIR=os.path.abspath(data_dir), JCI_CACHE_DIR=tmp, JCI_PRECOMPUTED=os.path.join(tmp, "none.npz"))
+    results = []
+    for sessions in levels:
+        cmd = [sys.executable, os.path.abspath(__file__), "--worker", str(sessions), "--rounds", str(rounds),
+               "--think-ms", str(think_ms), "--seed", str(seed)]
+        out = subprocess.run(cmd, capture_output=True, text=True, cwd=PAGES, env=env)
+        if out.returncode != 0:
+            print(out.stderr, file=sys.stderr)
+            raise SystemExit(f"échec du niveau {sessions} sessions")
+        result = json.loads(out.stdout.strip().splitlines()[-1])
+        results.append(result)
+        print_level(result)
+    return {"commit": bench_backend._git_commit(), "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "data_dir": os.path.abspath(data_dir) if data_dir else None, "cpus": os.cpu_count(),
+            "params": {"rounds": rounds, "think_ms": think_ms, "seed": seed}, "results": results}
+
+def print_level(result):
+    print(f"\n{result['sessions']} session(s) × {result['rounds']} parcours : {result['reruns']} reruns en "
+          f"{result['wall_s']:.1f}s ({result['reruns_per_s']:.1f}/s), CPU {result['cpu_s']:.1f}s "
+          f"({result['cpu_utilisation']:.0%} d'un cœur, {result['cpu_per_session_ms']:.0f} ms par session)")
+    print(f"RSS {result['rss_base_mb']:.0f} -> {result['rss_end_mb']:.0f} Mo "
+          f"({result['rss_per_session_mb']:+.2f} Mo par session), pic {result['peak_rss_mb']:.0f} Mo")
+    print(f"{'interaction':<16} {'n':>5} {'p50 (ms)':>9} {'p95 (ms)':>9} {'p99 (ms)':>9} {'max (ms)':>9} {'CPU seul (ms)':>14}")
+    for name, s in [*result["interactions"].items(), ("tout", result["all"])]:
+        if s is None: continue
+        cpu = f"{s['cpu_ms']:>14.1f}" if s.get("cpu_ms") is not None else ""
+        print(f"{name:<16} {s['n']:>5} {s['p50']:>9.1f} {s['p95']:>9.1f} {s['p99']:>9.1f} {s['max']:>9.1f} {cpu}")
+    for error, count in result["errors"].items():
+        print(f"  ! {count} × {error}")
+
+def compare(path_a, path_b):
+    """p95 par interaction, CPU par session et croissance mémoire, B / A par niveau de concurrence."""
+    with open(path_a) as f: a = json.load(f)
+    with open(path_b) as f: b = json.load(f)
+    print(f"A = {a['commit']} ({a['timestamp']})   B = {b['commit']} ({b['timestamp']})")
+    ratio = lambda x, y: f"{y / x:>8.2f}x" if x else f"{'-':>9}"
+    print(f"{'sessions':>8} {'interaction':<16} {'p95 A':>9} {'p95 B':>9} {'B/A':>9}")
+    ref = {r["sessions"]: r for r in a["results"]}
+    for r in b["results"]:
+        old = ref.get(r["sessions"])
+        if old is None: continue
+        for name, s in [*r["interactions"].items(), ("tout", r["all"])]:
+            o = old["all"] if name == "tout" else old["interactions"].get(name)
+            if o is None or s is None: continue
+            print(f"{r['sessions']:>8} {name:<16} {o['p95']:>9.1f} {s['p95']:>9.1f} {ratio(o['p95'], s['p95'])}")
+        print(f"{r['sessions']:>8} {'CPU / session':<16} {old['cpu_per_session_ms']:>9.0f} {r['cpu_per_session_ms']:>9.0f} "
+              f"{ratio(old['cpu_per_session_ms'], r['cpu_per_session_ms'])}")
+        print(f"{r['sessions']:>8} {'Mo / session':<16} {old['rss_per_session_mb']:>9.2f} {r['rss_per_session_mb']:>9.2f}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 10, 50], help="niveaux de concurrence")
+    parser.add_argument("--rounds", type=int, default=1, help="parcours du scénario par session")
+    parser.add_argument("--think-ms", type=float, default=0, help="pause moyenne entre deux interactions (0 : enchaînées)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--data-dir", default=None, help="catalogue à servir (défaut : ../data de l'app)")
+    parser.add_argument("--out", default=None, help="fichier JSON (défaut : benchmarks/results/load-<commit>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("A.json", "B.json"))
+    parser.add_argument("--any-streamlit", action="store_true", help="sans vérifier la version de Streamlit (STREAMLIT_TESTED)")
+    parser.add_argument("--worker", type=int, metavar="SESSIONS", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if not (args.compare or args.worker or args.any_streamlit): check_streamlit()  # le worker hérite de l'interpréteur vérifié
+    if args.worker:
+        print(json.dumps(run_level(args.worker, args.rounds, args.think_ms, args.seed)))
+        return
+    if args.compare:
+        compare(*args.compare)
+        return
+    report = bench(args.sessions, args.rounds, args.think_ms, args.seed, args.data_dir)
+    out = args.out or os.path.join(RESULTS_DIR, f"load-{report['commit'] or 'local'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nRésultats : {out}")
+
+if __name__ == "__main__":
+    main()
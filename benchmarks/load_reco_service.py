@@ -0,0 +1,106 @@
+"""Générateur de charge du service de recommandation (pages/reco_service.py).
+
+Lance le service dans un sous-processus pour chaque réglage de lots (ou vise --url), puis, pour
+chaque niveau de concurrence, autant de threads clients (pool de connexions partagé, comme les
+sessions d'un worker Streamlit) envoient des graines tirées au hasard pendant --duration secondes.
+Rapporte le débit et les latences vues du client, et la taille moyenne des lots lue dans /metrics.
+
+    python benchmarks/load_reco_service.py [--data-dir /tmp/jci-data/synth-100000-0]
+        [--concurrency 1 4 16 64] [--duration 10] [--batching 1:0 64:1]
+
+--batching prend des couples max_batch:fenêtre_ms ; 1:0 = sans regroupement (une graine par produit).
+"""
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+import numpy as np
+import pandas as pd
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+PAGES = os.path.join(HERE, "..", "pages")
+sys.path.insert(0, PAGES)
+import reco_client  # noqa: E402
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def start_service(data_dir, max_batch, window_ms, pool_size, timeout=1800):
+    port = _free_port()
+    cmd = [sys.executable, "reco_service.py", "--port", str(port), "--max-batch", str(max_batch), "--window-ms", str(window_ms)]
+    if data_dir: cmd += ["--data-dir", os.path.abspath(data_dir)]
+    proc = subprocess.Popen(cmd, cwd=PAGES, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    client = reco_client.RecoClient(f"http://127.0.0.1:{port}", pool_size=pool_size, timeout=30)
+    t0 = time.perf_counter()
+    while time.perf_counter() - t0 < timeout:  # chargement du catalogue et des matrices
+        if proc.poll() is not None: raise SystemExit("le service s'est arrêté au démarrage")
+        try:
+            client.request("GET", "/health")
+            return proc, client
+        except OSError:
+            time.sleep(0.5)
+    proc.kill()
+    raise SystemExit("service non prêt à temps")
+
+def run_level(client, seeds, concurrency, duration, n, seed=0):
+    latencies, errors = [[] for _ in range(concurrency)], [0] * concurrency
+    stop = time.perf_counter() + duration
+
+    def worker(w):
+        rng = np.random.default_rng(seed + w)
+        while time.perf_counter() < stop:
+            s = seeds[rng.integers(len(seeds))]
+            t0 = time.perf_counter()
+            try: client.neighbours([s], n)
+            except Exception: errors[w] += 1; continue
+            latencies[w].append(time.perf_counter() - t0)
+
+    before = client.metrics()
+    t0 = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(w,)) for w in range(concurrency)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    elapsed = time.perf_counter() - t0
+    after = client.metrics()
+    ms = np.concatenate([np.asarray(l) for l in latencies]) * 1000
+    batches = after["batches"] - before["batches"]
+    return {"concurrency": concurrency, "requests": len(ms), "errors": sum(errors), "rps": len(ms) / elapsed,
+            "p50": float(np.percentile(ms, 50)), "p95": float(np.percentile(ms, 95)), "p99": float(np.percentile(ms, 99)),
+            "mean_batch": (after["seeds"] - before["seeds"]) / batches if batches else 0.0}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default=None, help="service déjà lancé (sinon démarré ici)")
+    parser.add_argument("--data-dir", default=None, help="catalogue servi (défaut : ../data)")
+    parser.add_argument("--batching", nargs="+", default=["1:0", "64:1"], help="max_batch:fenêtre_ms")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--n", type=int, default=10)
+    args = parser.parse_args()
+
+    data_dir = args.data_dir or os.path.join(PAGES, "..", "data")
+    seeds = pd.read_csv(os.path.join(data_dir, "movie.csv"), usecols=["tconst"])["tconst"].tolist()
+    settings = [None] if args.url else [tuple(map(float, b.split(":"))) for b in args.batching]
+    for setting in settings:
+        if setting is None:
+            proc, client = None, reco_client.RecoClient(args.url, pool_size=max(args.concurrency), timeout=30)
+            print(f"\nservice {args.url}")
+        else:
+            proc, client = start_service(args.data_dir, int(setting[0]), setting[1], max(args.concurrency))
+            print(f"\nmax_batch={int(setting[0])} fenêtre={setting[1]:g} ms ({len(seeds)} films)")
+        print(f"{'clients':>8} {'requêtes':>9} {'req/s':>8} {'p50 (ms)':>9} {'p95 (ms)':>9} {'p99 (ms)':>9} {'lot moyen':>10} {'erreurs':>8}")
+        try:
+            for c in args.concurrency:
+                r = run_level(client, seeds, c, args.duration, args.n)
+                print(f"{c:>8} {r['requests']:>9} {r['rps']:>8.1f} {r['p50']:>9.2f} {r['p95']:>9.2f} {r['p99']:>9.2f} "
+                      f"{r['mean_batch']:>10.1f} {r['errors']:>8}")
+        finally:
+            if proc is not None: proc.terminate(); proc.wait()
+
+if __name__ == "__main__":
+    main()
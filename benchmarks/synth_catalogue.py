@@ -0,0 +1,91 @@
+"""Générateur de catalogues synthétiques au schéma de data/ (movie.csv, intervenants.csv, intermediaire.csv).
+
+Les lignes sont tirées du vrai catalogue puis recombinées : identifiants neufs, mots-clés, synopsis
+et genres empruntés à des films différents (le TF-IDF garde un vocabulaire réaliste sans dupliquer
+les mêmes vecteurs), nombre de liens par film tiré de la distribution réelle et intervenants choisis
+selon une loi de Zipf (quelques têtes d'affiche très présentes). Les premières lignes reprennent le
+catalogue réel tel quel. Écriture par tranches : la mémoire reste bornée même à 1M de films.
+
+    python benchmarks/synth_catalogue.py --films 100000 --out /tmp/jci-100k [--seed 0]
+"""
+import argparse
+import os
+import numpy as np
+import pandas as pd
+
+DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data")
+CHUNK = 50000
+TEXT_COLUMNS = (["keywords"], ["movie_overview", "movie_overview_fr", "movie_tagline", "movie_tagline_fr"],
+                ["movie_genres_y"] + [c for i in range(1, 6) for c in (f"genre_id_{i}", f"genres_x_{i}")])
+
+def _read_template(data_dir):
+    # Lecture brute (sans conversion de type) : les valeurs sont réécrites à l'identique
+    read = lambda name: pd.read_csv(os.path.join(data_dir, name), dtype=str, keep_default_na=False)
+    return read("movie.csv"), read("intervenants.csv"), read("intermediaire.csv")
+
+def _write(df, path, first):
+    df.to_csv(path, mode="w" if first else "a", header=first, index=False)
+
+def _synth_rows(template, start, stop, rng, id_col, prefix, label_col):
+    """Lignes [start, stop) : copie du modèle pour i < len(modèle), recombinaison au-delà."""
+    n_real = len(template)
+    base = np.where(np.arange(start, stop) < n_real, np.arange(start, stop) % n_real, rng.integers(0, n_real, stop - start))
+    df = template.iloc[base].reset_index(drop=True)
+    synthetic = np.arange(start, stop) >= n_real
+    ids = np.char.add(prefix, np.char.zfill(np.arange(start, stop).astype(str), 8))
+    df[id_col] = np.where(synthetic, ids, df[id_col].to_numpy())
+    df[label_col] = np.where(synthetic, df[label_col].to_numpy() + " " + np.arange(start, stop).astype(str), df[label_col].to_numpy())
+    return df, synthetic
+
+def generate(n_films, out_dir, seed=0, data_dir=DATA):
+    """Écrit les trois CSV de n_films films dans out_dir ; renvoie le nombre de lignes de chaque fichier."""
+    rng = np.random.default_rng(seed)
+    movies, people, links = _read_template(data_dir)
+    os.makedirs(out_dir, exist_ok=True)
+    n_people = max(1, round(n_films * len(people) / len(movies)))
+    per_film = links.groupby("tconst").size().to_numpy()
+
+    for start in range(0, n_films, CHUNK):
+        stop = min(n_films, start + CHUNK)
+        df, synthetic = _synth_rows(movies, start, stop, rng, "tconst", "tt9", "title")
+        for cols in TEXT_COLUMNS:  # chaque famille de colonnes vient d'un autre film réel
+            donor = rng.integers(0, len(movies), int(synthetic.sum()))
+            df.loc[synthetic, cols] = movies.iloc[donor][cols].to_numpy()
+        df["Unnamed: 0"] = np.arange(start, stop).astype(str)
+        _write(df, os.path.join(out_dir, "movie.csv"), start == 0)
+
+    for start in range(0, n_people, CHUNK):
+        stop = min(n_people, start + CHUNK)
+        df, _ = _synth_rows(people, start, stop, rng, "nconst", "nm9", "intervenant_primaryName")
+        _write(df, os.path.join(out_dir, "intervenants.csv"), start == 0)
+
+    # Liens : ceux du catalogue réel pour ses films, puis un casting synthétique par film
+    real = links[links["tconst"].isin(movies["tconst"].iloc[:n_films]) & links["nconst"].isin(people["nconst"].iloc[:n_people])]
+    _write(real, os.path.join(out_dir, "intermediaire.csv"), True)
+    n_links = len(real)
+    zipf = np.cumsum(1.0 / np.arange(1, n_people + 1) ** 0.8)
+    zipf /= zipf[-1]
+    person_order = rng.permutation(n_people)  # le rang de popularité ne suit pas l'ordre du fichier
+    for start in range(len(movies), n_films, CHUNK):
+        stop = min(n_films, start + CHUNK)
+        counts = rng.choice(per_film, stop - start)
+        film = np.repeat(np.arange(start, stop), counts)
+        person = person_order[np.minimum(np.searchsorted(zipf, rng.random(len(film))), n_people - 1)]
+        pairs = np.unique(np.stack([film, person], axis=1), axis=0)
+        nconst = np.where(pairs[:, 1] < len(people), people["nconst"].to_numpy()[np.minimum(pairs[:, 1], len(people) - 1)],
+                          np.char.add("nm9", np.char.zfill(pairs[:, 1].astype(str), 8)))
+        chunk = pd.DataFrame({"tconst": np.char.add("tt9", np.char.zfill(pairs[:, 0].astype(str), 8)), "nconst": nconst})
+        _write(chunk, os.path.join(out_dir, "intermediaire.csv"), False)
+        n_links += len(chunk)
+    return {"movie": n_films, "intervenants": n_people, "intermediaire": n_links}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--films", type=int, required=True)
+    parser.add_argument("--out", required=True)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    print(generate(args.films, args.out, args.seed))
+
+if __name__ == "__main__":
+    main()
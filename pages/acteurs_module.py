@@ -1,49 +1,95 @@
 import streamlit as st
+import numpy as np
 import pandas as pd
+from utils import get_poster_url
+import backend, cards, cast_index, profiler, search_index, separation, thumbnails
 
-DEFAULT_USER_IMG = "https://cdn-icons-png.flaticon.com/512/149/149071.png"
+SEARCH_RESULTS = 6
+COLLABORATORS = 6
+TOP_TALENTS = 24
+
+@st.cache_resource(max_entries=2)
+def top_positions(version, _df_actors, n=TOP_TALENTS):
+    """Positions des n talents les plus populaires, par popularité décroissante (calculées une fois par version)."""
+    pop = np.nan_to_num(pd.to_numeric(_df_actors['tmdb_popularity'], errors="coerce").to_numpy(float), nan=-np.inf)
+    top = np.argpartition(-pop, n)[:n] if len(pop) > n else np.arange(len(pop))
+    return top[np.argsort(-pop[top], kind="stable")]
 
 def translate_profession(prof):
     if not isinstance(prof, str): return ""
     trad = {"actor": "Acteur", "actress": "Actrice", "director": "Réalisateur", "writer": "Scénariste", "producer": "Producteur"}
     return ", ".join([trad.get(p.strip().lower(), p.capitalize()) for p in prof.split(",")])
 
+def open_search_hit(nconst):
+    # Callback : la saisie peut encore être vidée avant que le widget ne soit redessiné
+    st.session_state.detail_actor_id = nconst
+    st.session_state.actor_search_q = ""
+
+def set_detail(nconst):
+    st.session_state.detail_actor_id = nconst
+
+def frequent_collaborators(nconst, df_actors, df_links, index=None, n=COLLABORATORS):
+    """[(ligne du talent, films en commun), ...] : les partenaires les plus fréquents de nconst."""
+    if index is not None:
+        return [(df_actors.iloc[pos], shared) for pos, shared in cast_index.collaborators(index, nconst, n)]
+    films = df_links.loc[df_links['nconst'] == nconst, 'tconst']
+    partners = df_links[df_links['tconst'].isin(films) & (df_links['nconst'] != nconst)].drop_duplicates()
+    shared = df_actors['nconst'].map(partners['nconst'].value_counts()).fillna(0).reset_index(drop=True)
+    top = shared[shared > 0].sort_values(ascending=False, kind="stable").head(n)  # à égalité : ordre de df_people
+    return [(df_actors.iloc[pos], int(c)) for pos, c in top.items()]
+
+def chain_labels(path, index, df_movies):
+    """Libellés d'un chemin de separation : noms des talents, titres (année) des films."""
+    labels = []
+    for kind, node in path:
+        if kind == separation.PERSON:
+            labels.append(f"**{index['names'][node]}**")
+        else:
+            movie = df_movies.iloc[index['movie_pos'][node]]
+            year = pd.to_numeric(movie.get('movie_startYear'), errors="coerce")
+            labels.append(f"*{movie['display_title']} ({int(year)})*" if pd.notna(year) and year > 0 else f"*{movie['display_title']}*")
+    return labels
+
+# Fragment : recherche, fiches et collaborateurs ne relancent que cette fonction
+@st.fragment
+@profiler.fragment("acteurs")
 def show_acteurs():
     df_actors = st.session_state.get('df_people')
     df_links = st.session_state.get('df_link')
     df_movies = st.session_state.get('df_movie')
+    index = st.session_state.get('cast_index')
 
     st.markdown("<h1 style='text-align:center; margin-bottom:30px;'> TALENTS DU CINÉMA</h1>", unsafe_allow_html=True)
 
-    all_names = sorted(df_actors['person_name'].dropna().unique().tolist())
-    def on_actor_change():
-        if st.session_state.actor_search_key:
-            found = df_actors[df_actors['person_name'] == st.session_state.actor_search_key]
-            if not found.empty: 
-                # On utilise nconst de manière sécurisée
-                st.session_state.detail_actor_id = found.iloc[0].get('nconst')
-
-    st.selectbox("Chercher un talent", options=[""] + all_names, index=0, key="actor_search_key", on_change=on_actor_change, label_visibility="collapsed")
+    query = st.text_input("Chercher un talent", key="actor_search_q", placeholder="Nom, même approximatif", label_visibility="collapsed")
+    if query.strip():
+        with profiler.section("acteurs.search"):
+            hits = search_index.search(st.session_state['search_index']['people'], query, n=SEARCH_RESULTS)
+        if not hits: st.caption("Aucun talent approchant.")
+        for pos, _ in hits:
+            person = df_actors.iloc[pos]
+            label = f"{person['person_name']} · {translate_profession(person.get('person_professions'))}".rstrip(" ·")
+            st.button(label, key=f"as_{pos}", use_container_width=True, on_click=open_search_hit, args=(person.get('nconst'),))
 
     detail_id = st.session_state.get('detail_actor_id')
 
     if detail_id:
-        actor_rows = df_actors[df_actors['nconst'] == detail_id]
+        if index is not None:
+            pos = index['person_pos'].get(detail_id)
+            actor_rows = df_actors.iloc[[] if pos is None else [pos]]
+        else:
+            actor_rows = df_actors[df_actors['nconst'] == detail_id]
         if actor_rows.empty:
             st.error("Profil non trouvé.")
-            if st.button("⬅ RETOUR"): st.session_state.detail_actor_id = None; st.rerun()
+            st.button("⬅ RETOUR", on_click=set_detail, args=(None,))
             return
             
         actor = actor_rows.iloc[0]
-        if st.button("⬅ RETOUR"):
-            st.session_state.detail_actor_id = None
-            st.rerun()
+        st.button("⬅ RETOUR", on_click=set_detail, args=(None,))
 
         col_img, col_info = st.columns([1, 2.5], gap="large")
         with col_img:
-            img = actor.get('tmdb_profile_url')
-            img = img if pd.notna(img) and str(img).lower() not in ["nan", ""] else DEFAULT_USER_IMG
-            st.image(img, use_container_width=True)
+            st.image(thumbnails.image(actor.get('tmdb_profile_url'), "detail", "profile"), use_container_width=True)
             st.markdown(f"<h2 style='text-align:center;'>{actor['person_name']}</h2>", unsafe_allow_html=True)
 
         with col_info:
@@ -52,33 +98,67 @@ def show_acteurs():
             if pd.notna(birth) and birth != 0:
                 st.markdown(f"**Naissance :** {int(birth)}")
             
-            bio = actor.get('tmdb_biography_fr')
-            if pd.notna(bio) and str(bio).lower() not in ['nan', 'biographie non disponible.']:
+            with profiler.section("acteurs.biography"):
+                bio = backend.get_text("people", detail_id, 'tmdb_biography_fr')
+            if bio is not None and str(bio).lower() not in ['nan', 'biographie non disponible.']:
                 st.markdown("### Biographie")
                 st.write(bio)
 
             st.markdown("### 🎞️ Filmographie")
-            actor_films = df_links[df_links['nconst'] == detail_id]['tconst'].tolist()
-            if actor_films:
-                my_movies = df_movies[df_movies['tconst'].isin(actor_films)].head(12)
+            with profiler.section("acteurs.filmography"):
+                if index is not None:
+                    positions = cast_index.filmography_positions(index, detail_id)[:12]
+                else:
+                    actor_films = df_links[df_links['nconst'] == detail_id]['tconst'].tolist()
+                    positions = np.flatnonzero(df_movies['tconst'].isin(actor_films))[:12]
+            if len(positions):
                 cols_f = st.columns(4)
-                for i, (_, f) in enumerate(my_movies.iterrows()):
+                for i, (pos, tconst) in enumerate(zip(positions, df_movies['tconst'].iloc[positions])):
                     with cols_f[i % 4]:
-                        poster = f.get('movie_poster_url_fr') or "https://via.placeholder.com/300x450?text=Affiche+manquante"
-                        st.markdown(f'''<div class="movie-card-container"><img src="{poster}" class="movie-poster-img"></div>''', unsafe_allow_html=True)
-                        if st.button("DÉTAILS", key=f"act_f_{f['tconst']}", type="primary", use_container_width=True):
-                            st.session_state.detail_tconst = f['tconst']
+                        st.markdown(cards.poster(tconst, lambda: get_poster_url(df_movies.iloc[pos])), unsafe_allow_html=True)
+                        if st.button("DÉTAILS", key=f"act_f_{tconst}", type="primary", use_container_width=True):
+                            st.session_state.detail_tconst = tconst
                             st.session_state.current_page = "FILMS"
                             st.rerun()
+
+            with profiler.section("acteurs.collaborators"):
+                partners = frequent_collaborators(detail_id, df_actors, df_links, index)
+            if partners:
+                st.markdown("### 🤝 Collaborateurs fréquents")
+                cols_c = st.columns(COLLABORATORS)
+                for i, (person, shared) in enumerate(partners):
+                    with cols_c[i]:
+                        st.image(thumbnails.image(person.get('tmdb_profile_url'), "card", "profile"), use_container_width=True)
+                        st.markdown(f"<p style='text-align:center; font-weight:bold; font-size:0.8rem; margin-bottom:0;'>{person['person_name']}</p>"
+                                    f"<p style='text-align:center; color:#888; font-size:0.75rem;'>{shared} film{'s' if shared > 1 else ''} ensemble</p>", unsafe_allow_html=True)
+                        st.button("VOIR", key=f"collab_{person.get('nconst')}", type="primary", use_container_width=True,
+                                  on_click=open_search_hit, args=(person.get('nconst'),))
+
+        if index is not None:
+            st.markdown("### 🔗 Degrés de séparation")
+            other = st.text_input("Relier à un autre talent", key="separation_q", placeholder="Nom d'un autre talent, même approximatif")
+            if other.strip():
+                hits = search_index.search(st.session_state['search_index']['people'], other, n=1)
+                target = df_actors.iloc[hits[0][0]] if hits else None
+                if target is None: st.caption("Aucun talent approchant.")
+                elif target['nconst'] == detail_id: st.caption(f"{target['person_name']} : c'est le talent affiché.")
+                else:
+                    with profiler.section("acteurs.separation"):
+                        path = separation.shortest_path(index, separation.node(index, detail_id), separation.node(index, target['nconst']),
+                                                        films=separation.catalogue_films(index))
+                    if path is None:
+                        st.caption(f"Aucune chaîne d'au plus {separation.MAX_HOPS // 2} films du catalogue entre {actor['person_name']} et {target['person_name']}.")
+                    else:
+                        degrees = (len(path) - 1) // 2
+                        st.markdown(f"{degrees} degré{'s' if degrees > 1 else ''} de séparation avec **{target['person_name']}** :")
+                        st.markdown(" → ".join(chain_labels(path, index, df_movies)))
+                        st.button(f"VOIR {target['person_name'].upper()}", key="separation_go", on_click=set_detail, args=(target['nconst'],))
     else:
-        top_actors = df_actors.sort_values('tmdb_popularity', ascending=False).head(24)
+        with profiler.section("acteurs.top"):
+            top_actors = df_actors.iloc[top_positions(st.session_state.get('catalogue_version'), df_actors)]
         cols = st.columns(6)
-        for idx, (_, row) in enumerate(top_actors.iterrows()):
+        for idx, (nconst, name, photo) in enumerate(zip(top_actors['nconst'], top_actors['person_name'], top_actors['tmdb_profile_url'])):
             with cols[idx % 6]:
-                img = row.get('tmdb_profile_url')
-                img = img if pd.notna(img) and str(img).lower() not in ["nan", ""] else DEFAULT_USER_IMG
-                st.image(img, use_container_width=True)
-                st.markdown(f"<p style='text-align:center; font-weight:bold; font-size:0.8rem;'>{row['person_name']}</p>", unsafe_allow_html=True)
-                if st.button("VOIR", key=f"grid_{row.get('nconst')}", type="primary", use_container_width=True):
-                    st.session_state.detail_actor_id = row.get('nconst')
-                    st.rerun()
\ No newline at end of file
+                st.markdown(cards.talent(nconst, photo, name), unsafe_allow_html=True)
+                st.button("VOIR", key=f"grid_{nconst}", type="primary", use_container_width=True,
+                          on_click=set_detail, args=(nconst,))
@@ -1,14 +1,110 @@
+import logging
 import streamlit as st
+import numpy as np
 import pandas as pd
-import config, backend, acteurs_module, films_module
+import cards, config, backend, acteurs_module, films_module, profiler, reco_client, thumbnails
+
+RECO_ALL_N = 20
+RECO_POLL_S = 1  # attente du recommandeur construit en fond (backend.recommender)
+
+@st.cache_resource(max_entries=2)
+def featured_position(version, _df_movie):
+    """Film à l'affiche : le plus récent des films français hors animation (tri du catalogue une fois par version)."""
+    no_animation = ~_df_movie['movie_genres_y'].str.contains("Animation", na=False)
+    mask = (_df_movie['production_1_countries_name'] == "France") & no_animation
+    if not mask.any(): mask = no_animation
+    dates = _df_movie['movie_release_date'][mask].reset_index(drop=True)
+    return int(np.flatnonzero(mask)[dates.sort_values(ascending=False).index[0]])
+
+def set_show_all_recos(value):
+    st.session_state.show_all_recos = value
+
+@st.fragment
+@profiler.fragment("recommandations")
+def show_recommendations():
+    """Section recommandations de l'accueil : mode, sélection, cartes."""
+    df_movie, reco_data = st.session_state['df_movie'], st.session_state['reco_data']
+    st.markdown("<h2 style='text-align:center;'>VOS RECOMMANDATIONS</h2>", unsafe_allow_html=True)
+    mode = st.radio("Mode", ["UN FILM", "PLUSIEURS FILMS"], horizontal=True, key="home_reco_mode", label_visibility="collapsed")
+    # Le top 5 puis, à la demande, davantage de suggestions sans recalculer les scores
+    n_recos = RECO_ALL_N if st.session_state.show_all_recos else backend.RECO_N
+    recos = None
+
+    if mode == "UN FILM":
+        sel = st.selectbox("Basé sur un film que vous aimez :", reco_data['labels'], index=None, key="home_sel_box")
+        if sel:
+            with profiler.section("home.recommend"):
+                recos = reco_client.recommend_movies(sel, df_movie, reco_data, n=n_recos)  # service si JCI_RECO_URL, sinon local
+    else:
+        favs = st.multiselect("Basé sur vos films préférés :", reco_data['labels'], key="home_multi_box", placeholder="Choisir des films")
+        # Profil de session mis à jour par différence avec la sélection précédente
+        profile = st.session_state.setdefault('reco_profile', backend.new_profile())
+        with profiler.section("home.recommend"):
+            backend.sync_profile(profile, [backend.find_movie(f, reco_data) for f in favs], reco_data)
+            recos = backend.recommend_from_profile(profile, df_movie, reco_data, n=n_recos)
+
+    with profiler.section("home.cards"):
+        if recos:
+            top_5 = recos[:5]
+            others = recos[5:]
+
+            st.markdown("<h4 style='color:#D7001D;'>TOP 5 DES MEILLEURES CORRESPONDANCES</h4>", unsafe_allow_html=True)
+            cols_top = st.columns(5)
+            for i, f in enumerate(top_5):
+                with cols_top[i]:
+                    st.markdown(cards.poster(f['tconst'], f['poster_url']), unsafe_allow_html=True)
+                    if st.button("DÉTAILS", key=f"reco_{f['tconst']}", type="primary", use_container_width=True):
+                        st.session_state.update({'detail_tconst': f['tconst'], 'current_page': "FILMS"})
+                        st.rerun()
+
+            if not st.session_state.show_all_recos and len(others) > 0:
+                st.markdown("<br>", unsafe_allow_html=True)
+                st.button("VOIR TOUTES LES AUTRES SUGGESTIONS ↓", use_container_width=True, on_click=set_show_all_recos, args=(True,))
+
+            if st.session_state.show_all_recos:
+                st.markdown("<br><h4 style='color:#888;'>AUTRES SUGGESTIONS</h4>", unsafe_allow_html=True)
+                for row_idx in range(0, len(others), 5):
+                    row_items = others[row_idx : row_idx + 5]
+                    grid_cols = st.columns(5)
+                    for i, f in enumerate(row_items):
+                        with grid_cols[i]:
+                            st.markdown(cards.poster(f['tconst'], f['poster_url']), unsafe_allow_html=True)
+                            if st.button("DÉTAILS", key=f"reco_other_{f['tconst']}", type="primary", use_container_width=True):
+                                st.session_state.update({'detail_tconst': f['tconst'], 'current_page': "FILMS"})
+                                st.rerun()
+            
+                st.button("RÉDUIRE ↑", use_container_width=True, on_click=set_show_all_recos, args=(False,))
+
+@st.fragment(run_every=RECO_POLL_S)
+def recommendations_pending(version):
+    """Section recommandations tant que le recommandeur se construit : relance l'app dès qu'il est prêt."""
+    backend.warm_up(version=version)  # relance une construction en échec
+    if backend.recommender(version=version) is not None:
+        st.session_state.reco_ready = True
+        st.rerun()
+    st.markdown("<h2 style='text-align:center;'>VOS RECOMMANDATIONS</h2>", unsafe_allow_html=True)
+    st.info("⏳ Le moteur de recommandation se prépare, cette section s'affichera d'elle-même dans quelques secondes.")
 
 # --- INITIALISATION ---
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
 st.set_page_config(page_title="Just Creuse It", layout="wide", initial_sidebar_state="collapsed")
-df_movie, df_people, df_link = backend.load_data()
-reco_data = backend.build_recommender(df_movie)
-
-st.session_state.update({'df_movie': df_movie, 'df_people': df_people, 'df_link': df_link, 'reco_data': reco_data})
-config.inject_css()
+profiler.begin_run()
+# Version publiée (ingest.py) lue une fois par rerun : tout le rerun sert la même, la suivante au rerun d'après
+with profiler.section("catalogue_version"):
+    version = backend.catalogue_version()
+# Recommandeur construit en fond (JCI_WARMUP, lancé en fin de rerun) : None tant qu'il n'est pas prêt,
+# les pages et le reste de l'accueil s'affichent sans l'attendre
+with profiler.section("recommender"):
+    reco_data = backend.recommender(version=version)
+with profiler.section("load_catalogue", cache=True):
+    catalogue = backend.load_catalogue(version=version)
+df_movie = catalogue['df_movie']
+
+# Pages et section recommandations sont des fragments (st.fragment) : un widget à l'intérieur ne relance
+# que son fragment, qui relit ces clés ; changer de page passe par st.rerun() (rerun complet)
+st.session_state.update(catalogue, reco_data=reco_data, catalogue_version=version)
+with profiler.section("inject_css"):
+    config.inject_css()
 
 if 'current_page' not in st.session_state: st.session_state.current_page = "ACCUEIL"
 if 'show_all_recos' not in st.session_state: st.session_state.show_all_recos = False
@@ -59,17 +155,21 @@ with c_nav2:
 st.markdown('<hr style="margin-top:0; border-top: 1px solid rgba(255,255,255,0.05);">', unsafe_allow_html=True)
 
 # --- ROUTAGE ---
+profiler.set_page(st.session_state.current_page)
 if st.session_state.current_page == "ACTEURS": 
-    acteurs_module.show_acteurs()
+    with profiler.section("page.acteurs"):
+        acteurs_module.show_acteurs()
 elif st.session_state.current_page == "FILMS": 
-    films_module.show_films()
+    with profiler.section("page.films"):
+        films_module.show_films()
 else:
     # --- PAGE D'ACCUEIL ---
-    hero_img_64 = config.load_base64_image(config.BG_PATH)
-    if hero_img_64:
+    with profiler.section("home.hero_image"):
+        hero_css = config.hero_background_css()
+    if hero_css:
         st.markdown(f'''
-            <div class="hero-container" style="background-image: linear-gradient(rgba(0,0,0,0.3), rgba(0,0,0,0.3)), url('data:image/jpeg;base64,{hero_img_64}'); 
-                        height:400px; background-size:cover; background-position:center; 
+            <style>{hero_css}</style>
+            <div class="hero-container" style="height:400px; background-size:cover; background-position:center; 
                         border-radius:20px; border: 1px solid rgba(255,255,255,0.1); 
                         margin-bottom:40px; display:flex; flex-direction:column; 
                         align-items:flex-end; justify-content:center; padding-right:60px; color:white;">
@@ -80,15 +180,8 @@ else:
         ''', unsafe_allow_html=True)
 
     # --- SÉLECTION FILTRÉE : FILM FRANÇAIS (SANS ANIMATION) ---
-    df_fr = df_movie[
-        (df_movie['production_1_countries_name'] == "France") & 
-        (~df_movie['movie_genres_y'].str.contains("Animation", na=False))
-    ]
-    
-    if df_fr.empty:
-        df_fr = df_movie[~df_movie['movie_genres_y'].str.contains("Animation", na=False)]
-    
-    featured_movie = df_fr.sort_values(by='movie_release_date', ascending=False).iloc[0]
+    with profiler.section("home.featured"):
+        featured_movie = df_movie.iloc[featured_position(version, df_movie)]
     
     st.markdown("<h3 style='color:#D7001D; text-transform:uppercase; letter-spacing:3px; margin-bottom:20px; font-size:1.1rem;'>À L'AFFICHE</h3>", unsafe_allow_html=True)
     
@@ -117,10 +210,10 @@ else:
                     </div>
                 </div>
                 <div style="display: flex; align-items: flex-start; gap: 18px; flex-grow: 1;">
-                    <img src="{featured_movie.get('movie_poster_url_fr')}" style="width: 110px; border-radius: 8px; flex-shrink: 0; box-shadow: 0 8px 20px rgba(0,0,0,0.5);">
+                    <img src="{thumbnails.src(featured_movie.get('movie_poster_url_fr'), "card")}" style="width: 110px; border-radius: 8px; flex-shrink: 0; box-shadow: 0 8px 20px rgba(0,0,0,0.5);">
                     <div style="flex: 1; overflow: hidden;">
                         <p style="color: #BBB; font-size: 0.9rem; line-height: 1.6; margin: 0; font-style: italic; opacity: 0.9;">
-                            "{str(featured_movie.get('movie_overview_fr', ''))[:250]}..."
+                            "{str(backend.get_text('movie', featured_movie['tconst'], 'movie_overview_fr') or '')[:250]}..."
                         </p>
                     </div>
                 </div>
@@ -134,41 +227,14 @@ else:
     st.markdown("<div style='height: 60px;'></div>", unsafe_allow_html=True)
 
     # --- SECTION RECOMMANDATIONS ---
-    st.markdown("<h2 style='text-align:center;'>VOS RECOMMANDATIONS</h2>", unsafe_allow_html=True)
-    sel = st.selectbox("Basé sur un film que vous aimez :", sorted(df_movie['display_title'].unique()), index=None, key="home_sel_box")
-    
-    if sel:
-        recos = backend.recommend_movies(sel, df_movie, reco_data)
-        top_5 = recos[:5]
-        others = recos[5:]
-
-        st.markdown("<h4 style='color:#D7001D;'>TOP 5 DES MEILLEURES CORRESPONDANCES</h4>", unsafe_allow_html=True)
-        cols_top = st.columns(5)
-        for i, f in enumerate(top_5):
-            with cols_top[i]:
-                st.markdown(f'''<div class="movie-card-container"><img src="{f['poster_url']}" class="movie-poster-img"></div>''', unsafe_allow_html=True)
-                if st.button("DÉTAILS", key=f"reco_{f['tconst']}", type="primary", use_container_width=True):
-                    st.session_state.update({'detail_tconst': f['tconst'], 'current_page': "FILMS"})
-                    st.rerun()
-
-        if not st.session_state.show_all_recos and len(others) > 0:
-            st.markdown("<br>", unsafe_allow_html=True)
-            if st.button("VOIR TOUTES LES AUTRES SUGGESTIONS ↓", use_container_width=True):
-                st.session_state.show_all_recos = True
-                st.rerun()
-
-        if st.session_state.show_all_recos:
-            st.markdown("<br><h4 style='color:#888;'>AUTRES SUGGESTIONS</h4>", unsafe_allow_html=True)
-            for row_idx in range(0, len(others), 5):
-                row_items = others[row_idx : row_idx + 5]
-                grid_cols = st.columns(5)
-                for i, f in enumerate(row_items):
-                    with grid_cols[i]:
-                        st.markdown(f'''<div class="movie-card-container"><img src="{f['poster_url']}" class="movie-poster-img"></div>''', unsafe_allow_html=True)
-                        if st.button("DÉTAILS", key=f"reco_other_{f['tconst']}", type="primary", use_container_width=True):
-                            st.session_state.update({'detail_tconst': f['tconst'], 'current_page': "FILMS"})
-                            st.rerun()
-            
-            if st.button("RÉDUIRE ↑", use_container_width=True):
-                st.session_state.show_all_recos = False
-                st.rerun()
\ No newline at end of file
+    if reco_data is None:
+        recommendations_pending(version)
+    else:
+        if st.session_state.pop('reco_ready', False): st.toast("✅ Recommandations prêtes")
+        show_recommendations()
+
+# Après le rendu : la construction du recommandeur ne dispute pas le CPU au premier affichage
+backend.warm_up(version=version)
+
+# --- DIAGNOSTICS (uniquement avec JCI_PROFILE=1 ou ?profile=1) ---
+profiler.render_panel(profiler.end_run(), extra={"timings": reco_data and reco_data.get("timings")})
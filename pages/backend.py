@@ -1,27 +1,212 @@
+import hashlib
+import logging
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
 import numpy as np
+from scipy import sparse
 import streamlit as st
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-from utils import build_text_features, get_poster_url
-
-@st.cache_data
-def load_data():
-    df_movie = pd.read_csv("../data/movie.csv")
-    df_people = pd.read_csv("../data/intervenants.csv").rename(columns={
+from utils import build_text_features_batch, get_poster_url, to_float
+import cast_index, facets, neighbours, profiler, recommender_cache, schema, search_index, similarity, snapshot, storage, text_store
+
+logger = logging.getLogger(__name__)
+
+SOURCE_KEYS = {"movie": ["tconst"], "people": ["nconst"], "link": ["tconst", "nconst"]}
+
+def new_rows(name, df, known):
+    """(lignes de df absentes de `known` selon leur identifiant, nombre de lignes écartées)."""
+    keys = SOURCE_KEYS[name]
+    if len(keys) == 1:
+        seen = df[keys[0]].isin(known[keys[0]])
+    else:
+        seen = pd.MultiIndex.from_frame(df[keys]).isin(pd.MultiIndex.from_frame(known[keys]))
+    return df[~seen].reset_index(drop=True), int(seen.sum())
+
+def read_sources(files):
+    """CSV bruts {'movie', 'people', 'link'} : ceux de base puis ceux des mises à jour, dans l'ordre.
+
+    Un film, un talent ou un lien déjà présent n'est pas réimporté par une mise à jour : les
+    lignes existantes ne changent jamais, seules des lignes s'ajoutent en fin de tableau.
+    """
+    frames = {}
+    for name, paths in files.items():
+        df = pd.read_csv(paths[0])
+        for path in paths[1:]:
+            df = pd.concat([df, new_rows(name, pd.read_csv(path), df)[0]], ignore_index=True)
+        frames[name] = df
+    return frames
+
+def prepare_frames(df_movie, df_people, df_link):
+    """Colonnes dérivées et schéma compact des CSV bruts (lignes traitées une à une : un lot de
+    nouvelles lignes donne le même résultat que le catalogue entier)."""
+    df_people = df_people.rename(columns={
         "intervenant_primaryName": "person_name", 
         "intervenant_primaryProfession": "person_professions"
     })
-    df_link = pd.read_csv("../data/intermediaire.csv")
+    df_movie['display_title'] = df_movie['title'].where(df_movie['title'].notna(), df_movie['movie_original_title'])
+    # Les homonymes (remakes...) sont conservés : build_title_index les départage
+    df_movie = df_movie.reset_index(drop=True)
     
-    df_movie['display_title'] = df_movie.apply(lambda r: r['title'] if pd.notna(r['title']) else r['movie_original_title'], axis=1)
-    df_movie = df_movie.drop_duplicates(subset=['display_title'])
-    
-    text_features = df_movie.apply(build_text_features, axis=1, result_type='expand')
-    df_movie["keywords_text"], df_movie["overview_text"], df_movie["genres_text"] = text_features[0], text_features[1], text_features[2]
-    return df_movie, df_people, df_link
+    text_features, stats = build_text_features_batch(df_movie)
+    if stats["keyword_parse_failures"]:
+        logger.warning("%d/%d blobs de mots-clés illisibles", stats["keyword_parse_failures"], stats["rows"])
+    df_movie = df_movie.assign(**text_features)
+    # Schéma compact (catégories, int32, float32, chaînes Arrow) : voir schema.py
+    return (schema.compact("movie", df_movie, snapshot.STRING_DTYPE), schema.compact("people", df_people, snapshot.STRING_DTYPE),
+            schema.compact("link", df_link, snapshot.STRING_DTYPE))
+
+def load_csv(data_dir=storage.DATA_DIR, deltas=None):
+    """Parse les CSV sources (base et mises à jour) et calcule les colonnes dérivées (chemin lent, sans snapshot)."""
+    frames = read_sources(snapshot.source_files(data_dir, deltas))
+    return prepare_frames(frames["movie"], frames["people"], frames["link"])
+
+def catalogue_version(data_dir=storage.DATA_DIR):
+    """Jeton de la version publiée (voir snapshot.catalogue_stamp), passé aux caches de l'app :
+    quand ingest.py publie, le rerun suivant de chaque session bascule d'un bloc sur la nouvelle."""
+    return snapshot.catalogue_stamp(data_dir)
+
+# cache_resource (et non cache_data) : on partage les DataFrames mappés au lieu de les dépickler à chaque rerun
+# version : seulement une clé de cache (catalogue_version) ; max_entries libère l'ancienne version après une bascule
+@st.cache_resource(max_entries=2)
+def load_data(data_dir=storage.DATA_DIR, version=None):
+    profiler.cache_miss("load_data")
+    t0 = time.perf_counter()
+    with profiler.section("backend.read_snapshot"):
+        frames = snapshot.read_snapshot(data_dir)
+    if frames is None:
+        # Un seul worker reconstruit le snapshot ; les autres relisent le sien une fois le verrou libéré
+        try:
+            with storage.file_lock(os.path.join(storage.CACHE_DIR, "snapshot.lock")):
+                frames = snapshot.read_snapshot(data_dir)
+                if frames is None:
+                    with profiler.section("backend.load_csv"):
+                        df_movie, df_people, df_link = load_csv(data_dir)
+                    snapshot.write_snapshot({"movie": df_movie, "people": df_people, "link": df_link}, data_dir)
+                    # On relit le snapshot pour servir la version mappée (partagée entre workers)
+                    frames = snapshot.read_snapshot(data_dir) or {"movie": df_movie, "people": df_people, "link": df_link}
+        except OSError:
+            logger.warning("Snapshot indisponible, lecture directe des CSV")
+            df_movie, df_people, df_link = load_csv(data_dir)
+            return text_store.split("movie", df_movie)[0], text_store.split("people", df_people)[0], df_link
+    logger.info("Catalogue chargé en %.3fs", time.perf_counter() - t0)
+    return frames["movie"], frames["people"], frames["link"]
+
+@st.cache_resource(max_entries=2)
+def load_text_store(data_dir=storage.DATA_DIR, version=None):
+    """Tables des textes volumineux, mappées depuis le snapshot (voir text_store)."""
+    profiler.cache_miss("load_text_store")
+    tables = snapshot.read_text(data_dir)
+    if tables is None:
+        # Sans snapshot (répertoire de cache inaccessible) : mêmes tables, construites en mémoire
+        df_movie, df_people, _ = load_csv(data_dir)
+        tables = {"movie": text_store.split("movie", df_movie)[1], "people": text_store.split("people", df_people)[1]}
+    return tables
+
+def get_text(kind, key, column, data_dir=storage.DATA_DIR):
+    """Texte volumineux d'un film (kind="movie", tconst) ou d'un talent ("people", nconst), lu à la demande."""
+    return text_store.get(load_text_store(data_dir, catalogue_version(data_dir)), kind, key, column)
+
+_LAST_CAST_INDEX = {}  # dernier index construit par ce process : point de départ après une bascule de version
+
+@st.cache_resource(max_entries=2)
+def build_cast_index(df_movie, df_people, df_link):
+    profiler.cache_miss("build_cast_index")
+    previous = _LAST_CAST_INDEX.get("index")
+    index = cast_index.extend(previous, df_link, df_people, df_movie) if previous is not None else None
+    if index is None:
+        index = cast_index.build_cast_index(df_link, df_people, df_movie)
+    _LAST_CAST_INDEX["index"] = index
+    return index
+
+@st.cache_resource(max_entries=2)
+def build_facet_index(df_movie):
+    profiler.cache_miss("build_facet_index")
+    return facets.build_facet_index(df_movie)
+
+@st.cache_resource(max_entries=2)
+def build_search_indexes(df_movie, df_people):
+    """Index de recherche des films (titre affiché et original) et des talents ; cibles = positions."""
+    profiler.cache_miss("build_search_indexes")
+    n = len(df_movie)
+    titles = pd.concat([df_movie["display_title"], df_movie["movie_original_title"]]).fillna("").astype(str).tolist()
+    films = search_index.build_search_index(
+        titles, np.tile(to_float(df_movie["movie_popularity"]).to_numpy(float), 2), np.tile(np.arange(n), 2))
+    people = search_index.build_search_index(
+        df_people["person_name"].fillna("").astype(str).tolist(),
+        to_float(df_people["tmdb_popularity"]).to_numpy(float), np.arange(len(df_people)))
+    return {"films": films, "people": people}
 
-def get_movie_cast_info(tconst, df_link, df_people):
+# Clé = version seule : les build_* ci-dessus hachent leurs DataFrames à chaque appel (≈ 70 % du CPU
+# d'un rerun de l'app), ici une fois par version publiée. Le recommandeur est à part : voir recommender()
+@st.cache_resource(max_entries=2)
+def load_catalogue(data_dir=storage.DATA_DIR, version=None):
+    """Catalogue et index dérivés servis aux pages, sous les clés de st.session_state."""
+    profiler.cache_miss("load_catalogue")
+    with profiler.section("load_data", cache=True):
+        df_movie, df_people, df_link = load_data(data_dir, version=version)
+    with profiler.section("build_cast_index", cache=True):
+        cast_idx = build_cast_index(df_movie, df_people, df_link)
+    with profiler.section("build_facet_index", cache=True):
+        facet_idx = build_facet_index(df_movie)
+    with profiler.section("build_search_indexes", cache=True):
+        search_idx = build_search_indexes(df_movie, df_people)
+    return {'df_movie': df_movie, 'df_people': df_people, 'df_link': df_link,
+            'cast_index': cast_idx, 'facet_index': facet_idx, 'search_index': search_idx}
+
+# --- DÉMARRAGE NON BLOQUANT ---
+# JCI_WARMUP=background (défaut) : le recommandeur (et l'import de scikit-learn) se construit dans un
+# thread de fond lancé à la fin du premier rerun du process (warm_up), une fois la page affichée ; les
+# pages qui n'en ont pas besoin ne l'attendent pas. sync : chaque rerun l'attend, comme avant.
+WARMUP = os.environ.get("JCI_WARMUP", "background")
+_warmup_lock = threading.Lock()
+_warmups = OrderedDict()  # (data_dir, version) -> Future du recommandeur
+_warmup_pool = None
+
+def _warm_recommender(data_dir, version):
+    t0 = time.perf_counter()
+    df_movie, _, df_link = load_data(data_dir, version=version)
+    reco = build_recommender(df_movie, topk=TOPK, engine=ENGINE, version=version, df_link=df_link)
+    logger.info("Recommandeur prêt en %.3fs", time.perf_counter() - t0)
+    return reco
+
+def warm_up(data_dir=storage.DATA_DIR, version=None):
+    """Lance la construction du recommandeur de la version en fond, sauf si elle est faite ou en cours."""
+    global _warmup_pool
+    key = (data_dir, version)
+    with _warmup_lock:
+        future = _warmups.get(key)
+        if future is None:
+            if _warmup_pool is None: _warmup_pool = ThreadPoolExecutor(1, thread_name_prefix="warmup")
+            future = _warmups[key] = _warmup_pool.submit(_warm_recommender, data_dir, version)
+            while len(_warmups) > 2: _warmups.popitem(last=False)  # comme max_entries des caches
+    return future
+
+def recommender(data_dir=storage.DATA_DIR, version=None, wait=None):
+    """Recommandeur de la version s'il est prêt, None sinon (construction pas lancée ou en cours).
+
+    wait=True lance la construction si besoin et l'attend (défaut : JCI_WARMUP=sync). Une
+    construction en échec lève son exception ici, une fois : warm_up() la relance ensuite.
+    """
+    key = (data_dir, version)
+    if wait if wait is not None else WARMUP == "sync":
+        future = warm_up(data_dir, version)
+    else:
+        future = _warmups.get(key)
+        if future is None or not future.done(): return None
+    try:
+        return future.result()
+    except Exception:
+        with _warmup_lock:
+            if _warmups.get(key) is future: del _warmups[key]
+        raise
+
+def get_movie_cast_info(tconst, df_link, df_people, index=None):
+    if index is not None:
+        return cast_index.cast_info(index, tconst)
     merged = df_link[df_link['tconst'] == tconst].merge(df_people, on="nconst")
     reals = merged[merged['person_professions'].str.contains('director', na=False)]['person_name'].unique().tolist()
     actors = merged[merged['person_professions'].str.contains('actor|actress', na=False)].head(5)
@@ -30,20 +215,412 @@ def get_movie_cast_info(tconst, df_link, df_people):
         cast_list.append({"name": row['person_name'], "photo": row.get('tmdb_profile_url')})
     return reals, cast_list
 
-@st.cache_resource
-def build_recommender(df_movie):
-    tfidf_k = TfidfVectorizer(max_features=500, stop_words='english')
-    k_mat = tfidf_k.fit_transform(df_movie["keywords_text"])
-    tfidf_g = TfidfVectorizer(max_features=50)
-    g_mat = tfidf_g.fit_transform(df_movie["genres_text"])
-    return {"keywords_matrix": k_mat, "genres_matrix": g_mat}
-
-def recommend_movies(movie_title, df_movie, recommender_data):
-    matches = df_movie[df_movie["display_title"].str.lower() == movie_title.lower()]
-    if matches.empty: return None
-    idx = matches.index[0]
-    sim_k = cosine_similarity(recommender_data["keywords_matrix"][idx], recommender_data["keywords_matrix"])[0]
-    sim_g = cosine_similarity(recommender_data["genres_matrix"][idx], recommender_data["genres_matrix"])[0]
-    score = (0.35 * sim_k + 1.0 * sim_g) / 1.35
-    indices = np.argsort(score)[::-1][1:11]
-    return [{**df_movie.iloc[i].to_dict(), "score_sim": score[i]*100, "poster_url": get_poster_url(df_movie.iloc[i])} for i in indices]
\ No newline at end of file
+# Réglages de déploiement : JCI_TOPK=0 désactive la table top-K (construction quadratique),
+# JCI_SIMILARITY_ENGINE=exact|svd|lsh choisit un moteur d'index pour les gros catalogues.
+TOPK = int(os.environ.get("JCI_TOPK", 50))
+ENGINE = os.environ.get("JCI_SIMILARITY_ENGINE") or None
+PRECOMPUTED_PATH = os.environ.get("JCI_PRECOMPUTED", os.path.join(storage.CACHE_DIR, "precomputed.npz"))
+RECO_N = 10
+SCORE_CACHE_SIZE = 32
+# Poids des canaux de similarité (configurables via build_recommender(weights=...)) ;
+# "cast" : talents en commun (matrice d'incidence de intermediaire.csv), actif si df_link est fourni
+DEFAULT_WEIGHTS = {"keywords": 0.35, "genres": 1.0, "overview": 0.5, "cast": 0.5}
+KEYWORDS_TFIDF = {"max_features": 500, "stop_words": "english"}
+GENRES_TFIDF = {"max_features": 50}
+OVERVIEW_DIMS = 100
+OVERVIEW_PREFIX = "overview-lsa-"
+OVERVIEW_TFIDF = {"max_features": 20000, "min_df": 2, "max_df": 0.5, "sublinear_tf": True}
+
+def normalize_title(title):
+    return " ".join(str(title).split()).lower()
+
+def build_title_index(df_movie):
+    """Index titre normalisé -> positions, et libellés uniques pour les listes de choix.
+
+    Les homonymes sont rangés par popularité décroissante sous leur titre, et chacun reçoit
+    en plus un libellé « titre (année) » qui le désigne sans ambiguïté.
+    """
+    popularity = to_float(df_movie["movie_popularity"]).fillna(0).to_numpy()
+    years = df_movie["movie_startYear"].tolist()
+    index = {}
+    for pos, title in enumerate(df_movie["display_title"].tolist()):
+        index.setdefault(normalize_title(title), []).append(pos)
+    labels = []
+    for key, positions in list(index.items()):
+        positions.sort(key=lambda i: -popularity[i])
+        title = df_movie["display_title"].iat[positions[0]]
+        if len(positions) == 1:
+            labels.append(title)
+            continue
+        for pos in positions:
+            label = f"{df_movie['display_title'].iat[pos]} ({years[pos]})"
+            index.setdefault(normalize_title(label), []).append(pos)
+            labels.append(label)
+    return index, sorted(labels)
+
+def _weighted_channels(recommender_data, dense):
+    weights = {c: w for c, w in recommender_data["weights"].items() if w}
+    total = sum(weights.values())
+    return [np.sqrt(w / total) * recommender_data[f"{c}_matrix"] for c, w in weights.items()
+            if sparse.issparse(recommender_data[f"{c}_matrix"]) != dense]
+
+def scoring_matrix(recommender_data):
+    """Canaux creux concaténés et pondérés : X[i] @ X.T + E[i] @ E.T (E = scoring_dense) redonne le score combiné."""
+    if "scoring_matrix" in recommender_data: return recommender_data["scoring_matrix"]
+    blocks = _weighted_channels(recommender_data, dense=False)
+    if not blocks:  # canaux tous denses
+        return sparse.csr_matrix((scoring_dense(recommender_data).shape[0], 0), dtype=np.float32)
+    return sparse.hstack(blocks, format="csr")
+
+def scoring_dense(recommender_data):
+    """Canaux denses pondérés (LSA des synopsis), None sans eux. Gardés hors de X : un bloc dense
+    dans la matrice creuse donnerait un score non nul à chaque paire de films, et des produits
+    creux à résultat dense ; E[lignes] @ E.T est un produit dense (BLAS) ajouté aux scores creux."""
+    if "scoring_dense" in recommender_data: return recommender_data["scoring_dense"]
+    blocks = _weighted_channels(recommender_data, dense=True)
+    return np.hstack(blocks).astype(np.float32) if blocks else None
+
+def _catalogue_key(df_movie, *params):
+    h = hashlib.sha256(repr(params).encode())
+    h.update(pd.util.hash_pandas_object(df_movie[["tconst", "keywords_text", "genres_text", "overview_text"]], index=False).values.tobytes())
+    return h.hexdigest()
+
+def _links_key(df_link, weights):
+    # Paramètre de clé du canal casting : empreinte des liens (rien sans ce canal, clés inchangées)
+    if not weights.get("cast"): return ()
+    return (hashlib.sha256(pd.util.hash_pandas_object(df_link[["tconst", "nconst"]], index=False).values.tobytes()).hexdigest(),)
+
+def _cast_weights(weights, df_link):
+    weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+    if df_link is None: weights["cast"] = 0  # sans table de liens, pas de canal casting
+    return weights
+
+def build_cast_matrix(df_movie, df_link):
+    """Canal casting : incidence films × talents (cast_index.incidence_matrix), lignes normalisées.
+
+    Le produit scalaire de deux lignes est le cosinus de leurs génériques (talents en commun
+    rapportés à la taille des deux) : X[i] @ X.T donne tous les scores en un produit creux.
+    """
+    from sklearn.preprocessing import normalize
+    return normalize(cast_index.incidence_matrix(df_link, df_movie)).astype(np.float32)
+
+def _overview_texts(texts):
+    return ["" if t == "nan" else t for t in texts]  # str(NaN) produit par build_text_features
+
+def overview_cache_path(texts, n_components=OVERVIEW_DIMS):
+    """Chemin (sans extension) de l'embedding des synopsis `texts` : .npy (embedding), .pkl (TF-IDF et SVD ajustés)."""
+    h = hashlib.sha256(repr(("lsa", n_components, OVERVIEW_TFIDF)).encode())
+    for t in texts: h.update(t.encode() + b"\0")
+    return os.path.join(storage.CACHE_DIR, f"{OVERVIEW_PREFIX}{h.hexdigest()[:16]}")
+
+def prune_caches(cache_dir=storage.CACHE_DIR, keep=storage.KEEP_VERSIONS):
+    """Caches fichiers écrits par version (embeddings des synopsis, tables top-K) : garde les `keep` dernières clés."""
+    return storage.prune_files(cache_dir, OVERVIEW_PREFIX, keep) + storage.prune_files(cache_dir, neighbours.PREFIX, keep)
+
+def build_overview_embedding(texts, n_components=OVERVIEW_DIMS, refit=False):
+    """Représentation LSA des synopsis : TF-IDF puis TruncatedSVD, lignes normalisées (float32).
+
+    Mise en cache sur disque (clé = textes + paramètres) : un redémarrage relit un .npy mappé.
+    Les modèles ajustés sont gardés à côté : extend_overview_embedding y projette les nouveaux films.
+    """
+    texts = _overview_texts(texts)
+    path = overview_cache_path(texts, n_components)
+    if not refit:
+        try:
+            return np.load(path + ".npy", mmap_mode="r"), True
+        except (OSError, ValueError):
+            pass
+    from sklearn.decomposition import TruncatedSVD
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.preprocessing import normalize
+    vectorizer = TfidfVectorizer(**OVERVIEW_TFIDF)
+    tfidf = vectorizer.fit_transform(texts)
+    n_components = max(1, min(n_components, tfidf.shape[1] - 1))
+    svd = TruncatedSVD(n_components=n_components, random_state=0)
+    emb = normalize(svd.fit_transform(tfidf)).astype(np.float32)
+    try:
+        storage.save_npy(path + ".npy", emb)
+        storage.save_pickle(path + ".pkl", (vectorizer, svd))
+    except OSError: logger.warning("Embedding des synopsis non persisté (%s)", path)
+    return emb, False
+
+def extend_overview_embedding(texts, start, n_components=OVERVIEW_DIMS):
+    """Embedding de `texts` à partir de celui des `start` premiers, nouveaux synopsis projetés dans la LSA figée.
+
+    Persisté sous la clé des nouveaux textes (build_overview_embedding le relit). None si
+    l'embedding précédent ou ses modèles ne sont pas sur disque.
+    """
+    texts = _overview_texts(texts)
+    previous = overview_cache_path(texts[:start], n_components)
+    try:
+        emb = np.load(previous + ".npy", mmap_mode="r")
+        with open(previous + ".pkl", "rb") as f:
+            vectorizer, svd = pickle.load(f)
+    except (OSError, ValueError, pickle.UnpicklingError, EOFError, AttributeError):
+        return None
+    from sklearn.preprocessing import normalize
+    added = normalize(svd.transform(vectorizer.transform(texts[start:]))).astype(np.float32)
+    emb = np.vstack([emb, added])
+    path = overview_cache_path(texts, n_components)
+    storage.save_npy(path + ".npy", emb)
+    storage.save_pickle(path + ".pkl", (vectorizer, svd))
+    return emb
+
+CHANNELS = (("keywords", "keywords_text", KEYWORDS_TFIDF), ("genres", "genres_text", GENRES_TFIDF))
+
+def fit_channels(df_movie):
+    """Ajuste les vectoriseurs TF-IDF des canaux mots-clés et genres (chemin lent, hors cache)."""
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    vectorizers, matrices, timings = {}, {}, {}
+    for channel, column, params in CHANNELS:
+        t0 = time.perf_counter()
+        vectorizers[channel] = TfidfVectorizer(**params)
+        matrices[channel] = vectorizers[channel].fit_transform(df_movie[column])
+        timings[channel] = time.perf_counter() - t0
+    # meta : base de la dérive mesurée par ingest.py (lignes ajoutées depuis, âge du modèle)
+    return {"vectorizers": vectorizers, "matrices": matrices, "timings": timings,
+            "meta": {"fitted_rows": len(df_movie), "fitted_at": time.time()}}
+
+def _fit_key(df_movie):
+    h = hashlib.sha256(repr((KEYWORDS_TFIDF, GENRES_TFIDF)).encode())
+    h.update(pd.util.hash_pandas_object(df_movie[["tconst", "keywords_text", "genres_text"]], index=False).values.tobytes())
+    return h.hexdigest()
+
+def _model_params(fitted):
+    # Date d'ajustement dans les clés des tables de voisins : un réajustement du même catalogue ne
+    # relit pas les listes de l'ancien modèle (absente des caches antérieurs : clés inchangées)
+    fitted_at = (fitted.get("meta") or {}).get("fitted_at")
+    return (fitted_at,) if fitted_at is not None else ()
+
+# version : clé de cache seulement (un réajustement publié par ingest.py garde le même catalogue)
+@st.cache_resource(max_entries=2)
+def build_recommender(df_movie, topk=None, engine=None, weights=None, version=None, refit=False, df_link=None):
+    """refit=True réajuste tout (vectoriseurs, LSA, table top-K) et remplace les caches disque.
+
+    df_link : table de liens films -> talents du canal casting (désactivé sans elle).
+    """
+    profiler.cache_miss("build_recommender")
+    weights = _cast_weights(weights, df_link)
+    t0 = time.perf_counter()
+    fitted, status = recommender_cache.load_or_fit(_fit_key(df_movie), lambda: fit_channels(df_movie), force=refit)
+    model = _model_params(fitted) + _links_key(df_link, weights)
+    k_mat, g_mat = fitted["matrices"]["keywords"], fitted["matrices"]["genres"]
+    timings = {"channels": time.perf_counter() - t0, "channels_cache": status, **fitted.get("timings", {})}
+    title_index, labels = build_title_index(df_movie)
+    reco = {"keywords_matrix": k_mat, "genres_matrix": g_mat, "vectorizers": fitted["vectorizers"],
+            "title_index": title_index, "labels": labels, "meta": fitted.get("meta", {}),
+            "weights": weights, "timings": {"build": timings, "query": {}},
+            "key": _catalogue_key(df_movie, weights, *model),
+            "score_cache": OrderedDict(), "score_lock": threading.Lock()}
+    if weights.get("overview"):
+        t0 = time.perf_counter()
+        reco["overview_matrix"], hit = build_overview_embedding(df_movie["overview_text"].tolist(), refit=refit)
+        timings["overview"] = time.perf_counter() - t0
+        timings["overview_cache_hit"] = hit
+    if weights.get("cast"):
+        # Pas d'ajustement : reconstruite à chaque chargement, en O(liens)
+        t0 = time.perf_counter()
+        reco["cast_matrix"] = build_cast_matrix(df_movie, df_link)
+        timings["cast"] = time.perf_counter() - t0
+    reco["scoring_matrix"], reco["scoring_dense"] = scoring_matrix(reco), scoring_dense(reco)
+    # Listes produites hors ligne par precompute.py (ignorées si le catalogue a changé depuis)
+    precomputed = neighbours.load_topk(PRECOMPUTED_PATH, df_movie["tconst"], key=reco["key"])
+    if precomputed is not None:
+        if "rows" not in precomputed and precomputed["k"] >= (topk or 0):
+            reco["topk"], topk = precomputed, None
+        else:
+            reco["precomputed"] = precomputed
+    if topk:
+        # Table des voisins pré-calculée (et persistée) : recommend_movies devient une lecture O(K)
+        path = neighbours.topk_path(_catalogue_key(df_movie, "topk", topk, weights, *model))
+        table = None if refit else neighbours.load_topk(path, df_movie["tconst"])
+        if table is None:
+            table = neighbours.build_topk(reco["scoring_matrix"], k=topk, E=reco["scoring_dense"])
+            try: neighbours.save_topk(table, path, df_movie["tconst"])
+            except OSError: logger.warning("Table top-K non persistée (%s)", path)
+        reco["topk"] = table
+    if engine:
+        reco["engine"] = similarity.build_engine(engine, reco["scoring_matrix"], reco["scoring_dense"])
+    return reco
+
+def extend_recommender(df_movie, start, topk=TOPK, weights=None, df_link=None, link_start=0):
+    """Persiste le recommandeur de df_movie à partir de celui de ses `start` premières lignes, sans réajuster.
+
+    Les lignes ajoutées sont vectorisées avec les vocabulaires figés (TF-IDF, LSA des synopsis) :
+    les vecteurs des films existants ne bougent pas, et seules les listes de voisins où entre un
+    nouveau film sont reprises (neighbours.patch_topk). build_recommender relit ensuite ces caches
+    comme après un ajustement. None si le modèle précédent n'est pas sur disque (réajuster alors).
+    df_link, link_start : liens du canal casting, dont les `link_start` premiers précèdent la mise à
+    jour ; None aussi si un nouveau lien touche un film existant (son vecteur casting change).
+    """
+    weights = _cast_weights(weights, df_link)
+    previous, added = df_movie.iloc[:start], df_movie.iloc[start:]
+    if weights.get("cast") and touches_existing_films(df_link, link_start, previous): return None
+    fitted = recommender_cache.read(_fit_key(previous))
+    if fitted is None: return None
+    model = _model_params(fitted)
+    old_links = _links_key(df_link.iloc[:link_start], weights) if weights.get("cast") else ()
+    new_links = _links_key(df_link, weights)
+    report = {"films": len(df_movie), "added": len(added), "meta": {"fitted_rows": start, **fitted["meta"]}}
+    if not len(added): return report
+    t0 = time.perf_counter()
+    vectorizers = fitted["vectorizers"]
+    reco = {"weights": weights}
+    for channel, column, _ in CHANNELS:
+        reco[f"{channel}_matrix"] = sparse.vstack([fitted["matrices"][channel], vectorizers[channel].transform(added[column])], format="csr")
+    if weights.get("overview"):
+        reco["overview_matrix"] = extend_overview_embedding(df_movie["overview_text"].tolist(), start)
+        if reco["overview_matrix"] is None: return None
+    if weights.get("cast"):
+        reco["cast_matrix"] = build_cast_matrix(df_movie, df_link)
+    recommender_cache.write(_fit_key(df_movie), {"vectorizers": vectorizers, "meta": report["meta"],
+                                                 "matrices": {c: reco[f"{c}_matrix"] for c, _, _ in CHANNELS}})
+    report["transform_seconds"] = time.perf_counter() - t0
+
+    X, E = scoring_matrix(reco), scoring_dense(reco)
+    tables = []
+    if topk:
+        tables.append((neighbours.topk_path(_catalogue_key(previous, "topk", topk, weights, *model, *old_links)),
+                       neighbours.topk_path(_catalogue_key(df_movie, "topk", topk, weights, *model, *new_links)), "", ""))
+    # Listes de precompute.py : corrigées elles aussi, sinon ignorées jusqu'à la tâche nocturne suivante
+    tables.append((PRECOMPUTED_PATH, PRECOMPUTED_PATH, _catalogue_key(previous, weights, *model, *old_links),
+                   _catalogue_key(df_movie, weights, *model, *new_links)))
+    for source, target, old_key, new_key in tables:
+        table = neighbours.load_topk(source, previous["tconst"], key=old_key)
+        if table is None:
+            if source == PRECOMPUTED_PATH: continue
+            table = neighbours.build_topk(X, k=topk, E=E)  # jamais construite : l'app l'aurait fait au démarrage
+        else:
+            table = neighbours.patch_topk(table, X, start, E=E)
+        neighbours.save_topk(table, target, df_movie["tconst"], key=new_key)
+        report.setdefault("tables", {})[os.path.basename(target)] = {
+            "rows": len(table["ids"]), "patched_rows": table.get("patched_rows"), "seconds": table["build_seconds"]}
+    return report
+
+def touches_existing_films(df_link, link_start, previous):
+    """Un lien ajouté après les `link_start` premiers vise-t-il un film de `previous` (déjà au catalogue) ?"""
+    return bool(df_link["tconst"].iloc[link_start:].isin(previous["tconst"]).any())
+
+def channel_scores(idx, recommender_data):
+    """Similarités du film idx par canal actif ; le temps de chaque canal va dans timings["query"]."""
+    from sklearn.metrics.pairwise import cosine_similarity
+    sims, timings = {}, {}
+    for channel, weight in recommender_data["weights"].items():
+        if not weight: continue
+        t0 = time.perf_counter()
+        mat = recommender_data[f"{channel}_matrix"]
+        sims[channel] = cosine_similarity(mat[idx], mat)[0] if sparse.issparse(mat) else mat @ mat[idx]
+        timings[channel] = time.perf_counter() - t0
+    recommender_data["timings"]["query"] = timings
+    return sims
+
+def _score_vector(idx, recommender_data):
+    # Scores exacts du film idx, mémorisés par graine : demander plus de résultats ne rescore pas
+    cache, lock = recommender_data["score_cache"], recommender_data["score_lock"]
+    with lock:
+        if idx in cache:
+            cache.move_to_end(idx)
+            return cache[idx]
+    sims = channel_scores(idx, recommender_data)
+    weights = recommender_data["weights"]
+    score = sum(weights[c] * s for c, s in sims.items()) / sum(weights[c] for c in sims)
+    with lock:
+        cache[idx] = score
+        while len(cache) > SCORE_CACHE_SIZE: cache.popitem(last=False)
+    return score
+
+def find_movie(movie_title, recommender_data):
+    """Position du film pour un titre ou un libellé « titre (année) » ; le plus populaire des homonymes."""
+    positions = recommender_data["title_index"].get(normalize_title(movie_title))
+    return positions[0] if positions else None
+
+def _neighbours(idx, recommender_data, n):
+    for key in ("precomputed", "topk"):
+        table = recommender_data.get(key)
+        if table is not None and n <= table["k"]:
+            found = neighbours.lookup(table, idx, n)
+            if found is not None: return found
+    engine = recommender_data.get("engine")
+    if engine is not None:
+        return engine.query(idx, n)
+    return similarity.top_n(_score_vector(idx, recommender_data), n, exclude=idx)
+
+def recommend_movies(movie_title, df_movie, recommender_data, n=RECO_N):
+    idx = find_movie(movie_title, recommender_data)
+    if idx is None: return None
+    indices, scores = _neighbours(idx, recommender_data, n)
+    return movie_rows(df_movie, indices, scores)
+
+def movie_rows(df_movie, indices, scores):
+    """Lignes de résultat des pages : colonnes du film + score_sim (en %) + poster_url."""
+    return [{**df_movie.iloc[i].to_dict(), "score_sim": s*100, "poster_url": get_poster_url(df_movie.iloc[i])} for i, s in zip(indices, scores)]
+
+def resolve_seeds(seeds, df_movie, recommender_data):
+    """Titres, libellés ou tconst -> positions dans df_movie (None pour une graine inconnue)."""
+    by_tconst = {t: i for i, t in enumerate(df_movie["tconst"].tolist())}
+    return [by_tconst[s] if s in by_tconst else find_movie(s, recommender_data) for s in seeds]
+
+def recommend_batch(seeds, df_movie, recommender_data, n=RECO_N, workers=0):
+    """Voisins de nombreuses graines en un produit creux par blocs : {graine: [(tconst, score_sim), ...]}."""
+    positions = resolve_seeds(seeds, df_movie, recommender_data)
+    known = [p for p in positions if p is not None]
+    table = neighbours.batch_topk(scoring_matrix(recommender_data), known, k=n, workers=workers,
+                                  E=scoring_dense(recommender_data))
+    tconsts = df_movie["tconst"].to_numpy()
+    rows = iter(zip(table["ids"], table["scores"]))
+    result = {}
+    for seed, pos in zip(seeds, positions):
+        if pos is None:
+            result[seed] = None
+            continue
+        ids, scores = next(rows)
+        result[seed] = [(tconsts[i], float(s) * 100) for i, s in zip(ids, scores)]
+    return result
+
+# --- PROFIL MULTI-FILMS ---
+# Le profil est la somme pondérée des lignes de la matrice de score des films choisis (partie creuse
+# et partie dense) : ajouter ou retirer un film met à jour ces vecteurs en O(nnz de la ligne + d).
+def new_profile():
+    return {"vector": None, "dense": None, "seeds": {}, "total": 0.0}
+
+def profile_add(profile, idx, recommender_data, weight=1.0):
+    X, E = scoring_matrix(recommender_data), scoring_dense(recommender_data)
+    if profile["vector"] is None or len(profile["vector"]) != X.shape[1]:
+        profile.update(vector=np.zeros(X.shape[1]), dense=None if E is None else np.zeros(E.shape[1]), seeds={}, total=0.0)
+    if idx in profile["seeds"]: profile_remove(profile, idx, recommender_data)
+    row = X[idx]
+    profile["vector"][row.indices] += weight * row.data
+    if E is not None: profile["dense"] += weight * E[idx]
+    profile["seeds"][idx] = weight
+    profile["total"] += weight
+
+def profile_remove(profile, idx, recommender_data):
+    weight = profile["seeds"].pop(idx, None)
+    if weight is None: return
+    row, E = scoring_matrix(recommender_data)[idx], scoring_dense(recommender_data)
+    profile["vector"][row.indices] -= weight * row.data
+    if E is not None: profile["dense"] -= weight * E[idx]
+    profile["total"] -= weight
+
+def sync_profile(profile, positions, recommender_data):
+    """Aligne le profil sur une sélection (liste de positions) par ajouts/retraits incrémentaux."""
+    wanted = {p for p in positions if p is not None}
+    if profile["vector"] is not None and (len(profile["vector"]) != scoring_matrix(recommender_data).shape[1]
+                                          or profile.get("key") != recommender_data["key"]):
+        profile.update(vector=None, dense=None, seeds={}, total=0.0)  # recommandeur reconstruit : on repart des graines
+    profile["key"] = recommender_data["key"]
+    for idx in [i for i in profile["seeds"] if i not in wanted]:
+        profile_remove(profile, idx, recommender_data)
+    for idx in wanted - profile["seeds"].keys():
+        profile_add(profile, idx, recommender_data)
+    return profile
+
+def recommend_from_profile(profile, df_movie, recommender_data, n=RECO_N):
+    """Un seul passage sur le catalogue : score moyen (pondéré) face aux graines, graines exclues."""
+    if not profile["seeds"] or profile["total"] <= 0: return None
+    score = scoring_matrix(recommender_data) @ (profile["vector"] / profile["total"])
+    E = scoring_dense(recommender_data)
+    if E is not None: score += E @ (profile["dense"] / profile["total"])
+    score[list(profile["seeds"])] = -np.inf
+    indices, scores = similarity.top_n(score, min(n, len(score) - len(profile["seeds"])))
+    return movie_rows(df_movie, indices, scores)
@@ -0,0 +1,61 @@
+"""HTML des cartes (affiches de films, talents, avatars du casting) mémorisé par identifiant.
+
+Une carte ne dépend que de son identifiant et de sa miniature : une fois la miniature locale en
+cache, le même HTML resert d'un rerun à l'autre et d'une session à l'autre, sans relire la ligne
+du DataFrame ni reformater la chaîne. Chaque resservice rafraîchit le mtime de la miniature
+(éviction LRU de thumbnails) ; si elle a disparu entre-temps, la carte est recalculée. Une carte
+dont l'image est encore l'URL distante (téléchargement en fond) n'est pas mémorisée : elle
+passera sur la miniature locale au rendu suivant.
+
+    cards.poster(tconst, lambda: get_poster_url(df_movie.iloc[pos]))   # URL calculée seulement hors cache
+"""
+import os
+import threading
+from collections import OrderedDict
+import thumbnails
+
+MAX_CARDS = 20_000
+
+_lock = threading.Lock()
+_cards = OrderedDict()  # (gabarit, identifiant, taille) -> (html, miniature locale ou None)
+
+def _memo(key, url, size, kind, render):
+    memo = key[1] is not None  # sans identifiant (talent inconnu du catalogue) : rendue, non mémorisée
+    with _lock:
+        hit = _cards.get(key) if memo else None
+        if hit is not None: _cards.move_to_end(key)
+    if hit is not None:
+        html, path = hit
+        if path is None: return html
+        try:
+            os.utime(path)
+            return html
+        except OSError: pass  # miniature évincée : on la redemande
+    src, path, final = thumbnails.resolve(url() if callable(url) else url, size, kind)
+    html = render(src)
+    if memo and final:
+        with _lock:
+            _cards[key] = (html, path)
+            while len(_cards) > MAX_CARDS: _cards.popitem(last=False)
+    return html
+
+def poster(tconst, url, size="card"):
+    """Carte d'affiche d'un film ; url : URL de l'affiche, ou fonction qui la renvoie."""
+    return _memo(("poster", tconst, size), url, size, "poster",
+                 lambda src: f'''<div class="movie-card-container"><img src="{src}" class="movie-poster-img"></div>''')
+
+def talent(nconst, url, name):
+    """Carte portrait + nom d'un talent (grille des plus populaires)."""
+    return _memo(("talent", nconst, "card"), url, "card", "profile", lambda src: f'''
+                <img src="{src}" style="width:100%; aspect-ratio:2/3; object-fit:cover; border-radius:8px;">
+                <p style="text-align:center; font-weight:bold; font-size:0.8rem;">{name}</p>
+            ''')
+
+def avatar(nconst, url, name):
+    """Vignette ronde d'un talent (casting de la fiche film)."""
+    return _memo(("avatar", nconst, "avatar"), url, "avatar", "profile", lambda src: f'''
+                        <div style="text-align:center; margin-bottom:10px;">
+                            <img src="{src}" style="width:85px; height:85px; object-fit:cover; border-radius:50%; border:2px solid #D7001D; margin-bottom:5px;">
+                            <p style="color:white; font-size:0.9rem; font-weight:bold; margin:0; line-height:1.1;">{name}</p>
+                        </div>
+                    ''')
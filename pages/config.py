@@ -1,11 +1,15 @@
 import streamlit as st
 import os
 import base64
+import functools
+import static_assets
 
 # --- CONSTANTES ---
 SITE_BG_URL = "https://images.unsplash.com/photo-1517604931442-7e0c8ed2963c?q=80&w=2070&auto=format&fit=crop"
 BG_PATH = "../assets/popcorn.jpg"
+HERO_OVERLAY = "linear-gradient(rgba(0,0,0,0.3), rgba(0,0,0,0.3))"
 
+@functools.lru_cache(maxsize=None)
 def load_base64_image(path):
     if not os.path.exists(path):
         return None
@@ -15,6 +19,16 @@ def load_base64_image(path):
     except Exception:
         return None
 
+def hero_background_css():
+    """CSS d'arrière-plan du bandeau d'accueil : variantes servies par URL, base64 (encodé une fois) en repli."""
+    urls = static_assets.image_urls(BG_PATH) if st.get_option("server.enableStaticServing") else None
+    if urls:
+        return static_assets.background_css(".hero-container", urls, HERO_OVERLAY)
+    hero_img_64 = load_base64_image(BG_PATH)
+    if hero_img_64:
+        return f".hero-container {{ background-image: {HERO_OVERLAY}, url('data:image/jpeg;base64,{hero_img_64}'); }}"
+    return None
+
 def inject_css():
     st.markdown(f"""
     <style>
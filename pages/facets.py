@@ -0,0 +1,73 @@
+"""Index de facettes de la bibliothèque, construit une fois au chargement.
+
+    genre_bits : uint64 par film, bit g levé si le film a le genre genres[g]
+    year       : int16 (0 si inconnue)
+    country    : int16, code dans countries (-1 si inconnu)
+    rating     : float32 (NaN si inconnue)
+    orders     : permutations pré-triées (popularité, note, date de sortie)
+
+Un filtre est une intersection de masques booléens sur ces tableaux et le tri un simple
+order[mask[order]] : ni copie de DataFrame ni tri à chaque rerun.
+"""
+import numpy as np
+import pandas as pd
+from utils import to_float
+
+SORTS = ("catalogue", "popularity", "rating", "date")
+
+def _desc_order(values):
+    # Tri décroissant stable, valeurs inconnues (NaN) en fin de liste
+    values = np.where(np.isnan(values), -np.inf, values)
+    return np.argsort(-values, kind="stable").astype(np.int32)
+
+def build_facet_index(df_movie):
+    n = len(df_movie)
+    # Index positionnel : l'explode rend directement la position du film
+    genre_lists = df_movie["movie_genres_y"].astype(object).fillna("").astype(str).str.split(",").reset_index(drop=True)
+    exploded = genre_lists.explode().str.strip()
+    exploded = exploded[exploded != ""]
+    genres = sorted(exploded.unique())
+    if len(genres) > 64:
+        raise ValueError(f"{len(genres)} genres : le masque uint64 en accepte 64 au plus")
+    rows = exploded.index.to_numpy()
+    bits = np.uint64(1) << pd.Index(genres).get_indexer(exploded).astype(np.uint64)
+    genre_bits = np.zeros(n, dtype=np.uint64)
+    np.bitwise_or.at(genre_bits, rows, bits)
+
+    country_codes, countries = pd.factorize(df_movie["production_1_countries_name"].str.strip(), sort=True)
+    release = pd.to_datetime(df_movie["movie_release_date"].astype(str).str[:10], errors="coerce")
+    release_days = ((release - pd.Timestamp("1970-01-01")).dt.days).to_numpy(float)
+    rating = to_float(df_movie["movie_vote_average_tmdb"]).to_numpy(np.float32)
+    popularity = to_float(df_movie["movie_popularity"]).to_numpy(float)
+    return {
+        "genres": genres, "genre_bits": genre_bits,
+        "year": pd.to_numeric(df_movie["movie_startYear"], errors="coerce").fillna(0).to_numpy(np.int16),
+        "countries": list(countries), "country": country_codes.astype(np.int16),
+        "rating": rating,
+        "orders": {"popularity": _desc_order(popularity), "rating": _desc_order(rating.astype(float)),
+                   "date": _desc_order(release_days)},
+    }
+
+def year_bounds(index):
+    known = index["year"][index["year"] > 0]
+    return (int(known.min()), int(known.max())) if len(known) else (0, 0)
+
+def filter_positions(index, genres=(), years=None, countries=(), min_rating=None, sort="catalogue"):
+    """Positions (dans df_movie) des films retenus, dans l'ordre de tri demandé."""
+    mask = np.ones(len(index["year"]), dtype=bool)
+    if genres:
+        want = np.uint64(0)
+        for g in genres:
+            want |= np.uint64(1) << np.uint64(index["genres"].index(g))
+        mask &= (index["genre_bits"] & want) == want  # tous les genres choisis
+    if years is not None:
+        mask &= (index["year"] >= years[0]) & (index["year"] <= years[1])
+    if countries:
+        codes = [index["countries"].index(c) for c in countries]
+        mask &= np.isin(index["country"], codes)
+    if min_rating:
+        mask &= index["rating"] >= min_rating  # NaN exclu
+    if sort == "catalogue":
+        return np.flatnonzero(mask)
+    order = index["orders"][sort]
+    return order[mask[order]]
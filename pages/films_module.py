@@ -1,11 +1,9 @@
 import streamlit as st
 import pandas as pd
 import math
+import numpy as np
 from utils import get_poster_url
-import backend
-
-DEFAULT_USER_IMG = "https://cdn-icons-png.flaticon.com/512/149/149071.png"
-DEFAULT_MOVIE_POSTER = "https://via.placeholder.com/600x900?text=Affiche+Indisponible"
+import backend, cards, facets, profiler, search_index, thumbnails
 
 # Dictionnaire de traduction des genres
 GENRE_TRADUCTION = {
@@ -17,7 +15,31 @@ GENRE_TRADUCTION = {
     "Romance": "Romance", "Sci-Fi": "Science-Fiction", "Sport": "Sport",
     "Thriller": "Thriller", "War": "Guerre", "Western": "Western"
 }
+GENRE_ORIGINAL = {fr: en for en, fr in GENRE_TRADUCTION.items()}
+
+SORT_LABELS = {"catalogue": "Catalogue", "popularity": "Popularité", "rating": "Note", "date": "Date de sortie"}
+SEARCH_RESULTS = 6
+
+def open_search_hit(tconst):
+    # Callback : la saisie peut encore être vidée avant que le widget ne soit redessiné
+    st.session_state.detail_tconst = tconst
+    st.session_state.movie_search_q = ""
+
+def set_detail(tconst):
+    st.session_state.detail_tconst = tconst
 
+def movie_position(tconst, df_movie, index=None):
+    """Position de tconst dans df_movie, None s'il n'y est plus (catalogue republié entre-temps)."""
+    if index is not None and "movie_pos" in index:
+        code = index["film_code"].get(tconst)
+        if code is not None: return int(index["movie_pos"][code]) if index["movie_pos"][code] >= 0 else None
+    # Film sans casting (absent de l'index) : parcours du catalogue
+    hits = np.flatnonzero(df_movie['tconst'].to_numpy() == tconst)
+    return int(hits[0]) if len(hits) else None
+
+# Fragment : filtres, pagination et passage bibliothèque <-> fiche ne relancent que cette fonction
+@st.fragment
+@profiler.fragment("films")
 def show_films():
     """Fonction principale appelée par app.py pour afficher la bibliothèque ou les détails."""
     df_movie = st.session_state.get('df_movie')
@@ -37,21 +59,23 @@ def show_films():
         )
 
         # --- VUE DÉTAILLÉE DU FILM ---
-        m = df_movie[df_movie['tconst'] == detail_id].iloc[0]
-        reals, casting = backend.get_movie_cast_info(m['tconst'], df_link, df_people)
+        with profiler.section("films.detail.lookup"):
+            pos = movie_position(detail_id, df_movie, st.session_state.get('cast_index'))
+        if pos is None:
+            st.error("Film non trouvé.")
+            st.button("⬅ RETOUR", on_click=set_detail, args=(None,))
+            return
+        m = df_movie.iloc[pos]
+        with profiler.section("films.detail.cast"):
+            reals, casting = backend.get_movie_cast_info(m['tconst'], df_link, df_people, st.session_state.get('cast_index'))
         
-        if st.button("⬅ RETOUR"):
-            st.session_state.detail_tconst = None
-            st.rerun()
+        st.button("⬅ RETOUR", on_click=set_detail, args=(None,))
 
         col1, col2 = st.columns([1, 2], gap="large")
         
         with col1: 
-            poster_url = get_poster_url(m)
-            if not poster_url or pd.isna(poster_url) or str(poster_url).strip() == "":
-                poster_url = DEFAULT_MOVIE_POSTER
-            
-            st.image(poster_url, use_container_width=True)
+            # Miniature locale (ou image de remplacement générée) plutôt que l'original TMDB
+            st.image(thumbnails.image(get_poster_url(m), "detail", "poster"), use_container_width=True)
             
             # --- AFFICHAGE DE LA NOTE ---
             note = m.get('movie_vote_average_tmdb')
@@ -59,7 +83,7 @@ def show_films():
                 st.markdown(f"""
                     <div style="background-color:#D7001D; border-radius:10px; padding:15px; text-align:center; margin-top:15px;">
                         <span style="font-size:1.4rem; font-weight:900; color:white; text-transform: uppercase;">
-                            NOTE : {note}/10
+                            NOTE : {f'{float(note):g}'.replace('.', ',')}/10
                         </span>
                     </div>
                 """, unsafe_allow_html=True)
@@ -80,7 +104,7 @@ def show_films():
                 </p>
             """, unsafe_allow_html=True)
             
-            st.markdown(f'''<div style="border-left:4px solid #D7001D; padding-left:15px; font-style:italic; margin-bottom:20px; font-size:1.1rem; color:white;">"{m.get("movie_overview_fr") or m.get("movie_overview") or "Résumé non disponible."}"</div>''', unsafe_allow_html=True)
+            st.markdown(f'''<div style="border-left:4px solid #D7001D; padding-left:15px; font-style:italic; margin-bottom:20px; font-size:1.1rem; color:white;">"{backend.get_text("movie", m['tconst'], "movie_overview_fr") or backend.get_text("movie", m['tconst'], "movie_overview") or "Résumé non disponible."}"</div>''', unsafe_allow_html=True)
             
             st.markdown(f"<p style='color:white;'><strong>Réalisation :</strong> {', '.join(reals)}</p>", unsafe_allow_html=True)
             
@@ -89,20 +113,9 @@ def show_films():
             c_cols = st.columns(4) 
             for i, act in enumerate(casting[:8]):
                 with c_cols[i % 4]:
-                    pic = act.get('photo')
-                    if not pic or pd.isna(pic) or str(pic).strip() == "" or str(pic).lower() == "nan":
-                        pic = DEFAULT_USER_IMG
-                    
-                    nom_acteur = act.get("name", "Inconnu")
-                    
-                    st.markdown(f'''
-                        <div style="text-align:center; margin-bottom:10px;">
-                            <img src="{pic}" style="width:85px; height:85px; object-fit:cover; border-radius:50%; border:2px solid #D7001D; margin-bottom:5px;">
-                            <p style="color:white; font-size:0.9rem; font-weight:bold; margin:0; line-height:1.1;">{nom_acteur}</p>
-                        </div>
-                    ''', unsafe_allow_html=True)
-                    
                     act_id = act.get('nconst') or act.get('nconst_x')
+                    st.markdown(cards.avatar(act_id, act.get('photo'), act.get("name", "Inconnu")), unsafe_allow_html=True)
+                    
                     if act_id:
                         if st.button("Voir fiche", key=f"c_{act_id}_{i}", use_container_width=True):
                             st.session_state.detail_actor_id = act_id
@@ -123,31 +136,27 @@ def show_films():
         st.markdown("<h1 style='text-align:center; color:white;'>BIBLIOTHÈQUE</h1>", unsafe_allow_html=True)
         
         # --- TITRES AU-DESSUS DES FILTRES (AVEC MARGIN-BOTTOM 10PX) ---
+        facet_idx = st.session_state.get('facet_index')
         c_search, c_genre, c_page = st.columns([1.2, 1.8, 0.8])
         
         with c_search:
             st.markdown("<p style='color:#D7001D; font-weight:bold; margin-bottom:10px;'>RECHERCHE TITRE</p>", unsafe_allow_html=True)
-            all_movie_names = sorted(df_movie['display_title'].dropna().unique().tolist())
             
-            def on_movie_search_change():
-                if st.session_state.movie_search_key:
-                    found = df_movie[df_movie['display_title'] == st.session_state.movie_search_key]
-                    if not found.empty:
-                        st.session_state.detail_tconst = found.iloc[0].get('tconst')
-
-            st.selectbox(
-                "Chercher un film", 
-                options=[""] + all_movie_names, 
-                index=0, 
-                key="movie_search_key", 
-                on_change=on_movie_search_change, 
-                label_visibility="collapsed"
-            )
-        
+            query = st.text_input("Chercher un film", key="movie_search_q", placeholder="Titre, même approximatif",
+                                  label_visibility="collapsed")
+            if query.strip():
+                with profiler.section("films.search"):
+                    hits = search_index.search(st.session_state['search_index']['films'], query, n=SEARCH_RESULTS)
+                if not hits: st.caption("Aucun titre approchant.")
+                for pos, _ in hits:
+                    m_hit = df_movie.iloc[pos]
+                    year = pd.to_numeric(m_hit.get('movie_startYear'), errors="coerce")
+                    label = f"{m_hit['display_title']} ({int(year)})" if pd.notna(year) and year > 0 else m_hit['display_title']
+                    st.button(label, key=f"ms_{pos}", use_container_width=True, on_click=open_search_hit, args=(m_hit.get('tconst'),))
+
         with c_genre:
             st.markdown("<p style='color:#D7001D; font-weight:bold; margin-bottom:10px;'>FILTRER PAR GENRES</p>", unsafe_allow_html=True)
-            genres_en = sorted(list(set([g.strip() for sl in df_movie['movie_genres_y'].dropna().str.split(',') for g in sl])))
-            genres_fr_dispo = sorted([GENRE_TRADUCTION.get(g, g) for g in genres_en])
+            genres_fr_dispo = sorted(GENRE_TRADUCTION.get(g, g) for g in facet_idx['genres'])
             
             genres_selectionnes_fr = st.multiselect(
                 "Genres", 
@@ -157,16 +166,30 @@ def show_films():
                 label_visibility="collapsed"
             )
 
-        # Calcul du filtrage
-        df_f = df_movie.copy()
-        if genres_selectionnes_fr:
-            for genre_fr in genres_selectionnes_fr:
-                genre_en_cible = [en for en, fr in GENRE_TRADUCTION.items() if fr == genre_fr]
-                if genre_en_cible:
-                    df_f = df_f[df_f['movie_genres_y'].str.contains(genre_en_cible[0], na=False)]
+        # --- FILTRES ANNÉE / PAYS / NOTE ET TRI ---
+        c_year, c_country, c_rating, c_sort = st.columns([1.4, 1.4, 1, 1])
+        y_min, y_max = facets.year_bounds(facet_idx)
+        y_max = max(y_max, y_min + 1)  # le slider exige un intervalle non vide
+        with c_year:
+            years = st.slider("Années", y_min, y_max, (y_min, y_max), key="lib_years")
+        with c_country:
+            pays = st.multiselect("Pays", facet_idx['countries'], placeholder="Tous les pays", key="lib_countries")
+        with c_rating:
+            note_min = st.slider("Note minimale", 0.0, 10.0, 0.0, 0.5, key="lib_rating")
+        with c_sort:
+            tri = st.selectbox("Trier par", list(SORT_LABELS), format_func=SORT_LABELS.get, key="lib_sort")
+
+        # Calcul du filtrage : intersection de masques sur l'index de facettes, sans copie du DataFrame
+        with profiler.section("films.library.filter"):
+            genres_en = [GENRE_ORIGINAL.get(g, g) for g in genres_selectionnes_fr]
+            positions = facets.filter_positions(
+                facet_idx, genres=genres_en,
+                years=None if years == (y_min, y_max) else years,
+                countries=pays, min_rating=note_min, sort=tri
+            )
 
         limit = 20
-        total_p = math.ceil(len(df_f)/limit) or 1
+        total_p = math.ceil(len(positions)/limit) or 1
 
         with c_page:
             st.markdown("<p style='color:#D7001D; font-weight:bold; margin-bottom:10px;'>PAGE</p>", unsafe_allow_html=True)
@@ -179,13 +202,9 @@ def show_films():
         start_idx = (p - 1) * limit
         end_idx = p * limit
         
-        for idx, (_, row) in enumerate(df_f.iloc[start_idx:end_idx].iterrows()):
+        # Carte mémorisée par tconst : la ligne du film n'est lue que si la carte n'est pas en cache
+        page = positions[start_idx:end_idx]
+        for idx, (pos, tconst) in enumerate(zip(page, df_movie['tconst'].iloc[page])):
             with grid[idx % 5]:
-                p_url = get_poster_url(row)
-                if not p_url or pd.isna(p_url) or str(p_url).strip() == "":
-                    p_url = DEFAULT_MOVIE_POSTER
-                
-                st.markdown(f'''<div class="movie-card-container"><img src="{p_url}" class="movie-poster-img"></div>''', unsafe_allow_html=True)
-                if st.button("DÉTAILS", key=f"f_{row['tconst']}", type="primary", use_container_width=True):
-                    st.session_state.detail_tconst = row['tconst']
-                    st.rerun()
\ No newline at end of file
+                st.markdown(cards.poster(tconst, lambda: get_poster_url(df_movie.iloc[pos])), unsafe_allow_html=True)
+                st.button("DÉTAILS", key=f"f_{tconst}", type="primary", use_container_width=True, on_click=set_detail, args=(tconst,))
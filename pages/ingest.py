@@ -0,0 +1,205 @@
+"""Ingestion des nouveautés (tâche quotidienne) sans réajuster tout le recommandeur.
+
+    python ingest.py ../inbox/2026-10-18             # movie.csv, intervenants.csv, intermediaire.csv (tout ou partie)
+    python ingest.py ../inbox/2026-10-18 --dry-run   # dérive et décision seulement, rien de publié
+    python ingest.py --refit                         # réajustement complet (tâche hebdomadaire)
+
+Une mise à jour n'ajoute que des lignes : films, talents et liens inconnus (une ligne déjà au
+catalogue est ignorée, comme dans load_csv). Les positions existantes ne bougent pas.
+Chemin incrémental :
+  1. lignes préparées comme dans load_csv (backend.prepare_frames) et ajoutées en fin de catalogue ;
+  2. vectorisées avec les vocabulaires figés, listes de voisins corrigées (backend.extend_recommender) ;
+  3. snapshot de la nouvelle version écrit sans relire les CSV de base (textes fusionnés) ;
+  4. la mise à jour, copiée dans data/updates/.<nom>, est renommée en data/updates/<nom>, puis le
+     marqueur ../cache/catalogue.json est réécrit : chaque session de l'app passe d'un bloc à la
+     nouvelle version à son rerun suivant, sans redémarrage (backend.catalogue_version) ;
+  5. embeddings des synopsis et tables top-K des versions plus anciennes supprimés (backend.prune_caches).
+Réajustement complet (build_recommender(refit=True)) avec --refit, quand le modèle a plus de
+REFIT_DAYS jours, quand le catalogue a grossi de plus de GROWTH_LIMIT depuis l'ajustement, ou quand
+la dérive du vocabulaire dépasse DRIFT_LIMIT : part des mots des films ajoutés depuis l'ajustement
+absents du vocabulaire figé, au-delà de celle mesurée sur les films ajustés eux-mêmes. Aussi quand
+une mise à jour ajoute des liens à des films déjà au catalogue : leur vecteur casting change.
+"""
+import argparse
+import logging
+import os
+import shutil
+import time
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import backend, schema, snapshot, storage, text_store
+
+logger = logging.getLogger(__name__)
+
+DRIFT_LIMIT = float(os.environ.get("JCI_DRIFT_LIMIT", 0.05))
+GROWTH_LIMIT = float(os.environ.get("JCI_GROWTH_LIMIT", 0.2))
+REFIT_DAYS = float(os.environ.get("JCI_REFIT_DAYS", 7))
+DRIFT_SAMPLE = 5000  # films ajustés tirés pour la part hors vocabulaire de référence
+
+# --- DÉRIVE ---
+def oov_share(vectorizer, texts):
+    """Part des mots de `texts` (découpés par l'analyseur du vectoriseur) absents de son vocabulaire."""
+    analyze, vocabulary = vectorizer.build_analyzer(), vectorizer.vocabulary_
+    total = known = 0
+    for text in texts:
+        tokens = analyze(text)
+        total += len(tokens)
+        known += sum(t in vocabulary for t in tokens)
+    return 1 - known / total if total else 0.0
+
+def vocabulary_drift(vectorizers, df_movie, fitted_rows):
+    """Par canal : part hors vocabulaire des films ajoutés depuis l'ajustement, moins celle des films ajustés."""
+    sample = np.sort(np.random.default_rng(0).choice(fitted_rows, min(fitted_rows, DRIFT_SAMPLE), replace=False))
+    drift = {}
+    for channel, column, _ in backend.CHANNELS:
+        added = df_movie[column].iloc[fitted_rows:].tolist()
+        if not added:
+            drift[channel] = 0.0
+            continue
+        baseline = oov_share(vectorizers[channel], df_movie[column].iloc[sample].tolist())
+        drift[channel] = oov_share(vectorizers[channel], added) - baseline
+    return drift
+
+def refit_reasons(meta, drift, n_films):
+    fitted_rows = meta.get("fitted_rows") or n_films
+    reasons = []
+    if n_films > fitted_rows * (1 + GROWTH_LIMIT):
+        reasons.append(f"catalogue +{n_films / fitted_rows - 1:.0%} depuis l'ajustement")
+    reasons += [f"dérive du vocabulaire {c} {d:+.1%}" for c, d in drift.items() if d > DRIFT_LIMIT]
+    fitted_at = meta.get("fitted_at")
+    if fitted_at and time.time() - fitted_at > REFIT_DAYS * 86400:
+        reasons.append(f"modèle ajusté il y a plus de {REFIT_DAYS:g} jours")
+    return reasons
+
+# --- NOUVELLE VERSION ---
+def read_update(update_dir, frames, data_dir=storage.DATA_DIR):
+    """Lignes nouvelles de la mise à jour, préparées comme par load_csv : {'movie', 'people', 'link'}."""
+    raw = {}
+    for name, filename in snapshot.SOURCES.items():
+        path = os.path.join(update_dir, filename)
+        if not os.path.exists(path):  # fichier absent : aucune ligne, colonnes du CSV de base
+            raw[name] = pd.read_csv(snapshot.source_paths(data_dir)[name], nrows=0)
+            continue
+        raw[name], known = backend.new_rows(name, pd.read_csv(path), frames[name])
+        if known: logger.warning("%s : %d ligne(s) déjà au catalogue ignorée(s)", filename, known)
+    return dict(zip(snapshot.SOURCES, backend.prepare_frames(raw["movie"], raw["people"], raw["link"])))
+
+def _merge_text(table, added):
+    """Table de textes triée par identifiant, complétée des lignes `added` (colonnes alignées)."""
+    if added is None or not added.num_rows: return table
+    columns = [added.column(c) if c in added.column_names else pa.nulls(added.num_rows, pa.large_string())
+               for c in table.column_names]
+    added = pa.table(columns, names=table.column_names)
+    merged = pa.concat_tables([table, added])
+    # Nouveaux identifiants tous après les anciens (cas courant) : déjà trié (split trie `added`)
+    if table.num_rows and added.column(0)[0].as_py() > table.column(0)[-1].as_py():
+        return merged
+    return merged.sort_by(table.column_names[0])
+
+def append_frames(frames, texts, added):
+    """DataFrames de la nouvelle version (lignes ajoutées en fin, schéma compact réappliqué) et textes fusionnés."""
+    new_frames, new_texts = {}, {}
+    for name, df in frames.items():
+        core, text = text_store.split(name, added[name])
+        merged = pd.concat([df, core], ignore_index=True) if len(core) else df
+        # Catégories réunies : concat d'un catégoriel et de nouvelles valeurs donne des objets
+        new_frames[name] = schema.compact(name, merged, snapshot.STRING_DTYPE)
+        if texts.get(name) is not None:
+            new_texts[name] = _merge_text(texts[name], text)
+    return new_frames, new_texts
+
+def _stage(update_dir, data_dir, name):
+    # Copie cachée (ignorée par snapshot.delta_dirs) jusqu'au renommage final
+    staging = os.path.join(data_dir, snapshot.UPDATES_DIR, f".{name}")
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+    for filename in snapshot.SOURCES.values():
+        if os.path.exists(os.path.join(update_dir, filename)):
+            shutil.copy2(os.path.join(update_dir, filename), os.path.join(staging, filename))
+    return staging
+
+def ingest(update_dir=None, data_dir=storage.DATA_DIR, name=None, refit=False, dry_run=False, topk=backend.TOPK):
+    """Publie la version suivante du catalogue ; renvoie un rapport (lignes, dérive, mode, durées)."""
+    t0 = time.perf_counter()
+    with storage.file_lock(os.path.join(storage.CACHE_DIR, "ingest.lock")):
+        deltas = snapshot.delta_dirs(data_dir)
+        df_movie, df_people, df_link = backend.load_data.__wrapped__(data_dir)
+        frames = {"movie": df_movie, "people": df_people, "link": df_link}
+        reco = backend.build_recommender.__wrapped__(df_movie, topk=topk, df_link=df_link)
+        report = {"films": len(df_movie), "added": {}}
+        name = name or time.strftime("%Y%m%d-%H%M%S")
+        texts = None
+        if update_dir:
+            if deltas and name <= os.path.basename(deltas[-1]):
+                raise SystemExit(f"Nom de mise à jour {name!r} : doit suivre {os.path.basename(deltas[-1])!r}")
+            added = read_update(update_dir, frames, data_dir)
+            report["added"] = {k: len(v) for k, v in added.items()}
+            if not any(report["added"].values()):
+                report["mode"] = "rien à ajouter"
+                return report
+            texts = snapshot.read_text(data_dir, deltas=deltas)
+            if texts is None: raise SystemExit("Snapshot du catalogue courant illisible")
+            frames, texts = append_frames(frames, texts, added)
+            report["read_seconds"] = time.perf_counter() - t0
+
+        df_new = frames["movie"]
+        meta = {"fitted_rows": len(df_movie), **reco["meta"]}
+        report["drift"] = vocabulary_drift(reco["vectorizers"], df_new, meta["fitted_rows"])
+        reasons = (["--refit"] if refit else []) + refit_reasons(meta, report["drift"], len(df_new))
+        if reco["weights"].get("cast") and backend.touches_existing_films(frames["link"], len(df_link), df_movie):
+            reasons.append("liens ajoutés à des films déjà au catalogue (canal casting)")
+        report.update(films=len(df_new), mode="réajustement" if reasons else "incrémental", reasons=reasons)
+        if dry_run: return report
+
+        staging = _stage(update_dir, data_dir, name) if update_dir else None
+        try:
+            t1 = time.perf_counter()
+            if not reasons:
+                report["recommender"] = backend.extend_recommender(df_new, len(df_movie), topk=topk,
+                                                                       df_link=frames["link"], link_start=len(df_link))
+                if report["recommender"] is None:
+                    reasons.append("modèle précédent absent du cache disque")
+                    report["mode"] = "réajustement"
+            if reasons:
+                report["recommender"] = backend.build_recommender.__wrapped__(df_new, topk=topk, refit=True, df_link=frames["link"])["timings"]["build"]
+            report["recommender_seconds"] = time.perf_counter() - t1
+            if staging:
+                snapshot.write_snapshot(frames, data_dir, deltas=deltas + [staging], texts=texts)
+                os.replace(staging, os.path.join(data_dir, snapshot.UPDATES_DIR, name))
+        except BaseException:
+            if staging: shutil.rmtree(staging, ignore_errors=True)
+            raise
+        # Dernière écriture : l'app ne voit la nouvelle version qu'une fois tout publié
+        storage.save_json(os.path.join(storage.CACHE_DIR, snapshot.VERSION_FILE), {
+            "version": name if staging else (os.path.basename(deltas[-1]) if deltas else None),
+            "mode": report["mode"], "reasons": reasons, "films": len(df_new), "drift": report["drift"],
+            "published_at": time.strftime("%Y-%m-%dT%H:%M:%S")})
+        # Après publication : les versions antérieures à la précédente ne sont plus servies
+        report["pruned"] = len(backend.prune_caches())
+    report["seconds"] = time.perf_counter() - t0
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("update", nargs="?", help="répertoire de la mise à jour (CSV au format de ../data)")
+    parser.add_argument("--data-dir", default=storage.DATA_DIR)
+    parser.add_argument("--name", help="nom de la mise à jour dans data/updates (défaut : date et heure)")
+    parser.add_argument("--refit", action="store_true", help="réajustement complet, même sans dérive")
+    parser.add_argument("--dry-run", action="store_true", help="mesure la dérive sans rien publier")
+    parser.add_argument("--topk", type=int, default=backend.TOPK)
+    args = parser.parse_args()
+    if not args.update and not args.refit: parser.error("une mise à jour ou --refit")
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    report = ingest(args.update, args.data_dir, args.name, args.refit, args.dry_run, args.topk)
+    added = ", ".join(f"{n} {k}" for k, n in report["added"].items())
+    print(f"{report['films']} films ({added or 'aucun ajout'}) : {report['mode']}"
+          + (f" ({'; '.join(report['reasons'])})" if report.get("reasons") else ""))
+    if "drift" in report:
+        print("dérive du vocabulaire : " + ", ".join(f"{c} {d:+.1%}" for c, d in report["drift"].items()))
+    if "seconds" in report:
+        print(f"publié en {report['seconds']:.1f}s (recommandeur {report['recommender_seconds']:.1f}s)")
+
+if __name__ == "__main__":
+    main()
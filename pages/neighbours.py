@@ -0,0 +1,165 @@
+"""Table pré-calculée des K plus proches voisins de chaque film (ou d'une liste de graines).
+
+Construite par blocs de lignes (X[bloc] @ X.T, plus E[bloc] @ E.T pour les canaux denses, voir
+backend.scoring_dense) : la mémoire reste bornée à chunk_size × n scores, jamais la matrice n × n
+complète. Les blocs peuvent être
+répartis sur un pool de processus (voir precompute.py). Après l'ajout de films en fin de
+catalogue, patch_topk corrige une table existante au lieu de la reconstruire (ingest.py).
+"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import storage
+
+BLOCK_BYTES = 64 << 20
+
+def _block_scores(X, XT, rows, E=None, ET=None):
+    block = (X[rows] @ XT).toarray().astype(np.float32, copy=False)
+    # Canaux denses à part : un bloc dense dans X rendrait chaque produit creux dense
+    if E is not None: block += E[rows] @ (E.T if ET is None else ET)
+    return block
+
+def _block_topk(X, XT, rows, k, jitter, E=None):
+    block = _block_scores(X, XT, rows, E)
+    block += jitter
+    block[np.arange(len(rows)), rows] = -np.inf  # le film lui-même
+    part = np.argpartition(block, -k, axis=1)[:, -k:]
+    part_scores = np.take_along_axis(block, part, axis=1) - jitter[part]
+    order = np.argsort(-part_scores, axis=1, kind="stable")
+    return np.take_along_axis(part, order, axis=1), np.take_along_axis(part_scores, order, axis=1)
+
+def _jitter(n):
+    # Les scores nuls sont massivement ex aequo et font dégénérer argpartition : on départage
+    # par un bruit déterministe < 1e-6, retiré avant de stocker les scores.
+    return np.linspace(0, 1e-6, n, dtype=np.float32)
+
+# --- POOL DE PROCESSUS : X est envoyé une fois par worker, pas une fois par bloc ---
+_WORKER = {}
+
+def _init_worker(X, k, E):
+    _WORKER.update(X=X, XT=X.T.tocsr(), k=k, jitter=_jitter(X.shape[0]), E=E)
+
+def _work(rows):
+    return _block_topk(_WORKER["X"], _WORKER["XT"], rows, _WORKER["k"], _WORKER["jitter"], _WORKER["E"])
+
+def iter_topk(X, rows, k=50, chunk_size=None, workers=0, E=None):
+    """Génère (début, ids, scores) bloc par bloc pour les lignes `rows` de X, dans l'ordre.
+
+    E : canaux denses (n × d) dont le produit s'ajoute au score, ou None.
+    """
+    n = X.shape[0]
+    chunk_size = chunk_size or max(1, BLOCK_BYTES // (12 * n))
+    k = min(k, n - 1)
+    starts = range(0, len(rows), chunk_size)
+    blocks = [np.asarray(rows[s:s + chunk_size]) for s in starts]
+    if workers > 1 and len(blocks) > 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(X, k, E)) as pool:
+            for s, (ids, scores) in zip(starts, pool.map(_work, blocks)):
+                yield s, ids, scores
+    else:
+        XT, jitter = X.T.tocsr(), _jitter(n)
+        for s, block in zip(starts, blocks):
+            yield (s, *_block_topk(X, XT, block, k, jitter, E))
+
+def batch_topk(X, rows=None, k=50, chunk_size=None, workers=0, E=None):
+    """Voisins des lignes `rows` (toutes par défaut) : dict ids/scores de forme len(rows) × k."""
+    full = rows is None
+    rows = np.arange(X.shape[0]) if full else np.asarray(rows)
+    k = min(k, X.shape[0] - 1)
+    ids = np.empty((len(rows), k), dtype=np.int32)
+    scores = np.empty((len(rows), k), dtype=np.float32)
+    t0 = time.perf_counter()
+    for start, block_ids, block_scores in iter_topk(X, rows, k, chunk_size, workers, E):
+        ids[start:start + len(block_ids)] = block_ids
+        scores[start:start + len(block_ids)] = block_scores
+    table = {"ids": ids, "scores": scores, "k": k, "build_seconds": time.perf_counter() - t0}
+    if not full: table["rows"] = rows
+    return table
+
+def query_topk(X, XT, rows, k, jitter=None, E=None):
+    """Voisins d'un lot de lignes quand X.T est déjà transposée (service : une fois pour toutes)."""
+    rows = np.asarray(rows)
+    jitter = _jitter(X.shape[0]) if jitter is None else jitter
+    return _block_topk(X, XT, rows, min(k, X.shape[0] - 1), jitter, E)
+
+def build_topk(X, k=50, chunk_size=None, workers=0, E=None):
+    """X : matrice CSR dont le produit scalaire des lignes (plus celui de E, dense) est le score de similarité."""
+    return batch_topk(X, None, k, chunk_size, workers, E)
+
+def patch_topk(table, X, start, chunk_size=None, E=None):
+    """Table de X quand seules ses lignes start: sont nouvelles, les `start` premières inchangées.
+
+    Les nouvelles lignes reçoivent leurs voisins (batch_topk, ajoutés en fin de table sauf pour
+    une table de graines) ; une liste existante n'est reprise que si un nouveau film y dépasse
+    le K-ième score (à égalité, l'ancien voisin reste). Coût : un produit anciens × nouveaux,
+    par blocs d'anciens.
+    """
+    t0 = time.perf_counter()
+    k, n = table["k"], X.shape[0]
+    seeds = table["rows"] if "rows" in table else np.arange(start)
+    ids, scores = table["ids"].copy(), table["scores"].copy()
+    if n == start:
+        return {**table, "ids": ids, "scores": scores, "patched_rows": 0, "build_seconds": 0.0}
+    XT_new = X[start:].T.tocsr()
+    ET_new = None if E is None else E[start:].T
+    block = max(1, BLOCK_BYTES // (12 * (k + n - start)))
+    affected = 0
+    for s in range(0, len(seeds), block):
+        cross = _block_scores(X, XT_new, seeds[s:s + block], E, ET_new)
+        better = (cross > scores[s:s + block, -1:]).any(axis=1)
+        if not better.any(): continue
+        rows = s + np.flatnonzero(better)
+        # Anciens voisins d'abord : le tri stable les garde devant un nouveau film à score égal
+        cand_ids = np.hstack([ids[rows], np.broadcast_to(np.arange(start, n, dtype=np.int32), (len(rows), n - start))])
+        cand_scores = np.hstack([scores[rows], cross[better]])
+        order = np.argsort(-cand_scores, axis=1, kind="stable")[:, :k]
+        ids[rows] = np.take_along_axis(cand_ids, order, axis=1)
+        scores[rows] = np.take_along_axis(cand_scores, order, axis=1)
+        affected += len(rows)
+    patched = {"ids": ids, "scores": scores, "k": k, "patched_rows": affected}
+    if "rows" in table:
+        patched["rows"] = table["rows"]
+    else:
+        added = batch_topk(X, np.arange(start, n), k=k, chunk_size=chunk_size, E=E)
+        patched["ids"], patched["scores"] = np.vstack([ids, added["ids"]]), np.vstack([scores, added["scores"]])
+    patched["build_seconds"] = time.perf_counter() - t0
+    return patched
+
+PREFIX = "topk-"
+
+def topk_path(key, cache_dir=storage.CACHE_DIR):
+    return os.path.join(cache_dir, f"{PREFIX}{key[:16]}.npz")
+
+def save_topk(table, path, tconsts, key=""):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp.npz"
+    extra = {"rows": table["rows"]} if "rows" in table else {}
+    if key: extra["key"] = np.asarray(key)
+    np.savez(tmp, ids=table["ids"], scores=table["scores"], tconsts=np.asarray(tconsts, dtype=str), **extra)
+    os.replace(tmp, path)
+    table["bytes"] = os.path.getsize(path)
+    return path
+
+def load_topk(path, tconsts, key=""):
+    """Relit une table persistée ; None si absente, construite sur un autre catalogue ou avec d'autres réglages (key)."""
+    try:
+        with np.load(path) as data:
+            if not np.array_equal(data["tconsts"], np.asarray(tconsts, dtype=str)): return None
+            # Table sans clé (écrite avant les réglages) : refusée dès qu'une clé est exigée
+            if key and ("key" not in data.files or str(data["key"]) != key): return None
+            table = {"ids": data["ids"], "scores": data["scores"]}
+            if "rows" in data: table["rows"] = data["rows"]
+    except (OSError, KeyError, ValueError):
+        return None
+    table.update(k=table["ids"].shape[1], build_seconds=0.0, bytes=os.path.getsize(path))
+    return table
+
+def lookup(table, idx, n=10):
+    """Voisins de la ligne idx : (positions, scores), O(n). None si idx n'est pas une graine de la table."""
+    if "rows" in table:
+        if "row_of" not in table:
+            table["row_of"] = {int(r): i for i, r in enumerate(table["rows"])}
+        idx = table["row_of"].get(idx)
+        if idx is None: return None
+    return table["ids"][idx, :n], table["scores"][idx, :n]
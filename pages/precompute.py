@@ -0,0 +1,41 @@
+"""Pré-calcul hors ligne des listes « parce que vous avez aimé X » (tâche nocturne).
+
+    python precompute.py                          # tout le catalogue, K=50
+    python precompute.py --seeds graines.txt      # une graine (titre ou tconst) par ligne
+    python precompute.py --workers 8 --k 100 --out ../cache/precomputed.npz
+
+Le fichier produit (ids int32 + scores float32 + tconst du catalogue) est rechargé par
+backend.build_recommender au démarrage de l'app, tant que le catalogue n'a pas changé.
+"""
+import argparse
+import os
+import time
+import backend, neighbours
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--k", type=int, default=backend.TOPK or 50)
+    parser.add_argument("--seeds", help="fichier texte : une graine (titre, libellé ou tconst) par ligne")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--out", default=backend.PRECOMPUTED_PATH)
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    df_movie, _, df_link = backend.load_data()
+    reco = backend.build_recommender(df_movie, df_link=df_link)
+    rows = None
+    if args.seeds:
+        with open(args.seeds, encoding="utf-8") as f:
+            seeds = [line.strip() for line in f if line.strip()]
+        positions = backend.resolve_seeds(seeds, df_movie, reco)
+        unknown = [s for s, p in zip(seeds, positions) if p is None]
+        if unknown: print(f"{len(unknown)} graine(s) inconnue(s) ignorée(s) : {', '.join(unknown[:5])}...")
+        rows = sorted({p for p in positions if p is not None})
+    table = neighbours.batch_topk(backend.scoring_matrix(reco), rows, k=args.k, workers=args.workers,
+                                  E=backend.scoring_dense(reco))
+    neighbours.save_topk(table, args.out, df_movie["tconst"], key=reco["key"])
+    print(f"{len(table['ids'])} graines × {table['k']} voisins -> {args.out} "
+          f"({table['bytes'] / 1e6:.1f} Mo, calcul {table['build_seconds']:.2f}s, total {time.perf_counter() - t0:.2f}s)")
+
+if __name__ == "__main__":
+    main()
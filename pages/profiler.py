@@ -0,0 +1,124 @@
+"""Instrumentation optionnelle des reruns Streamlit.
+
+Activée par la variable d'environnement JCI_PROFILE=1 ou le paramètre d'URL ?profile=1.
+Chaque rerun enregistre la durée des sections nommées et les appels / ratés des fonctions
+mises en cache, ajoute une ligne JSON au journal tournant (JCI_PROFILE_LOG) et affiche un
+panneau de diagnostic en bas de page. Désactivée, section() renvoie un contexte nul partagé :
+le coût se limite à un getattr.
+
+    with profiler.section("films.grid"): ...
+    with profiler.section("load_data", cache=True): backend.load_data()   # compte un appel
+    profiler.cache_miss("load_data")                                     # dans le corps mis en cache
+
+Un fragment (st.fragment) relancé seul ne repasse pas par begin_run : décoré de
+@profiler.fragment("films") sous @st.fragment, il ouvre alors son propre enregistrement
+(page "fragment:films").
+"""
+import contextlib
+import json
+import logging
+import logging.handlers
+import os
+import threading
+import time
+import storage
+
+ENV_ENABLED = os.environ.get("JCI_PROFILE", "") not in ("", "0")
+LOG_PATH = os.environ.get("JCI_PROFILE_LOG", os.path.join(storage.CACHE_DIR, "profile.jsonl"))
+LOG_MAX_BYTES, LOG_BACKUPS = 5 << 20, 3
+
+_local = threading.local()
+_NULL = contextlib.nullcontext()
+_log = None
+
+def _query_flag():
+    try:
+        import streamlit as st
+        return st.query_params.get("profile") not in (None, "", "0")
+    except Exception:
+        return False
+
+def begin_run(page=None):
+    """À appeler en tête de script : décide si ce rerun est instrumenté."""
+    enabled = ENV_ENABLED or _query_flag()
+    _local.run = {"ts": time.time(), "page": page, "sections": {}, "cache": {}, "t0": time.perf_counter()} if enabled else None
+
+def enabled():
+    return getattr(_local, "run", None) is not None
+
+class _Section:
+    __slots__ = ("run", "name", "t0")
+
+    def __init__(self, run, name):
+        self.run, self.name = run, name
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+
+    def __exit__(self, *exc):
+        stat = self.run["sections"].setdefault(self.name, {"ms": 0.0, "calls": 0})
+        stat["ms"] += (time.perf_counter() - self.t0) * 1000
+        stat["calls"] += 1
+
+def section(name, cache=False):
+    run = getattr(_local, "run", None)
+    if run is None: return _NULL
+    if cache: _cache_stat(run, name)["calls"] += 1
+    return _Section(run, name)
+
+def _cache_stat(run, name):
+    return run["cache"].setdefault(name, {"calls": 0, "misses": 0})
+
+def cache_miss(name):
+    run = getattr(_local, "run", None)
+    if run is not None: _cache_stat(run, name)["misses"] += 1
+
+@contextlib.contextmanager
+def fragment(name):
+    """Contexte (ou décorateur) du corps d'un fragment : sans effet dans un rerun complet, rerun
+    instrumenté s'il est relancé seul."""
+    if getattr(_local, "run", None) is not None or not (ENV_ENABLED or _query_flag()):
+        yield
+        return
+    begin_run(f"fragment:{name}")
+    try: yield
+    finally: end_run()
+
+def set_page(page):
+    run = getattr(_local, "run", None)
+    if run is not None: run["page"] = page
+
+def _logger():
+    global _log
+    if _log is None:
+        os.makedirs(os.path.dirname(os.path.abspath(LOG_PATH)), exist_ok=True)
+        handler = logging.handlers.RotatingFileHandler(LOG_PATH, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS, encoding="utf-8")
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        _log = logging.getLogger("jci.profile")
+        _log.propagate = False
+        _log.setLevel(logging.INFO)
+        _log.addHandler(handler)
+    return _log
+
+def end_run():
+    """Clôt le rerun : écrit la ligne JSON et renvoie l'enregistrement (None si désactivé)."""
+    run = getattr(_local, "run", None)
+    if run is None: return None
+    _local.run = None
+    record = {"ts": run["ts"], "page": run["page"], "total_ms": (time.perf_counter() - run["t0"]) * 1000,
+              "sections": run["sections"], "cache": {k: {**v, "hits": v["calls"] - v["misses"]} for k, v in run["cache"].items()}}
+    try: _logger().info(json.dumps(record, ensure_ascii=False))
+    except OSError: pass
+    return record
+
+def render_panel(record, extra=None):
+    """Panneau de diagnostic (rendu seulement quand l'instrumentation est active)."""
+    if record is None: return
+    import streamlit as st
+    with st.expander(f"Diagnostics — rerun {record['total_ms']:.1f} ms"):
+        rows = sorted(record["sections"].items(), key=lambda kv: -kv[1]["ms"])
+        st.table({"section": [k for k, _ in rows], "ms": [round(v["ms"], 2) for _, v in rows], "appels": [v["calls"] for _, v in rows]})
+        if record["cache"]:
+            st.table({"cache": list(record["cache"]), "hits": [v["hits"] for v in record["cache"].values()],
+                      "misses": [v["misses"] for v in record["cache"].values()]})
+        if extra: st.json(extra, expanded=False)
@@ -0,0 +1,102 @@
+"""Client du service de recommandation (reco_service.py), avec repli sur le calcul en process.
+
+JCI_RECO_URL=http://127.0.0.1:8601 active le service. Sans elle, ou si le service ne répond pas
+ou sert un autre catalogue (clé différente), recommend_movies calcule localement comme avant.
+Après un échec, le service n'est réessayé qu'au bout de RETRY_AFTER secondes : un rerun ne paie
+pas le délai d'attente à chaque fois. Les connexions HTTP persistantes sont partagées par tous
+les reruns et sessions du worker.
+"""
+import functools
+import http.client
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import urllib.parse
+import backend
+
+logger = logging.getLogger(__name__)
+
+RECO_URL = os.environ.get("JCI_RECO_URL", "").rstrip("/")
+TIMEOUT = float(os.environ.get("JCI_RECO_TIMEOUT", "2"))
+POOL_SIZE = 8
+RETRY_AFTER = 30
+
+class ServiceError(Exception):
+    pass
+
+class RecoClient:
+    def __init__(self, url, pool_size=POOL_SIZE, timeout=TIMEOUT):
+        parsed = urllib.parse.urlsplit(url)
+        self.host, self.port = parsed.hostname, parsed.port or 80
+        self.timeout = timeout
+        self.idle = queue.LifoQueue(maxsize=pool_size)  # la plus récente d'abord : la moins susceptible d'avoir expiré
+        self.down_until = 0.0
+        self.lock = threading.Lock()
+
+    def _connection(self):
+        try: return self.idle.get_nowait(), True
+        except queue.Empty: return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout), False
+
+    def _release(self, conn):
+        try: self.idle.put_nowait(conn)
+        except queue.Full: conn.close()
+
+    def request(self, method, path, payload=None):
+        body = None if payload is None else json.dumps(payload).encode()
+        headers = {"Content-Type": "application/json"} if body else {}
+        for _ in range(2):
+            conn, reused = self._connection()
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                resp = conn.getresponse()
+                data = resp.read()
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                if reused: continue  # connexion fermée par le service pendant son inactivité : une nouvelle
+                raise
+            self._release(conn)
+            if resp.status != 200:
+                raise ServiceError(f"HTTP {resp.status} : {data[:200]!r}")
+            return json.loads(data)
+        raise ServiceError("connexions du pool toutes fermées")
+
+    def available(self):
+        return time.monotonic() >= self.down_until
+
+    def mark_down(self, reason):
+        with self.lock:
+            if self.available():
+                logger.warning("Service de recommandation indisponible (%s), repli local pendant %ds", reason, RETRY_AFTER)
+            self.down_until = time.monotonic() + RETRY_AFTER
+
+    def neighbours(self, seeds, n):
+        """{graine: [(tconst, position, score_sim), ...] | None} et la clé de catalogue du service."""
+        reply = self.request("POST", "/recommend", {"seeds": list(seeds), "n": n})
+        return reply["results"], reply["key"]
+
+    def metrics(self):
+        return self.request("GET", "/metrics")
+
+@functools.lru_cache(maxsize=None)
+def get_client(url=RECO_URL):
+    return RecoClient(url) if url else None
+
+def recommend_movies(movie_title, df_movie, recommender_data, n=backend.RECO_N, client=None):
+    """Comme backend.recommend_movies, calculé par le service quand il est joignable."""
+    client = client or get_client()
+    if client is not None and client.available():
+        try:
+            results, key = client.neighbours([movie_title], n)
+            if key != recommender_data["key"]:
+                raise ServiceError("catalogue différent")
+            found = results.get(movie_title)
+            if found is None: return None
+            if any(df_movie["tconst"].iat[pos] != tconst for tconst, pos, _ in found):
+                raise ServiceError("positions incohérentes")
+            return backend.movie_rows(df_movie, [pos for _, pos, _ in found], [s / 100 for _, _, s in found])
+        except (OSError, http.client.HTTPException, ServiceError, ValueError, KeyError) as exc:
+            client.mark_down(exc)
+    return backend.recommend_movies(movie_title, df_movie, recommender_data, n)
@@ -0,0 +1,262 @@
+"""Service local de recommandation (HTTP/JSON sur asyncio) : matrices chargées une fois par hôte.
+
+Les requêtes en file forment un lot : un seul produit X[graines] @ X.T (plus E[graines] @ E.T pour
+les synopsis), calculé dans un thread pendant que la boucle accepte les suivantes, puis chaque
+requête du lot reçoit sa réponse.
+Sous charge, les requêtes arrivées pendant le calcul d'un lot forment le suivant, et la fenêtre
+(--window-ms) attend brièvement les retardataires ; sans concurrence elle n'est pas appliquée.
+
+    cd pages && python reco_service.py [--port 8601] [--window-ms 1] [--max-batch 64]
+
+    POST /recommend  {"seed": "Amélie" | "tt0211915", "n": 10}   ou   {"seeds": [...], "n": 10}
+         -> {"key": clé du catalogue, "results": {graine: [[tconst, position, score_sim], ...] | null}}
+    GET  /metrics    requêtes, lots, débit, latences p50/p95/p99 (fenêtre glissante)
+    GET  /health
+
+Côté app, voir reco_client.py (JCI_RECO_URL).
+"""
+import argparse
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import backend, neighbours
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORT = 8601
+BATCH_WINDOW_MS = 1.0
+MAX_BATCH = 64
+MAX_N = 100
+MAX_BODY = 1 << 20
+LATENCY_WINDOW = 10_000   # dernières requêtes gardées pour les percentiles
+RATE_WINDOW_S = 10        # fenêtre du débit instantané
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 431: "Request Header Fields Too Large", 500: "Internal Server Error"}
+
+# --- COMPTEURS ---
+def _percentiles(values):
+    if not values: return None
+    ms = np.asarray(values) * 1000
+    return {"mean": float(ms.mean()), "p50": float(np.percentile(ms, 50)),
+            "p95": float(np.percentile(ms, 95)), "p99": float(np.percentile(ms, 99))}
+
+def new_metrics():
+    return {"started": time.time(), "requests": 0, "seeds": 0, "errors": 0, "batches": 0, "batched_seeds": 0,
+            "max_batch": 0, "latency": deque(maxlen=LATENCY_WINDOW), "batch_time": deque(maxlen=LATENCY_WINDOW),
+            "done": deque()}
+
+def metrics_report(metrics):
+    now = time.time()
+    done = metrics["done"]
+    while done and done[0] < now - RATE_WINDOW_S: done.popleft()
+    uptime = now - metrics["started"]
+    return {"uptime_s": uptime, "requests": metrics["requests"], "seeds": metrics["seeds"], "errors": metrics["errors"],
+            "batches": metrics["batches"], "max_batch": metrics["max_batch"],
+            "mean_batch": metrics["batched_seeds"] / metrics["batches"] if metrics["batches"] else 0.0,
+            "throughput_rps": len(done) / min(RATE_WINDOW_S, max(uptime, 1e-9)),
+            "latency_ms": _percentiles(list(metrics["latency"])), "batch_ms": _percentiles(list(metrics["batch_time"]))}
+
+# --- LOTS ---
+class Batcher:
+    """File des graines en attente ; run() forme les lots et les calcule un par un dans un thread."""
+
+    def __init__(self, reco, window_ms=BATCH_WINDOW_MS, max_batch=MAX_BATCH, metrics=None):
+        self.X, self.E = backend.scoring_matrix(reco), backend.scoring_dense(reco)
+        self.XT = self.X.T.tocsr()  # transposée une fois, pas à chaque lot
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self.last_batch = 0
+        self.metrics = metrics if metrics is not None else new_metrics()
+        self.queue = asyncio.Queue()
+        self.executor = ThreadPoolExecutor(1, thread_name_prefix="reco-batch")
+
+    async def submit(self, pos, n):
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((pos, n, future))
+        return await future
+
+    def _score(self, items):
+        # Graines en double (films populaires) calculées une fois ; k = le plus grand n du lot
+        rows, inverse = np.unique([pos for pos, _, _ in items], return_inverse=True)
+        ids, scores = neighbours.query_topk(self.X, self.XT, rows, max(n for _, n, _ in items), E=self.E)
+        return [(ids[j, :n], scores[j, :n]) for j, (_, n, _) in zip(inverse, items)]
+
+    async def _collect(self):
+        loop = asyncio.get_running_loop()
+        items = [await self.queue.get()]
+        # Fenêtre ouverte seulement sous charge (lot précédent à plusieurs graines) : un client
+        # isolé ne paie pas l'attente
+        deadline = loop.time() + (self.window if self.last_batch > 1 else 0)
+        while len(items) < self.max_batch:
+            try:
+                items.append(self.queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            timeout = deadline - loop.time()
+            if timeout <= 0: break
+            try: items.append(await asyncio.wait_for(self.queue.get(), timeout))
+            except asyncio.TimeoutError: break
+        return items
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            items = await self._collect()
+            self.last_batch = len(items)
+            t0 = time.perf_counter()
+            try:
+                results = await loop.run_in_executor(self.executor, self._score, items)
+            except Exception as exc:
+                logger.exception("Échec du calcul d'un lot de %d graines", len(items))
+                for _, _, future in items:
+                    if not future.done(): future.set_exception(exc)
+                continue
+            m = self.metrics
+            m["batch_time"].append(time.perf_counter() - t0)
+            m["batches"] += 1
+            m["batched_seeds"] += len(items)
+            m["max_batch"] = max(m["max_batch"], len(items))
+            for (_, _, future), result in zip(items, results):
+                if not future.done(): future.set_result(result)
+
+# --- HTTP ---
+async def _read_request(reader):
+    """(méthode, chemin, en-têtes, corps) ; None si le client a fermé la connexion."""
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except (asyncio.IncompleteReadError, ConnectionError):
+        return None
+    except asyncio.LimitOverrunError:  # en-têtes au-delà de la limite du flux (64 Kio par défaut)
+        raise ValueError(431)
+    lines = head.decode("latin-1").split("\r\n")
+    method, path, _ = lines[0].split(" ", 2)
+    headers = {k.strip().lower(): v.strip() for k, _, v in (line.partition(":") for line in lines[1:] if line)}
+    length = int(headers.get("content-length", 0))
+    if length > MAX_BODY: raise ValueError(413)
+    body = await reader.readexactly(length) if length else b""
+    return method, path.split("?", 1)[0], headers, body
+
+def _response(status, payload, keep_alive=True):
+    body = json.dumps(payload, ensure_ascii=False).encode()
+    head = (f"HTTP/1.1 {status} {REASONS[status]}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\nConnection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    return head.encode() + body
+
+class Service:
+    def __init__(self, df_movie, reco, window_ms=BATCH_WINDOW_MS, max_batch=MAX_BATCH):
+        self.reco = reco
+        self.tconsts = df_movie["tconst"].to_numpy()
+        self.by_tconst = {t: i for i, t in enumerate(self.tconsts.tolist())}
+        self.metrics = new_metrics()
+        self.batcher = Batcher(reco, window_ms, max_batch, self.metrics)
+
+    def resolve(self, seed):
+        pos = self.by_tconst.get(seed)
+        return pos if pos is not None else backend.find_movie(str(seed), self.reco)
+
+    async def recommend(self, payload):
+        seeds = payload["seeds"] if "seeds" in payload else [payload["seed"]]
+        n = max(1, min(int(payload.get("n", backend.RECO_N)), MAX_N))
+        positions = [self.resolve(s) for s in seeds]
+        found = await asyncio.gather(*(self.batcher.submit(p, n) for p in positions if p is not None))
+        found = iter(found)
+        results = {}
+        for seed, pos in zip(seeds, positions):
+            if pos is None:
+                results[seed] = None
+                continue
+            ids, scores = next(found)
+            results[seed] = [[self.tconsts[i], int(i), float(s) * 100] for i, s in zip(ids, scores)]
+        self.metrics["seeds"] += len(seeds)
+        return {"key": self.reco["key"], "results": results}
+
+    async def handle(self, method, path, body):
+        if path == "/health":
+            return 200, {"status": "ok", "films": len(self.tconsts), "key": self.reco["key"]}
+        if path == "/metrics":
+            return 200, metrics_report(self.metrics)
+        if path == "/recommend":
+            if method != "POST": return 405, {"error": "POST attendu"}
+            try:
+                payload = json.loads(body)
+                seeds = payload["seeds"] if "seeds" in payload else [payload["seed"]]
+                if not isinstance(seeds, list) or not all(isinstance(s, str) for s in seeds): raise TypeError
+                int(payload.get("n", backend.RECO_N))
+            except (ValueError, KeyError, TypeError):
+                return 400, {"error": 'corps JSON attendu : {"seed": ...} ou {"seeds": [...]}'}
+            return 200, await self.recommend(payload)
+        return 404, {"error": f"chemin inconnu : {path}"}
+
+    async def connection(self, reader, writer):
+        # Une connexion HTTP/1.1 persistante : les requêtes se suivent jusqu'à la fermeture
+        try:
+            while True:
+                try:
+                    request = await _read_request(reader)
+                except ValueError as exc:
+                    status = exc.args[0] if exc.args and exc.args[0] in REASONS else 400
+                    writer.write(_response(status, {"error": "requête invalide"}, keep_alive=False))
+                    await writer.drain()
+                    break
+                if request is None: break
+                method, path, headers, body = request
+                t0 = time.perf_counter()
+                try:
+                    status, payload = await self.handle(method, path, body)
+                except Exception:
+                    logger.exception("Erreur sur %s %s", method, path)
+                    status, payload = 500, {"error": "erreur interne"}
+                keep_alive = headers.get("connection", "").lower() != "close"
+                writer.write(_response(status, payload, keep_alive))
+                await writer.drain()
+                if path == "/recommend":
+                    m = self.metrics
+                    m["requests"] += 1
+                    m["errors"] += status != 200
+                    m["latency"].append(time.perf_counter() - t0)
+                    m["done"].append(time.time())
+                if not keep_alive: break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host, port, ready=None):
+        server = await asyncio.start_server(self.connection, host, port)
+        batch_task = asyncio.create_task(self.batcher.run())
+        logger.info("Service de recommandation sur http://%s:%d (%d films)", host, port, len(self.tconsts))
+        if ready is not None: ready(server)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            batch_task.cancel()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--window-ms", type=float, default=BATCH_WINDOW_MS, help="fenêtre de regroupement (0 : lots formés des seules requêtes déjà en file)")
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH)
+    parser.add_argument("--data-dir", default=None)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    t0 = time.perf_counter()
+    df_movie, _, df_link = backend.load_data.__wrapped__(args.data_dir) if args.data_dir else backend.load_data.__wrapped__()
+    reco = backend.build_recommender.__wrapped__(df_movie, df_link=df_link)
+    logger.info("Recommandeur chargé en %.1fs", time.perf_counter() - t0)
+    service = Service(df_movie, reco, args.window_ms, args.max_batch)
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Cache disque du recommandeur ajusté, partagé entre redémarrages et workers.
+
+    ../cache/recommender-v1-<clé>/
+        manifest.json        clé, version, formes, sha256 de chaque fichier et « meta » (lignes
+                             ajustées, date : voir ingest.py)
+        vectorizers.pkl      TfidfVectorizer ajustés (pickle)
+        <canal>_matrix.npz   matrices TF-IDF creuses (scipy.sparse.save_npz)
+
+La clé couvre les textes du catalogue et les paramètres des vectoriseurs. Un répertoire
+n'est visible qu'une fois complet (publication par os.replace) et un verrou fichier évite
+que plusieurs workers démarrant ensemble ne réajustent chacun le modèle.
+"""
+import json
+import logging
+import os
+import pickle
+import time
+from scipy import sparse
+import storage
+
+CACHE_VERSION = 1
+PREFIX = f"recommender-v{CACHE_VERSION}-"
+logger = logging.getLogger(__name__)
+
+def cache_path(key, cache_dir=storage.CACHE_DIR):
+    return os.path.join(cache_dir, PREFIX + key[:16])
+
+def read(key, cache_dir=storage.CACHE_DIR):
+    """{'vectorizers', 'matrices', 'meta'} si le cache existe et passe la validation, sinon None."""
+    target = cache_path(key, cache_dir)
+    try:
+        with open(os.path.join(target, "manifest.json")) as f:
+            manifest = json.load(f)
+        if manifest.get("version") != CACHE_VERSION or manifest.get("key") != key: return None
+        for name, digest in manifest["files"].items():
+            if storage.file_sha256(os.path.join(target, name)) != digest:
+                logger.warning("Cache recommandeur corrompu (%s), reconstruction", name)
+                return None
+        with open(os.path.join(target, "vectorizers.pkl"), "rb") as f:
+            vectorizers = pickle.load(f)
+        matrices = {c: sparse.load_npz(os.path.join(target, f"{c}_matrix.npz")).tocsr() for c in manifest["shapes"]}
+    except (OSError, ValueError, KeyError, pickle.UnpicklingError, EOFError, AttributeError):
+        return None
+    if any(list(m.shape) != manifest["shapes"][c] for c, m in matrices.items()): return None
+    return {"vectorizers": vectorizers, "matrices": matrices, "meta": manifest.get("meta", {})}
+
+def write(key, fitted, cache_dir=storage.CACHE_DIR, replace=False):
+    def build(tmp):
+        with open(os.path.join(tmp, "vectorizers.pkl"), "wb") as f:
+            pickle.dump(fitted["vectorizers"], f, protocol=pickle.HIGHEST_PROTOCOL)
+        for c, m in fitted["matrices"].items():
+            sparse.save_npz(os.path.join(tmp, f"{c}_matrix.npz"), m)
+        files = sorted(os.listdir(tmp))
+        manifest = {"version": CACHE_VERSION, "key": key,
+                    "shapes": {c: list(m.shape) for c, m in fitted["matrices"].items()}, "meta": fitted.get("meta", {}),
+                    "files": {name: storage.file_sha256(os.path.join(tmp, name)) for name in files}}
+        with open(os.path.join(tmp, "manifest.json"), "w") as f:
+            json.dump(manifest, f, indent=2)
+
+    target = storage.publish_dir(build, cache_path(key, cache_dir), replace=replace)
+    storage.prune_dirs(cache_dir, PREFIX, keep=target)
+    return target
+
+def load_or_fit(key, fit, cache_dir=storage.CACHE_DIR, force=False):
+    """Relit le recommandeur ajusté ou appelle fit() puis le persiste. Renvoie (fitted, 'hit'|'miss').
+
+    force=True réajuste et remplace le cache existant (réajustement complet planifié d'ingest.py).
+    """
+    t0 = time.perf_counter()
+    fitted = None if force else read(key, cache_dir)
+    status = "hit"
+    if fitted is None:
+        # Un seul worker ajuste ; les autres attendent le verrou puis relisent son résultat
+        with storage.file_lock(os.path.join(cache_dir, "recommender.lock")):
+            fitted = None if force else read(key, cache_dir)
+            if fitted is None:
+                status = "miss"
+                fitted = fit()
+                try: write(key, fitted, cache_dir, replace=force)
+                except OSError as exc: logger.warning("Cache recommandeur non écrit : %s", exc)
+    logger.info("Cache recommandeur : %s (%s) en %.3fs", status, cache_path(key, cache_dir), time.perf_counter() - t0)
+    return fitted, status
@@ -0,0 +1,52 @@
+"""Schéma compact du catalogue, appliqué par load_csv avant l'écriture du snapshot.
+
+    catégories : colonnes à peu de valeurs distinctes (genres, pays, langues, métiers)
+    int32      : années, durées, compteurs et identifiants numériques (budget et recettes
+                 restent en int64 : certaines recettes dépassent 2³¹)
+    Int32      : entiers avec valeurs manquantes (lus en float64 par read_csv)
+    float32    : scores, y compris ceux écrits au format français ("6,3491") dans le CSV
+    chaînes    : Arrow (snapshot.STRING_DTYPE), jamais d'objets Python
+
+Les textes volumineux ne sont pas concernés : le snapshot les range à part (voir text_store).
+"""
+import numpy as np
+import pandas as pd
+from utils import to_float
+
+CATEGORIES = {
+    "movie": ["movie_origin_country", "movie_original_language", "movie_genres_y", "collection_movie_name",
+              *[f"genres_x_{i}" for i in range(1, 6)], "production_companies_1_origin_country",
+              "production_1_iso", "production_1_countries_code", "production_1_countries_name"],
+    "people": ["person_professions"],
+}
+INT32 = {
+    "movie": ["Unnamed: 0", "movie_api_id", "movie_vote_count_tmdb", "movie_startYear", "movie_runtimeMinutes",
+              "movie_numVotes", "genre_id_1", "id_x", "id_y"],
+    "people": ["intervenant_birthYear"],
+}
+NULLABLE_INT32 = {
+    "movie": ["collection_movie_id", *[f"genre_id_{i}" for i in range(2, 6)]],
+    "people": ["intervenant_deathYear", "tmdb_id"],
+}
+FLOAT32 = {
+    "movie": ["movie_popularity", "movie_vote_average_tmdb", "movie_averageRating_tmdb"],
+    "people": ["tmdb_popularity"],
+}
+
+def compact(name, df, string_dtype=None):
+    """Copie de df au schéma compact ; les colonnes absentes sont ignorées."""
+    cols = set(df.columns)
+    converted = {}
+    for c in FLOAT32.get(name, ()):
+        if c in cols: converted[c] = to_float(df[c]).astype(np.float32)
+    for c in INT32.get(name, ()):
+        if c in cols: converted[c] = pd.to_numeric(df[c], errors="coerce").fillna(0).astype(np.int32)
+    for c in NULLABLE_INT32.get(name, ()):
+        if c in cols: converted[c] = pd.to_numeric(df[c], errors="coerce").round().astype("Int32")
+    for c in CATEGORIES.get(name, ()):
+        if c in cols: converted[c] = df[c].astype("category")
+    if string_dtype is not None:
+        for c in df.columns:
+            if c not in converted and (df[c].dtype == object or pd.api.types.is_string_dtype(df[c].dtype)):
+                converted[c] = df[c].astype(string_dtype)
+    return df.assign(**converted)
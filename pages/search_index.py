@@ -0,0 +1,216 @@
+"""Recherche tolérante aux fautes sur les titres et les noms, construite une fois au chargement.
+
+Les textes sont repliés (accents, casse, ponctuation) puis indexés deux fois, en CSR :
+    mots     : vocabulaire trié -> entrées ; les mots commençant par un préfixe forment une plage
+               contiguë du vocabulaire, donc leurs listes une seule tranche de `word_entries` ;
+               et entrée -> mots, pour filtrer des candidats par plage sans lire d'autre liste
+    trigrammes : trigramme -> entrées, pour les fautes de frappe (similarité de Jaccard)
+Les entrées sont numérotées par popularité décroissante : dans toute liste, les premiers
+identifiants sont les plus populaires, et les préfixes de trois lettres au plus ont leur top
+pré-calculé. Une requête ne parcourt jamais la liste complète des noms.
+
+    index = build_search_index(["Amélie", ...], popularity, targets)
+    search(index, "amel", n=8) -> [(cible, score), ...]
+"""
+import bisect
+import re
+import unicodedata
+import numpy as np
+import pandas as pd
+
+SHORT_PREFIX_LEN = 3      # préfixes dont le top est pré-calculé
+SHORT_PREFIX_TOP = 64     # résultats gardés par préfixe court
+TRIGRAM_BUDGET = 50_000   # identifiants lus au plus dans les listes de trigrammes
+RERANK = 200              # candidats trigrammes reclassés en Jaccard exact
+MIN_SIMILARITY = 0.25
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+# Texte replié = alphabet de 37 symboles : un trigramme est un entier < 37³, sans table de chaînes
+_ALPHABET = np.full(256, 0, dtype=np.int32)
+_ALPHABET[np.frombuffer(b"0123456789abcdefghijklmnopqrstuvwxyz", dtype=np.uint8)] = np.arange(1, 37)
+N_TRIGRAMS = 37 ** 3
+
+def fold(text):
+    """'L'Été meurtrier' -> 'l ete meurtrier'."""
+    text = unicodedata.normalize("NFKD", str(text)).encode("ascii", "ignore").decode().casefold()
+    return _NON_ALNUM.sub(" ", text).strip()
+
+def _trigrams(texts):
+    """(entrée, code) de chaque trigramme des textes bordés ('  texte '), sur un seul tampon d'octets."""
+    padded = ["  " + t + " " for t in texts]
+    lengths = np.fromiter(map(len, padded), dtype=np.int64, count=len(padded))
+    buf = _ALPHABET[np.frombuffer("".join(padded).encode("ascii"), dtype=np.uint8)]
+    codes = (buf[:-2] * 37 + buf[1:-1]) * 37 + buf[2:]
+    # Les deux dernières positions de chaque texte chevauchent le suivant
+    valid = np.ones(len(codes) + 2, dtype=bool)
+    ends = np.cumsum(lengths)
+    valid[ends - 1] = valid[ends - 2] = False
+    return np.repeat(np.arange(len(texts), dtype=np.int32), lengths - 2), codes[valid[:-2]]
+
+def _query_trigrams(query):
+    return np.unique(_trigrams([query])[1])
+
+def _sorted_unique(values):
+    # Tri + comparaison aux voisins : bien plus rapide que np.unique (hachage) sur des dizaines de millions d'entiers
+    values = np.sort(values)
+    return values[np.r_[True, values[1:] != values[:-1]]] if len(values) else values
+
+def _csr(keys, values, n_keys, n_values):
+    """Listes triées et sans doublon : valeurs de chaque clé par identifiant croissant (= popularité)."""
+    pairs = _sorted_unique(keys.astype(np.int64) * n_values + values)
+    keys, values = pairs // n_values, (pairs % n_values).astype(np.int32)
+    return np.searchsorted(keys, np.arange(n_keys + 1)).astype(np.int64), values
+
+def build_search_index(texts, popularity, targets):
+    """texts[i] désigne la cible targets[i] (plusieurs textes par cible possibles : titre traduit et original)."""
+    folded = pd.Series([fold(t) for t in texts], dtype=object)
+    popularity = np.nan_to_num(np.asarray(popularity, dtype=float), nan=0.0)
+    targets = np.asarray(targets)
+    keep = (folded != "").to_numpy()
+    # Un même texte replié pour une même cible n'est indexé qu'une fois
+    frame = pd.DataFrame({"text": folded[keep].to_numpy(), "target": targets[keep], "pop": popularity[keep]})
+    frame = frame.drop_duplicates(["text", "target"]).sort_values("pop", ascending=False, kind="stable").reset_index(drop=True)
+    texts_f = frame["text"]
+
+    words = texts_f.str.split().explode()
+    word_codes, vocab = pd.factorize(words, sort=True)
+    word_indptr, word_entries = _csr(word_codes, words.index.to_numpy(np.int32), len(vocab), len(frame))
+    entry_indptr, entry_words = _csr(words.index.to_numpy(np.int64), word_codes, len(frame), len(vocab))
+    vocab = np.asarray(vocab, dtype=str)
+
+    gram_ids, gram_codes = _trigrams(texts_f.tolist())
+    gram_indptr, gram_entries = _csr(gram_codes, gram_ids, N_TRIGRAMS, len(frame))  # trigrammes distincts par entrée
+    del gram_ids, gram_codes
+
+    index = {
+        "texts": texts_f.tolist(), "target": frame["target"].to_numpy(),
+        "text_order": np.argsort(texts_f.to_numpy(), kind="stable").astype(np.int32),  # textes entiers triés
+        "pop_norm": (np.log1p(frame["pop"].to_numpy()) / max(np.log1p(frame["pop"].max()), 1e-9)).astype(np.float32),
+        "vocab": vocab, "word_indptr": word_indptr, "word_entries": word_entries,
+        "entry_indptr": entry_indptr, "entry_words": entry_words,
+        "gram_indptr": gram_indptr, "gram_entries": gram_entries,
+        "gram_count": np.bincount(gram_entries, minlength=len(frame)).astype(np.int32),
+    }
+    index["short_prefix"] = _short_prefix_tops(vocab, word_indptr, word_entries, len(frame))
+    return index
+
+def _short_prefix_tops(vocab, word_indptr, word_entries, n_entries):
+    """Top SHORT_PREFIX_TOP (entrées distinctes les plus populaires) de chaque préfixe court.
+
+    Le vocabulaire étant trié, les mots d'un même préfixe et leurs listes sont contigus : un tri
+    de (groupe, entrée) par longueur de préfixe suffit, sans boucle sur les préfixes.
+    """
+    tops = {}
+    words = pd.Series(vocab)
+    for k in range(1, SHORT_PREFIX_LEN + 1):
+        prefixes = words.str.slice(0, k).to_numpy()
+        valid = words.str.len().to_numpy() >= k
+        group = np.cumsum(np.r_[True, prefixes[1:] != prefixes[:-1]]) - 1
+        pairs = _sorted_unique(np.repeat(group, np.diff(word_indptr)).astype(np.int64) * n_entries + word_entries)
+        g, e = pairs // n_entries, (pairs % n_entries).astype(np.int32)
+        starts = np.searchsorted(g, g, side="left")
+        keep = (np.arange(len(g)) - starts) < SHORT_PREFIX_TOP
+        g, e = g[keep], e[keep]
+        bounds = np.flatnonzero(np.r_[True, g[1:] != g[:-1], True])
+        first_word = np.searchsorted(group, g[bounds[:-1]])
+        for w, lo, hi in zip(first_word, bounds[:-1], bounds[1:]):
+            if valid[w]: tops[prefixes[w]] = e[lo:hi]
+    return tops
+
+def _word_range(index, prefix):
+    """Plage [lo, hi) du vocabulaire trié des mots commençant par `prefix`."""
+    vocab = index["vocab"]
+    return int(np.searchsorted(vocab, prefix, side="left")), int(np.searchsorted(vocab, prefix + "\uffff", side="left"))
+
+def _smallest(values, n):
+    """Les n plus petits identifiants distincts (= les plus populaires), sans trier toute la liste."""
+    k = 16 * n
+    if len(values) <= 2 * k: return _sorted_unique(values)[:n]
+    best = _sorted_unique(values[values <= np.partition(values, k)[k]])[:n]
+    # Une entrée peut revenir une fois par mot du préfixe : si les doublons ont tout pris, tri complet
+    return best if len(best) == n else _sorted_unique(values)[:n]
+
+def _has_word_in(index, entries, lo, hi):
+    """Masque des entrées ayant un mot dans la plage [lo, hi) : lecture de leurs seuls mots (CSR entrée -> mots)."""
+    indptr = index["entry_indptr"]
+    starts = indptr[entries]
+    counts = indptr[entries + 1] - starts
+    owner = np.repeat(np.arange(len(entries)), counts)
+    codes = index["entry_words"][np.arange(counts.sum()) + np.repeat(starts - np.cumsum(counts) + counts, counts)]
+    hit = (codes >= lo) & (codes < hi)
+    return np.bincount(owner[hit], minlength=len(entries)) > 0
+
+def _prefix_matches(index, tokens, n):
+    """Entrées dont chaque mot de la requête préfixe un mot, les plus populaires d'abord.
+
+    Candidats = tranche du mot de la requête le plus rare ; chaque autre mot, court ou long, les
+    filtre par sa plage du vocabulaire sur les mots des seuls candidats. Si le mot le plus rare est
+    court, son top pré-calculé est essayé d'abord : n résultats y suffisent, ce sont les n premiers.
+    """
+    indptr = index["word_indptr"]
+    ranges = sorted({_word_range(index, t): t for t in tokens}.items(), key=lambda r: indptr[r[0][1]] - indptr[r[0][0]])
+    (lo, hi), rarest = ranges[0]
+    seeds = [index["word_entries"][indptr[lo]:indptr[hi]]]
+    if len(rarest) <= SHORT_PREFIX_LEN and rarest in index["short_prefix"]:
+        seeds.insert(0, index["short_prefix"][rarest])
+    for cands in seeds:
+        for (lo, hi), _ in ranges[1:]:
+            cands = cands[_has_word_in(index, cands, lo, hi)]
+        found = _smallest(cands, n)
+        if len(found) >= n: break
+    return found
+
+def _trigram_matches(index, query, n):
+    """Candidats lus dans les listes des trigrammes les plus rares (budget borné), puis reclassés
+    par similarité de Jaccard exacte : trigrammes communs / (requête + entrée - communs)."""
+    indptr, lists = index["gram_indptr"], index["gram_entries"]
+    codes = sorted(_query_trigrams(query), key=lambda c: indptr[c + 1] - indptr[c])
+    parts, read = [], 0
+    for c in codes:
+        if read and read + indptr[c + 1] - indptr[c] > TRIGRAM_BUDGET: break
+        parts.append(lists[indptr[c]:indptr[c + 1]])
+        read += len(parts[-1])
+    entries, shared = np.unique(np.concatenate(parts), return_counts=True)
+    if len(entries) > RERANK:
+        keep = np.argpartition(-shared, RERANK)[:RERANK]
+        entries, shared = entries[keep], shared[keep]
+    # Trigrammes hors budget : appartenance des seuls candidats, par dichotomie dans les listes triées
+    for c in codes[len(parts):]:
+        lst = lists[indptr[c]:indptr[c + 1]]
+        pos = np.minimum(np.searchsorted(lst, entries), len(lst) - 1)
+        shared = shared + (lst[pos] == entries)
+    sim = shared / (len(codes) + index["gram_count"][entries] - shared)
+    keep = sim >= MIN_SIMILARITY
+    entries, sim = entries[keep], sim[keep]
+    top = np.argsort(-(sim + 0.2 * index["pop_norm"][entries]), kind="stable")[:n]
+    return entries[top], sim[top]
+
+def search(index, query, n=8):
+    """Les n meilleures cibles pour la saisie `query` : [(cible, score)], score décroissant.
+
+    Correspondances de préfixe d'abord (texte entier > début du texte > début de mots), puis,
+    s'il en manque, les plus proches en trigrammes ; la popularité départage.
+    """
+    q = fold(query)
+    if not q: return []
+    scored = {}
+    texts, pop, order = index["texts"], index["pop_norm"], index["text_order"]
+    # Textes qui commencent par la saisie : une plage de l'ordre trié (les exacts en tête)
+    lo = bisect.bisect_left(order, q, key=texts.__getitem__)
+    hi = bisect.bisect_left(order, q + "\uffff", lo=lo, key=texts.__getitem__)
+    starts = order[lo:hi]
+    exact = [e for e in starts[:n] if texts[e] == q]
+    for e in [*exact, *_smallest(starts, n * 2)]:
+        _keep_best(scored, index["target"][e], (3.0 if texts[e] == q else 2.0) + pop[e])
+    for e in _prefix_matches(index, q.split(), n * 2):  # puis début d'un mot quelconque
+        _keep_best(scored, index["target"][e], 1.0 + pop[e])
+    if len(scored) < n:
+        entries, sim = _trigram_matches(index, q, n * 2)
+        for e, s in zip(entries, sim):
+            _keep_best(scored, index["target"][e], s + 0.2 * pop[e])
+    return sorted(scored.items(), key=lambda kv: -kv[1])[:n]
+
+def _keep_best(scored, target, score):
+    target = target.item() if hasattr(target, "item") else target
+    if score > scored.get(target, -1.0):
+        scored[target] = score
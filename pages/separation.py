@@ -0,0 +1,130 @@
+"""Degrés de séparation : plus court chemin de films partagés entre deux talents (ou deux films).
+
+Le graphe est le biparti talents <-> films de l'index de casting (cast_index), déjà codé en
+entiers et rangé en CSR dans les deux sens au chargement : rien n'est construit par requête.
+
+    talent p -> films   person_films[person_indptr[p]:person_indptr[p + 1]]
+    film f   -> talents film_people[film_indptr[f]:film_indptr[f + 1]]
+
+La recherche est un BFS bidirectionnel par niveaux : on étend à chaque tour le côté dont la
+frontière a le moins d'arêtes sortantes, et un niveau entier s'étend en quelques opérations
+numpy (gather CSR, np.unique, recherche dans les visités triés). Le premier niveau qui touche
+les visités de l'autre côté donne un plus court chemin. Les états sont des tableaux triés des
+seuls nœuds visités (aucun tableau de la taille du graphe par requête), donc plusieurs sessions
+peuvent chercher en même temps sans pic mémoire.
+
+Mémoire du graphe : graph_nbytes(index), soit 8 octets par lien (deux int32, un par sens) plus
+8 octets par talent et par film (indptr int64) ; 437 Mo pour 40 M liens. Le reste de cast_index
+coûte par talent ou film, pas par lien : ~60 octets d'entrée de dictionnaire identifiant -> code
+et ~65 octets de chaîne d'identifiant (voir benchmarks/bench_separation.py et le README).
+
+    path = separation.shortest_path(index, separation.node(index, "nm0000102"), separation.node(index, "nm0000158"))
+    # [(PERSON, p0), (FILM, f1), (PERSON, p2), ...] ; None si aucun chemin en MAX_HOPS liens
+"""
+import numpy as np
+
+PERSON, FILM = 0, 1
+MAX_HOPS = 12  # liens talent <-> film : 6 degrés de séparation
+
+def node(index, key):
+    """(PERSON, position) pour un nconst, (FILM, code) pour un tconst ; None si inconnu."""
+    pos = index["person_pos"].get(key)
+    if pos is not None: return PERSON, pos
+    code = index["film_code"].get(key)
+    return None if code is None else (FILM, code)
+
+def catalogue_films(index):
+    """Masque des codes film présents dans df_movie (chemins affichables), calculé une fois par index."""
+    if "catalogue_films" not in index:
+        index["catalogue_films"] = index["movie_pos"] >= 0
+    return index["catalogue_films"]
+
+def graph_nbytes(index):
+    return sum(index[k].nbytes for k in ("film_indptr", "film_people", "person_indptr", "person_films"))
+
+def _adjacency(index, kind):
+    return (index["person_indptr"], index["person_films"]) if kind == PERSON else (index["film_indptr"], index["film_people"])
+
+def _gather(indptr, values, nodes):
+    """Voisins de tous les nœuds en un seul gather CSR, et rang dans `nodes` du nœud d'origine."""
+    starts, counts = indptr[nodes], indptr[nodes + 1] - indptr[nodes]
+    owner = np.repeat(np.arange(len(nodes)), counts)
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    return values[starts[owner] + offsets], owner
+
+def _contains(sorted_values, x):
+    if not len(sorted_values): return np.zeros(np.shape(x), dtype=bool)
+    i = np.searchsorted(sorted_values, x)
+    return (i < len(sorted_values)) & (sorted_values[np.minimum(i, len(sorted_values) - 1)] == x)
+
+class _Side:
+    """Un côté de la recherche : niveaux (nœuds triés, parents alignés) et visités par type."""
+    __slots__ = ("kind", "levels", "visited")
+
+    def __init__(self, kind, start):
+        self.kind = kind  # type des nœuds du niveau 0
+        self.levels = [(np.array([start], dtype=np.int64), np.array([-1], dtype=np.int64))]
+        self.visited = {kind: self.levels[0][0], 1 - kind: np.empty(0, dtype=np.int64)}
+
+    def level_kind(self, depth):
+        return self.kind if depth % 2 == 0 else 1 - self.kind
+
+    def frontier_kind(self):
+        return self.level_kind(len(self.levels) - 1)
+
+    def cost(self, index):
+        indptr, _ = _adjacency(index, self.frontier_kind())
+        frontier = self.levels[-1][0]
+        return int((indptr[frontier + 1] - indptr[frontier]).sum())
+
+    def expand(self, index, films):
+        kind = self.frontier_kind()
+        frontier = self.levels[-1][0]
+        neighbours, owner = _gather(*_adjacency(index, kind), frontier)
+        if kind == PERSON and films is not None:
+            keep = films[neighbours]
+            neighbours, owner = neighbours[keep], owner[keep]
+        nodes, first = np.unique(neighbours, return_index=True)  # parent : premier nœud de la frontière qui l'atteint
+        fresh = ~_contains(self.visited[1 - kind], nodes)
+        nodes, parents = nodes[fresh].astype(np.int64), frontier[owner[first[fresh]]]
+        self.levels.append((nodes, parents))
+        self.visited[1 - kind] = np.union1d(self.visited[1 - kind], nodes)
+        return 1 - kind, nodes
+
+    def path_to(self, kind, x):
+        """[(type, id), ...] du nœud de départ jusqu'à x, visité par ce côté (une seule fois par type)."""
+        depth = next(d for d in range(len(self.levels)) if self.level_kind(d) == kind and _contains(self.levels[d][0], x))
+        path = [x]
+        for d in range(depth, 0, -1):
+            nodes, parents = self.levels[d]
+            path.append(int(parents[np.searchsorted(nodes, path[-1])]))
+        return [(self.level_kind(d), n) for d, n in zip(range(depth, -1, -1), path)][::-1]
+
+def shortest_path(index, source, target, max_hops=MAX_HOPS, films=None, stats=None):
+    """Plus court chemin entre deux nœuds (voir node()) : [(type, id), ...] de source à target.
+
+    films : masque booléen des codes film traversables (catalogue_films pour des chemins
+    affichables) ; les extrémités, elles, peuvent être n'importe quel film. None si l'un des
+    nœuds est inconnu ou s'il n'existe pas de chemin d'au plus max_hops liens.
+    stats : dict facultatif, reçoit "visited" (nœuds visités par les deux côtés).
+    """
+    if source is None or target is None: return None
+    if source == target: return [source]
+    a, b = _Side(*source), _Side(*target)
+    path = _search(index, a, b, max_hops, films)
+    if stats is not None: stats["visited"] = sum(len(nodes) for side in (a, b) for nodes, _ in side.levels)
+    return path
+
+def _search(index, a, b, max_hops, films):
+    hops = 0
+    while hops < max_hops:
+        side, other = (a, b) if a.cost(index) <= b.cost(index) else (b, a)
+        kind, nodes = side.expand(index, films)
+        hops += 1
+        if not len(nodes): return None  # composante épuisée : pas de chemin
+        met = nodes[_contains(other.visited[kind], nodes)]
+        if len(met):
+            x = int(met[0])
+            head, tail = a.path_to(kind, x), b.path_to(kind, x)
+            return head + tail[::-1][1:]
+    return None
@@ -0,0 +1,151 @@
+"""Moteurs de similarité interchangeables derrière recommend_movies.
+
+Tous travaillent sur la matrice de score X (voir backend.scoring_matrix) et ses canaux denses E
+(backend.scoring_dense, ou None) : X[i] @ X[j] + E[i] @ E[j] est le score combiné. Même interface :
+
+    engine.query(idx, n)  -> (positions, scores) des n meilleurs voisins, idx exclu
+    engine.memory_bytes() -> empreinte mémoire des structures de l'index
+    engine.build_seconds
+
+- "exact" : produit creux X @ X[idx].T, référence pour le rappel ;
+- "svd"   : projection dense réduite par TruncatedSVD (LSA), produit dense de faible dimension,
+            puis reclassement exact des n × rerank meilleurs candidats ;
+- "lsh"   : hachage par hyperplans aléatoires (SimHash) multi-tables en NumPy, avec sondage
+            des codes voisins à 1 bit près puis reclassement exact des seuls candidats.
+"""
+import time
+import numpy as np
+
+def top_n(score, n, exclude=None):
+    """Les n meilleurs scores (positions, valeurs) : argpartition O(len) puis tri des n retenus."""
+    if exclude is not None:
+        score = score.copy()
+        score[exclude] = -np.inf
+    n = min(n, len(score) - (exclude is not None))
+    part = np.argpartition(score, -n)[-n:]
+    order = part[np.argsort(-score[part], kind="stable")]
+    return order, score[order]
+
+def _nbytes(*arrays):
+    total = 0
+    for a in arrays:
+        if a is None: continue
+        if hasattr(a, "indptr"): total += a.data.nbytes + a.indices.nbytes + a.indptr.nbytes
+        else: total += a.nbytes
+    return total
+
+def exact_scores(X, E, idx, rows=None):
+    """Scores exacts de idx face aux lignes `rows` (toutes par défaut) : partie creuse plus partie dense."""
+    Xr = X if rows is None else X[rows]
+    score = (Xr @ X[idx].T).toarray().ravel()
+    if E is not None: score += (E if rows is None else E[rows]) @ E[idx]
+    return score
+
+class ExactEngine:
+    name = "exact"
+
+    def __init__(self, X, E=None):
+        t0 = time.perf_counter()
+        self.X, self.E = X.tocsr(), E
+        self.build_seconds = time.perf_counter() - t0
+
+    def scores(self, idx):
+        return exact_scores(self.X, self.E, idx)
+
+    def query(self, idx, n=10):
+        return top_n(self.scores(idx), n, exclude=idx)
+
+    def memory_bytes(self):
+        return _nbytes(self.X, self.E)
+
+class SVDEngine:
+    name = "svd"
+
+    def __init__(self, X, E=None, n_components=64, rerank=5, random_state=0):
+        from sklearn.decomposition import TruncatedSVD
+        t0 = time.perf_counter()
+        self.X, self.E, self.rerank = X.tocsr(), E, rerank
+        n_components = min(n_components, X.shape[1] - 1)
+        # Z Z^T approxime X X^T : les scores restent à l'échelle du score combiné ; E, déjà dense et
+        # de faible dimension, est ajouté tel quel
+        self.Z = TruncatedSVD(n_components=n_components, random_state=random_state).fit_transform(X).astype(np.float32)
+        if E is not None: self.Z = np.hstack([self.Z, E]).astype(np.float32)
+        self.build_seconds = time.perf_counter() - t0
+
+    def query(self, idx, n=10):
+        cand, approx = top_n(self.Z @ self.Z[idx], n * max(self.rerank, 1), exclude=idx)
+        if self.rerank <= 1: return cand, approx
+        # Pré-filtre dense puis reclassement exact des n × rerank candidats
+        order, score = top_n(exact_scores(self.X, self.E, idx, cand), n)
+        return cand[order], score
+
+    def memory_bytes(self):
+        return _nbytes(self.Z, self.X, self.E)
+
+class LSHEngine:
+    name = "lsh"
+
+    def __init__(self, X, E=None, n_tables=8, n_bits=14, random_state=0):
+        t0 = time.perf_counter()
+        self.X, self.E = X.tocsr(), E
+        rng = np.random.default_rng(random_state)
+        # Hyperplans sur les colonnes de X puis celles de E : mêmes codes que sur [X | E]
+        dims = X.shape[1] + (0 if E is None else E.shape[1])
+        self.planes = rng.standard_normal((dims, n_tables * n_bits)).astype(np.float32)
+        self.n_tables, self.n_bits = n_tables, n_bits
+        self.weights = (1 << np.arange(n_bits, dtype=np.int64))
+        bits = self._project() > 0
+        codes = bits.reshape(-1, n_tables, n_bits).astype(np.int64) @ self.weights  # (n, tables)
+        # Par table : codes triés + permutation ; un seau = une tranche trouvée par searchsorted
+        self.order = np.argsort(codes, axis=0, kind="stable").astype(np.int32)
+        self.sorted_codes = np.take_along_axis(codes, self.order, axis=0)
+        self.build_seconds = time.perf_counter() - t0
+
+    def _project(self, rows=None):
+        d = self.X.shape[1]
+        out = np.asarray((self.X if rows is None else self.X[rows]) @ self.planes[:d])
+        if self.E is not None: out = out + (self.E if rows is None else self.E[rows]) @ self.planes[d:]
+        return out
+
+    def _codes(self, idx):
+        bits = self._project([idx]).ravel() > 0
+        return bits.reshape(self.n_tables, self.n_bits).astype(np.int64) @ self.weights
+
+    def candidates(self, idx):
+        codes = self._codes(idx)
+        found = []
+        for t, code in enumerate(codes):
+            # Sondage multiple : le seau exact et ceux à distance de Hamming 1
+            probes = np.concatenate(([code], code ^ self.weights))
+            col = self.sorted_codes[:, t]
+            lo, hi = np.searchsorted(col, probes, side="left"), np.searchsorted(col, probes, side="right")
+            found.extend(self.order[a:b, t] for a, b in zip(lo, hi) if b > a)
+        return np.unique(np.concatenate(found)) if found else np.empty(0, dtype=np.int32)
+
+    def query(self, idx, n=10):
+        cand = self.candidates(idx)
+        cand = cand[cand != idx]
+        if len(cand) < n:  # seaux trop pauvres : repli exact plutôt qu'un résultat tronqué
+            return top_n(exact_scores(self.X, self.E, idx), n, exclude=idx)
+        order, score = top_n(exact_scores(self.X, self.E, idx, cand), n)
+        return cand[order], score
+
+    def memory_bytes(self):
+        return _nbytes(self.X, self.E, self.planes, self.order, self.sorted_codes)
+
+ENGINES = {"exact": ExactEngine, "svd": SVDEngine, "lsh": LSHEngine}
+
+def build_engine(name, X, E=None, **params):
+    if name not in ENGINES:
+        raise ValueError(f"Moteur de similarité inconnu : {name} (choix : {', '.join(ENGINES)})")
+    return ENGINES[name](X, E, **params)
+
+def recall_at(engine, reference, queries, n=10):
+    """Rappel@n moyen face au moteur exact ; un ex aequo du n-ième score exact compte comme trouvé."""
+    hits = 0
+    for idx in queries:
+        ref_scores = reference.scores(idx)
+        _, best = reference.query(idx, n)
+        got, _ = engine.query(idx, n)
+        hits += int(np.sum(ref_scores[got] >= best[-1] - 1e-9))
+    return hits / (n * len(queries))
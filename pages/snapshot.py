@@ -0,0 +1,155 @@
+"""Snapshot colonnaire (Arrow IPC) du catalogue, chargé par memory-map.
+
+Les trois CSV sont compilés une fois en fichiers `.arrow` non compressés, dans un
+répertoire versionné par l'empreinte des sources. Les workers Streamlit d'un même
+hôte mappent les mêmes fichiers et partagent donc les pages du cache noyau.
+Les textes volumineux vont dans des fichiers `<nom>-text.arrow` à part, lus à la
+demande (voir text_store) : les DataFrames chargés n'en contiennent pas.
+
+Les sources sont les CSV de base suivis des mises à jour ingérées (data/updates/<nom>/, dans
+l'ordre des noms, voir ingest.py) ; l'empreinte couvre les unes et les autres.
+
+    python snapshot.py      # (depuis pages/) construit ou rafraîchit le snapshot
+"""
+import json
+import os
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import storage
+import text_store
+
+SNAPSHOT_VERSION = 3  # à incrémenter quand load_csv change les colonnes produites
+SOURCES = {"movie": "movie.csv", "people": "intervenants.csv", "link": "intermediaire.csv"}
+
+def _string_dtype():
+    # Chaînes Arrow avec sémantique NaN (celle de pandas 3) : pas de copie en objets Python
+    try:
+        return pd.StringDtype("pyarrow", na_value=np.nan)
+    except TypeError:
+        try: return pd.StringDtype("pyarrow_numpy")
+        except TypeError: return None
+
+STRING_DTYPE = _string_dtype()
+
+UPDATES_DIR = "updates"
+VERSION_FILE = "catalogue.json"  # marqueur réécrit par ingest.py à chaque publication
+
+def source_paths(data_dir=storage.DATA_DIR):
+    return {name: os.path.join(data_dir, f) for name, f in SOURCES.items()}
+
+def delta_dirs(data_dir=storage.DATA_DIR):
+    """Mises à jour ingérées, dans l'ordre d'application ; les répertoires cachés (en cours d'ingestion) sont ignorés."""
+    root = os.path.join(data_dir, UPDATES_DIR)
+    try: names = sorted(n for n in os.listdir(root) if not n.startswith("."))
+    except OSError: return []
+    return [os.path.join(root, n) for n in names if os.path.isdir(os.path.join(root, n))]
+
+def source_files(data_dir=storage.DATA_DIR, deltas=None):
+    """{'movie': [CSV de base, CSV des mises à jour...], ...} ; une mise à jour peut ne contenir qu'une partie des fichiers."""
+    deltas = delta_dirs(data_dir) if deltas is None else deltas
+    files = {name: [path] for name, path in source_paths(data_dir).items()}
+    for d in deltas:
+        for name, f in SOURCES.items():
+            if os.path.exists(os.path.join(d, f)): files[name].append(os.path.join(d, f))
+    return files
+
+def snapshot_dir(data_dir=storage.DATA_DIR, cache_dir=storage.CACHE_DIR, deltas=None):
+    deltas = delta_dirs(data_dir) if deltas is None else deltas
+    paths = source_paths(data_dir)
+    extra = f"v{SNAPSHOT_VERSION}"
+    files = list(paths.values())
+    for d in deltas:  # sans mise à jour, l'empreinte (et donc le snapshot) est celle des seuls CSV de base
+        present = [f for f in SOURCES.values() if os.path.exists(os.path.join(d, f))]
+        extra += "|" + ",".join(present)
+        files += [os.path.join(d, f) for f in present]
+    digest = storage.files_digest(files, extra=extra)
+    return os.path.join(cache_dir, f"snapshot-v{SNAPSHOT_VERSION}-{digest[:16]}"), paths
+
+def catalogue_stamp(data_dir=storage.DATA_DIR, cache_dir=storage.CACHE_DIR):
+    """Empreinte bon marché de la version servie : taille et date des CSV de base et du marqueur de version.
+
+    Quelques stat() par rerun, sans relire les fichiers. ingest.py réécrit le marqueur en dernier,
+    une fois tout publié (mise à jour ou réajustement) : l'empreinte ne change qu'une fois par version.
+    """
+    paths = [*source_paths(data_dir).values(), os.path.join(cache_dir, VERSION_FILE)]
+    stamp = []
+    for p in paths:
+        try: info = os.stat(p)
+        except OSError: stamp.append((p, None)); continue
+        stamp.append((p, info.st_size, info.st_mtime_ns))
+    return tuple(stamp)
+
+def _to_table(df):
+    table = pa.Table.from_pandas(df, preserve_index=True)
+    # large_string = type natif des chaînes Arrow de pandas, évite un cast (et une copie) au chargement
+    schema = pa.schema([f.with_type(pa.large_string()) if pa.types.is_string(f.type) else f for f in table.schema],
+                       metadata=table.schema.metadata)
+    return table.cast(schema)
+
+def _read_table(path):
+    table = pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+    mapper = (lambda t: STRING_DTYPE if pa.types.is_large_string(t) or pa.types.is_string(t) else None) if STRING_DTYPE is not None else None
+    return table.to_pandas(types_mapper=mapper, split_blocks=True)
+
+def write_snapshot(frames, data_dir=storage.DATA_DIR, cache_dir=storage.CACHE_DIR, deltas=None, texts=None):
+    """Écrit les DataFrames {'movie', 'people', 'link'} dans le snapshot correspondant aux sources.
+
+    texts : tables de textes déjà séparées (ingest.py), les DataFrames n'ont alors plus ces colonnes.
+    """
+    deltas = delta_dirs(data_dir) if deltas is None else deltas
+    target, paths = snapshot_dir(data_dir, cache_dir, deltas)
+
+    def build(tmp):
+        text_rows = {}
+        for name, df in frames.items():
+            text = (texts or {}).get(name)
+            if text is None: df, text = text_store.split(name, df)
+            text_store.write(_to_table(df), os.path.join(tmp, f"{name}.arrow"))
+            if text is not None:
+                text_store.write(text, os.path.join(tmp, f"{name}-text.arrow"))
+                text_rows[name] = text.num_rows
+        manifest = {"version": SNAPSHOT_VERSION,
+                    "sources": {name: storage.file_sha256(p) for name, p in paths.items()},
+                    "updates": [os.path.basename(d).lstrip(".") for d in deltas],
+                    "rows": {name: len(df) for name, df in frames.items()}, "text_rows": text_rows}
+        with open(os.path.join(tmp, "manifest.json"), "w") as f:
+            json.dump(manifest, f, indent=2)
+
+    storage.publish_dir(build, target)
+    storage.prune_dirs(cache_dir, "snapshot-", keep=target)
+    return target
+
+def read_snapshot(data_dir=storage.DATA_DIR, cache_dir=storage.CACHE_DIR, deltas=None):
+    """Renvoie {'movie', 'people', 'link'} si un snapshot à jour existe, sinon None."""
+    target, _ = snapshot_dir(data_dir, cache_dir, deltas)
+    try:
+        with open(os.path.join(target, "manifest.json")) as f:
+            manifest = json.load(f)
+        if manifest.get("version") != SNAPSHOT_VERSION: return None
+        frames = {name: _read_table(os.path.join(target, f"{name}.arrow")) for name in SOURCES}
+    except (OSError, ValueError, pa.ArrowInvalid):
+        return None
+    if any(len(frames[n]) != manifest["rows"].get(n) for n in SOURCES): return None
+    return frames
+
+def read_text(data_dir=storage.DATA_DIR, cache_dir=storage.CACHE_DIR, deltas=None):
+    """Tables de textes mappées {'movie', 'people'} du snapshot à jour, None s'il n'existe pas."""
+    target, _ = snapshot_dir(data_dir, cache_dir, deltas)
+    try:
+        with open(os.path.join(target, "manifest.json")) as f:
+            manifest = json.load(f)
+        if manifest.get("version") != SNAPSHOT_VERSION: return None
+        tables = {name: text_store.read(os.path.join(target, f"{name}-text.arrow")) for name in manifest["text_rows"]}
+    except (OSError, ValueError, KeyError, pa.ArrowInvalid):
+        return None
+    if any(tables[n].num_rows != rows for n, rows in manifest["text_rows"].items()): return None
+    return tables
+
+if __name__ == "__main__":
+    import time
+    import backend
+    t0 = time.perf_counter()
+    frames = dict(zip(SOURCES, backend.load_csv()))
+    path = write_snapshot(frames)
+    print(f"Snapshot écrit dans {path} en {time.perf_counter() - t0:.2f}s")
@@ -0,0 +1,79 @@
+"""Variantes redimensionnées des images de ../assets, servies par le static serving de Streamlit.
+
+Chaque image source donne une variante WebP et une JPEG par largeur de VARIANT_WIDTHS (sans
+agrandir), écrites dans ./static sous un nom contenant l'empreinte de la source :
+
+    static/popcorn-<sha8>-640.webp, static/popcorn-<sha8>-1200.jpg, ...
+
+et servies à l'URL app/static/<nom> (voir .streamlit/config.toml, enableStaticServing).
+Streamlit ne les sert qu'avec ETag et Last-Modified, sans Cache-Control : le navigateur les
+revalide (304 sans corps) au lieu de les garder sans condition. Le nom changeant avec le contenu,
+une URL ne désigne jamais qu'une image : elle reste sûre à mettre en cache (proxy, CDN).
+Les variantes manquantes sont produites au premier appel ; la CLI les pré-construit :
+
+    cd pages && python static_assets.py
+"""
+import functools
+import os
+from PIL import Image
+import storage
+
+ASSETS_DIR = "../assets"
+STATIC_DIR = "static"
+STATIC_URL = "app/static"
+VARIANT_WIDTHS = (640, 1200)
+FORMATS = {"webp": {"format": "WEBP", "quality": 78, "method": 6},
+           "jpg": {"format": "JPEG", "quality": 80, "optimize": True, "progressive": True}}
+
+def variant_name(path, digest, width, ext):
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return f"{stem}-{digest[:8]}-{width}.{ext}"
+
+def build_variants(path, out_dir=STATIC_DIR):
+    """Écrit les variantes manquantes de l'image `path` ; renvoie {largeur: {ext: nom de fichier}}."""
+    digest = storage.file_sha256(path)
+    with Image.open(path) as im:
+        widths = sorted({min(w, im.width) for w in VARIANT_WIDTHS})
+        names = {w: {ext: variant_name(path, digest, w, ext) for ext in FORMATS} for w in widths}
+        missing = [(w, ext) for w in widths for ext in FORMATS if not os.path.exists(os.path.join(out_dir, names[w][ext]))]
+        if missing:
+            os.makedirs(out_dir, exist_ok=True)
+            im = im.convert("RGB")
+        for w, ext in missing:
+            resized = im if w == im.width else im.resize((w, round(im.height * w / im.width)), Image.LANCZOS)
+            target = os.path.join(out_dir, names[w][ext])
+            tmp = f"{target}.{os.getpid()}.tmp"
+            resized.save(tmp, **FORMATS[ext])
+            os.replace(tmp, target)
+    return names
+
+@functools.lru_cache(maxsize=None)
+def image_urls(path):
+    """URLs des variantes de `path` ({largeur: {ext: url}}), None si l'image ou le répertoire static est inaccessible."""
+    try:
+        names = build_variants(path)
+    except OSError:
+        return None
+    return {w: {ext: f"{STATIC_URL}/{name}" for ext, name in by_ext.items()} for w, by_ext in names.items()}
+
+def background_css(selector, urls, overlay=""):
+    """Règles CSS d'arrière-plan responsive : WebP via image-set, JPEG en repli, la petite variante sous 768px."""
+    layer = f"{overlay}, " if overlay else ""
+    def rule(v):
+        return (f"{selector} {{ background-image: {layer}url('{v['jpg']}'); "
+                f"background-image: {layer}image-set(url('{v['webp']}') type('image/webp'), url('{v['jpg']}') type('image/jpeg')); }}")
+    widths = sorted(urls)
+    css = [rule(urls[widths[-1]])]
+    if len(widths) > 1:
+        css.append(f"@media (max-width: 768px) {{ {rule(urls[widths[0]])} }}")
+    return "\n".join(css)
+
+def main():
+    for name in sorted(os.listdir(ASSETS_DIR)):
+        if name.lower().endswith((".jpg", ".jpeg")):  # photos ; le repli JPEG perdrait la transparence des PNG
+            for w, by_ext in build_variants(os.path.join(ASSETS_DIR, name)).items():
+                sizes = ", ".join(f"{n} ({os.path.getsize(os.path.join(STATIC_DIR, n)) // 1024} Ko)" for n in by_ext.values())
+                print(f"{name} {w}px : {sizes}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import tempfile
+from contextlib import contextmanager
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows : pas de verrou inter-process
+    fcntl = None
+
+# --- EMPLACEMENTS ---
+DATA_DIR = os.environ.get("JCI_DATA_DIR", "../data")
+CACHE_DIR = os.environ.get("JCI_CACHE_DIR", "../cache")
+# Clés gardées par cache fichier (prune_files) : la version publiée et la précédente, que des
+# sessions servent encore jusqu'à leur rerun suivant (max_entries=2 des caches de l'app)
+KEEP_VERSIONS = 2
+
+def files_digest(paths, extra=""):
+    """Empreinte sha256 du contenu d'une liste de fichiers (+ une chaîne de paramètres)."""
+    h = hashlib.sha256(extra.encode())
+    for path in paths:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+    return h.hexdigest()
+
+def file_sha256(path):
+    return files_digest([path])
+
+@contextmanager
+def file_lock(path):
+    """Verrou exclusif inter-process (flock) le temps du bloc."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "a") as f:
+        if fcntl: fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl: fcntl.flock(f, fcntl.LOCK_UN)
+
+def save_npy(path, array):
+    """np.save atomique (fichier temporaire voisin + os.replace)."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp.npy"
+    np.save(tmp, array)
+    os.replace(tmp, path)
+    return path
+
+def save_pickle(path, obj):
+    """pickle.dump atomique (fichier temporaire voisin + os.replace)."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
+    return path
+
+def save_json(path, obj):
+    """json.dump atomique (fichier temporaire voisin + os.replace)."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(obj, f, indent=2)
+    os.replace(tmp, path)
+    return path
+
+def publish_dir(build, target, replace=False):
+    """Construit un répertoire dans un dossier temporaire voisin puis le publie par os.replace.
+
+    `build(tmp_dir)` écrit les fichiers. Si un autre process a publié `target` entre-temps,
+    on garde sa version (les répertoires sont adressés par contenu, donc équivalents), sauf
+    avec replace=True (réajustement forcé) : l'ancienne version est écartée puis supprimée.
+    """
+    parent = os.path.dirname(os.path.abspath(target))
+    os.makedirs(parent, exist_ok=True)
+    tmp, old = tempfile.mkdtemp(prefix=".tmp-", dir=parent), None
+    os.chmod(tmp, 0o755)
+    try:
+        build(tmp)
+        if replace and os.path.isdir(target):
+            old = tempfile.mkdtemp(prefix=".old-", dir=parent)
+            os.replace(target, os.path.join(old, "dir"))
+        try:
+            os.replace(tmp, target)
+        except OSError:
+            if not os.path.isdir(target): raise
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+        if old: shutil.rmtree(old, ignore_errors=True)
+    return target
+
+def prune_dirs(parent, prefix, keep):
+    """Supprime les anciennes versions `prefix*` sauf `keep` (les mmap ouverts restent valides sous POSIX)."""
+    if not os.path.isdir(parent): return
+    for name in os.listdir(parent):
+        if name.startswith(prefix) and name != os.path.basename(keep):
+            shutil.rmtree(os.path.join(parent, name), ignore_errors=True)
+
+def prune_files(parent, prefix, keep=KEEP_VERSIONS):
+    """Supprime les fichiers `prefix<clé>.*` sauf ceux des `keep` clés écrites en dernier (mtime) ; renvoie les chemins supprimés."""
+    if not os.path.isdir(parent): return []
+    groups = {}  # clé -> (chemins, mtime le plus récent)
+    for name in os.listdir(parent):
+        path = os.path.join(parent, name)
+        if not name.startswith(prefix) or not os.path.isfile(path): continue
+        try: mtime = os.path.getmtime(path)
+        except OSError: continue
+        key = name[len(prefix):].split(".", 1)[0]
+        paths, latest = groups.get(key, ([], 0.0))
+        groups[key] = (paths + [path], max(latest, mtime))
+    removed = []
+    for key in sorted(groups, key=lambda k: groups[k][1], reverse=True)[keep:]:
+        for path in groups[key][0]:
+            try:
+                os.remove(path)
+                removed.append(path)
+            except OSError: pass
+    return removed
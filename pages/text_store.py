@@ -0,0 +1,45 @@
+"""Textes volumineux du catalogue (synopsis, accroches, mots-clés bruts, biographies), hors des DataFrames.
+
+Le snapshot les range dans <nom>-text.arrow, à côté des colonnes de base, triés par identifiant.
+Le fichier est mappé en mémoire : seules les pages effectivement lues (une valeur, trouvée par
+bisection sur la colonne d'identifiants) entrent dans le RSS du worker.
+
+    store = {"movie": table, "people": table}   # voir snapshot.read_text
+    get(store, "people", "nm0000134", "tmdb_biography_fr") -> str | None
+"""
+import bisect
+import pyarrow as pa
+
+HEAVY_COLUMNS = {
+    "movie": ["movie_overview", "movie_overview_fr", "movie_tagline", "movie_tagline_fr", "keywords"],
+    "people": ["tmdb_biography_fr"],
+}
+KEYS = {"movie": "tconst", "people": "nconst"}
+
+def split(name, df):
+    """(df sans ses textes volumineux, table Arrow identifiant + textes triée par identifiant ou None)."""
+    cols = [c for c in HEAVY_COLUMNS.get(name, ()) if c in df.columns]
+    if not cols: return df, None
+    key = KEYS[name]
+    text = df[[key, *cols]].sort_values(key, kind="stable")
+    table = pa.Table.from_pandas(text, preserve_index=False)
+    table = table.cast(pa.schema([pa.field(f.name, pa.large_string()) for f in table.schema]))
+    return df.drop(columns=cols), table
+
+def write(table, path):
+    with pa.OSFile(path, "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+def read(path):
+    return pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+
+def get(store, name, key, column):
+    """Texte `column` de l'identifiant `key`, None si inconnu ou vide."""
+    table = (store or {}).get(name)
+    if table is None or column not in table.column_names: return None
+    ids = table.column(0)
+    pos = bisect.bisect_left(range(len(ids)), key, key=lambda i: ids[i].as_py())
+    if pos == len(ids) or ids[pos].as_py() != key: return None
+    value = table.column(column)[pos].as_py()
+    return value if value else None
@@ -0,0 +1,219 @@
+"""Cache local des affiches et photos TMDB, redimensionnées à leur taille d'affichage.
+
+Chaque image distante est téléchargée une fois, réduite à la largeur de SIZES puis stockée en
+WebP dans static/thumbs (servi à app/static/thumbs, voir .streamlit/config.toml). Tant qu'une
+miniature n'est pas en cache, la page garde l'URL distante et le téléchargement part en tâche de
+fond sur un pool borné : un rerun n'attend jamais le CDN. Le répertoire est plafonné
+(JCI_THUMB_CACHE_MB) et purgé des fichiers les moins récemment servis (mtime mis à jour à
+chaque accès). Les images de remplacement sont dessinées localement.
+
+JCI_IMAGE_BASE_URL remplace https://image.tmdb.org (serveur local de test, miroir...).
+Pré-chauffage de tout le catalogue :
+
+    cd pages && python thumbnails.py --workers 16
+"""
+import argparse
+import base64
+import functools
+import hashlib
+import io
+import os
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image, ImageDraw, ImageFont
+import static_assets
+
+SIZES = {"avatar": 170, "card": 300, "detail": 500}  # largeurs en px (≈ 2× la taille affichée)
+THUMB_DIR = os.path.join(static_assets.STATIC_DIR, "thumbs")
+THUMB_URL = f"{static_assets.STATIC_URL}/thumbs"
+CACHE_BYTES = int(os.environ.get("JCI_THUMB_CACHE_MB", "200")) << 20
+REMOTE_BASE = "https://image.tmdb.org"
+IMAGE_BASE_URL = os.environ.get("JCI_IMAGE_BASE_URL", "").rstrip("/")
+FETCH_TIMEOUT = 10
+BACKGROUND_WORKERS = 4
+
+_lock = threading.Lock()
+_state = {"bytes": {}, "inflight": set(), "failed": set()}  # bytes : octets en cache par répertoire
+_pool = None
+
+# --- URLS ET NOMS ---
+def is_remote(url):
+    return isinstance(url, str) and url.startswith(("http://", "https://"))
+
+def source_url(url):
+    if IMAGE_BASE_URL and url.startswith(REMOTE_BASE):
+        return IMAGE_BASE_URL + url[len(REMOTE_BASE):]
+    return url
+
+def thumb_name(url, size):
+    return f"{hashlib.sha1(url.encode()).hexdigest()[:20]}-{size}.webp"
+
+@functools.lru_cache(maxsize=1)
+def _serving():
+    try:
+        import streamlit as st
+        return bool(st.get_option("server.enableStaticServing"))
+    except Exception:
+        return False
+
+# --- TÉLÉCHARGEMENT, STOCKAGE, ÉVICTION ---
+def fetch(url, size, out_dir=THUMB_DIR):
+    """Télécharge, réduit et stocke une miniature ; renvoie le nombre d'octets écrits (0 si déjà là)."""
+    target = os.path.join(out_dir, thumb_name(url, size))
+    if os.path.exists(target): return 0
+    request = urllib.request.Request(source_url(url), headers={"User-Agent": "jci-thumbnails"})
+    with urllib.request.urlopen(request, timeout=FETCH_TIMEOUT) as resp:
+        raw = resp.read()
+    with Image.open(io.BytesIO(raw)) as im:
+        im = im.convert("RGB")
+        width = min(SIZES[size], im.width)
+        if width < im.width:
+            im = im.resize((width, round(im.height * width / im.width)), Image.LANCZOS)
+        os.makedirs(out_dir, exist_ok=True)
+        tmp = f"{target}.{os.getpid()}.{threading.get_ident()}.tmp"
+        im.save(tmp, format="WEBP", quality=80, method=4)
+    os.replace(tmp, target)
+    written = os.path.getsize(target)
+    with _lock:
+        if out_dir in _state["bytes"]: _state["bytes"][out_dir] += written
+        if _usage(out_dir) > CACHE_BYTES: _evict(out_dir)
+    return written
+
+def _usage(out_dir):
+    # Un seul parcours du répertoire par processus, puis comptabilité incrémentale
+    if out_dir not in _state["bytes"]:
+        try: _state["bytes"][out_dir] = sum(e.stat().st_size for e in os.scandir(out_dir) if e.name.endswith(".webp"))
+        except OSError: _state["bytes"][out_dir] = 0
+    return _state["bytes"][out_dir]
+
+def _evict(out_dir, target=0.9):
+    """Supprime les miniatures les moins récemment servies jusqu'à target × CACHE_BYTES (appelé sous _lock)."""
+    entries = sorted((e.stat().st_mtime, e.stat().st_size, e.path) for e in os.scandir(out_dir) if e.name.endswith(".webp"))
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in entries:
+        if total <= CACHE_BYTES * target: break
+        try: os.remove(path)
+        except OSError: continue
+        total -= size
+    _state["bytes"][out_dir] = total
+
+def cached_path(url, size, out_dir=THUMB_DIR):
+    path = os.path.join(out_dir, thumb_name(url, size))
+    try: os.utime(path)  # accès récent : dernier servi, dernier évincé
+    except OSError: return None
+    return path
+
+def _fetch_background(url, size):
+    try: fetch(url, size)
+    except Exception:
+        with _lock: _state["failed"].add((url, size))  # pas de nouvel essai avant redémarrage
+    finally:
+        with _lock: _state["inflight"].discard((url, size))
+
+def _schedule(url, size):
+    global _pool
+    with _lock:
+        if (url, size) in _state["inflight"] or (url, size) in _state["failed"]: return
+        _state["inflight"].add((url, size))
+        if _pool is None: _pool = ThreadPoolExecutor(BACKGROUND_WORKERS, thread_name_prefix="thumbs")
+    _pool.submit(_fetch_background, url, size)
+
+# --- IMAGES DE REMPLACEMENT ---
+PLACEHOLDERS = {"poster": ((300, 450), "AFFICHE\nINDISPONIBLE"), "profile": ((170, 170), None)}
+
+@functools.lru_cache(maxsize=None)
+def placeholder_png(kind):
+    (w, h), text = PLACEHOLDERS[kind]
+    im = Image.new("RGB", (w, h), (26, 26, 26))
+    draw = ImageDraw.Draw(im)
+    if text:
+        draw.multiline_text((w / 2, h / 2), text, fill=(215, 0, 29), anchor="mm", align="center",
+                            font=ImageFont.load_default(size=w // 12), spacing=8)
+    else:  # silhouette : tête et épaules
+        draw.ellipse((w * .34, h * .18, w * .66, h * .50), fill=(90, 90, 90))
+        draw.ellipse((w * .18, h * .56, w * .82, h * 1.1), fill=(90, 90, 90))
+    buf = io.BytesIO()
+    im.save(buf, format="PNG", optimize=True)
+    return buf.getvalue()
+
+@functools.lru_cache(maxsize=None)
+def placeholder_path(kind):
+    path = os.path.join(static_assets.STATIC_DIR, f"placeholder-{kind}.png")
+    if not os.path.exists(path):
+        os.makedirs(static_assets.STATIC_DIR, exist_ok=True)
+        with open(f"{path}.{os.getpid()}.tmp", "wb") as f: f.write(placeholder_png(kind))
+        os.replace(f"{path}.{os.getpid()}.tmp", path)
+    return path
+
+def placeholder_src(kind):
+    if _serving():
+        try: return f"{static_assets.STATIC_URL}/{os.path.basename(placeholder_path(kind))}"
+        except OSError: pass
+    return "data:image/png;base64," + base64.b64encode(placeholder_png(kind)).decode()
+
+# --- API DES PAGES ---
+def resolve(url, size="card", kind="poster"):
+    """(src, miniature locale ou None, définitive) : src n'est provisoire que pendant un téléchargement."""
+    if not is_remote(url): return placeholder_src(kind), None, True
+    if not _serving(): return source_url(url), None, True
+    path = cached_path(url, size)
+    if path is not None:
+        return f"{THUMB_URL}/{thumb_name(url, size)}", path, True
+    _schedule(url, size)
+    return source_url(url), None, False
+
+def src(url, size="card", kind="poster"):
+    """Valeur de <img src> : miniature locale si en cache, sinon URL distante (et mise en cache en fond)."""
+    return resolve(url, size, kind)[0]
+
+def image(url, size="detail", kind="poster"):
+    """Argument de st.image : chemin local (miniature ou remplacement) ou URL distante."""
+    if not is_remote(url):
+        try: return placeholder_path(kind)
+        except OSError: return placeholder_png(kind)
+    path = cached_path(url, size)
+    if path is not None: return path
+    _schedule(url, size)
+    return source_url(url)
+
+# --- PRÉ-CHAUFFAGE ---
+def catalogue_urls(df_movie, df_people):
+    from utils import get_poster_url
+    posters = {get_poster_url(row) for _, row in df_movie.iterrows()}
+    profiles = set(df_people["tmdb_profile_url"].dropna()) if "tmdb_profile_url" in df_people else set()
+    return sorted(u for u in posters if is_remote(u)), sorted(u for u in profiles if is_remote(u))
+
+def prewarm(jobs, workers=16, out_dir=THUMB_DIR):
+    """Télécharge les (url, taille) manquants sur un pool de `workers` threads ; renvoie les compteurs."""
+    stats = {"jobs": len(jobs), "fetched": 0, "cached": 0, "failed": 0, "bytes": 0}
+    def one(job):
+        try: return fetch(*job, out_dir=out_dir), None
+        except Exception as exc: return 0, exc
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for written, exc in pool.map(one, jobs):
+            if exc is not None: stats["failed"] += 1
+            elif written: stats["fetched"] += 1; stats["bytes"] += written
+            else: stats["cached"] += 1
+    stats["seconds"] = time.perf_counter() - t0
+    return stats
+
+def main():
+    parser = argparse.ArgumentParser(description="Pré-chauffe le cache de miniatures (affiches et photos du catalogue)")
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--limit", type=int, default=None, help="au plus N images de chaque type")
+    args = parser.parse_args()
+
+    import backend
+    df_movie, df_people, _ = backend.load_data.__wrapped__()
+    posters, profiles = catalogue_urls(df_movie, df_people)
+    posters, profiles = posters[:args.limit], profiles[:args.limit]
+    jobs = [(u, "card") for u in posters] + [(u, s) for u in profiles for s in ("avatar", "card")]
+    stats = prewarm(jobs, args.workers)
+    print(f"{stats['jobs']} miniatures : {stats['fetched']} téléchargées ({stats['bytes'] / 1e6:.1f} Mo), "
+          f"{stats['cached']} déjà en cache, {stats['failed']} en échec, en {stats['seconds']:.1f}s")
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,20 @@
 import ast
+import re
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 import pandas as pd
 
-def extract_keywords(raw):
-    if pd.isna(raw) or raw == "": return ""
+def _parse_keywords(raw):
+    # Renvoie (texte, échec du parsing)
+    if pd.isna(raw) or raw == "": return "", False
     try:
         data = ast.literal_eval(raw)
         if isinstance(data, list):
-            return " ".join([d.get("name", "").replace(" ", "") for d in data if isinstance(d, dict)])
-        return str(raw)
-    except: return str(raw)
+            return " ".join([d.get("name", "").replace(" ", "") for d in data if isinstance(d, dict)]), False
+        return str(raw), False
+    except Exception: return str(raw), True
+
+def extract_keywords(raw):
+    return _parse_keywords(raw)[0]
 
 def build_text_features(row):
     kw = extract_keywords(row.get("keywords", ""))
@@ -16,6 +22,63 @@ def build_text_features(row):
     gn = str(row.get("movie_genres_y", "")).strip()
     return kw, ov, gn
 
+# --- EXTRACTION VECTORISÉE ---
+# Forme canonique des blobs TMDB : [{'id': 1, 'name': '...'}, ...]. Tout ce qui ne colle pas
+# exactement (échappements, blob tronqué...) repasse par le chemin ast.literal_eval pour un résultat identique.
+_KW_NAME = r"""(?:'[^'\\\r\n\x00]*'|"[^"\\\r\n\x00]*")"""
+_KW_ID = r"-?(?:0|[1-9]\d*)"
+_KW_ITEM = r"\{'id': " + _KW_ID + ", 'name': " + _KW_NAME + r"\}"
+_KW_BLOB = re.compile(r"\[(?:" + _KW_ITEM + r"(?:, " + _KW_ITEM + r")*)?\]")
+_KW_ITEM_NAME = re.compile(r"\{'id': " + _KW_ID + ", 'name': (" + _KW_NAME + r")\}")
+
+def extract_keywords_many(values):
+    """Version par lot d'extract_keywords. Renvoie (textes, nb d'échecs de parsing)."""
+    out, failures = [], 0
+    for raw in values:
+        if isinstance(raw, str) and _KW_BLOB.fullmatch(raw):
+            out.append(" ".join(n[1:-1].replace(" ", "") for n in _KW_ITEM_NAME.findall(raw)))
+        else:
+            text, failed = _parse_keywords(raw)
+            failures += failed
+            out.append(text)
+    return out, failures
+
+def _column_as_text(df, *candidates, strip=False):
+    # Même priorité que row.get(a, row.get(b, "")) : première colonne présente, NaN -> "nan"
+    for col in candidates:
+        if col in df.columns:
+            texts = [str(v) for v in df[col].tolist()]
+            return [t.strip() for t in texts] if strip else texts
+    return [""] * len(df)
+
+def build_text_features_batch(df, workers=0, executor="process", chunk_size=20000):
+    """Équivalent par lot de df.apply(build_text_features, axis=1, result_type='expand').
+
+    Renvoie (DataFrame keywords_text/overview_text/genres_text aligné sur df.index, stats).
+    `workers` > 0 découpe la colonne keywords en blocs traités par un pool ("process" ou "thread").
+    """
+    raw = df["keywords"].tolist() if "keywords" in df.columns else [""] * len(df)
+    if workers and len(raw) > chunk_size:
+        chunks = [raw[i:i + chunk_size] for i in range(0, len(raw), chunk_size)]
+        pool_cls = ProcessPoolExecutor if executor == "process" else ThreadPoolExecutor
+        with pool_cls(max_workers=workers) as pool:
+            results = list(pool.map(extract_keywords_many, chunks))
+        keywords = [t for texts, _ in results for t in texts]
+        failures = sum(f for _, f in results)
+    else:
+        keywords, failures = extract_keywords_many(raw)
+    features = pd.DataFrame({
+        "keywords_text": keywords,
+        "overview_text": _column_as_text(df, "movie_overview_fr", "movie_overview"),
+        "genres_text": _column_as_text(df, "movie_genres_y", strip=True),
+    }, index=df.index, dtype=object)
+    return features, {"rows": len(df), "keyword_parse_failures": failures}
+
+def to_float(series):
+    """Nombres au format français du CSV ("6,3491") -> float, NaN si illisible."""
+    if pd.api.types.is_numeric_dtype(series.dtype): return series.astype(float)  # déjà converti (schema.py)
+    return pd.to_numeric(series.astype(str).str.replace(",", ".", regex=False), errors="coerce")
+
 def get_poster_url(row):
     if pd.notna(row.get("movie_poster_url_fr")) and row.get("movie_poster_url_fr"): return str(row["movie_poster_url_fr"])
     elif pd.notna(row.get("movie_poster_path_fr")) and row.get("movie_poster_path_fr"): return f"https://image.tmdb.org/t/p/w500{row['movie_poster_path_fr']}"